@@ -12,8 +12,22 @@ class AppUI:
         self.app = app
         self.build()
 
+    def _menu(self):
+        a = self.app
+        menubar = tk.Menu(a)
+        diagnostico = tk.Menu(menubar, tearoff=0)
+        diagnostico.add_checkbutton(label='Rastrear desempenho', variable=a.rastreamento_var, command=a.alternar_rastreamento)
+        diagnostico.add_command(label='Resumo do rastreamento...', command=a.mostrar_resumo_rastreamento)
+        diagnostico.add_command(label='Travamentos...', command=a.mostrar_travamentos)
+        diagnostico.add_separator()
+        diagnostico.add_command(label='Verificar faixas do catálogo...', command=a.verificar_faixas)
+        diagnostico.add_command(label='Migrar faixas legadas (JSON)...', command=a.migrar_faixas_legadas)
+        menubar.add_cascade(label='Diagnóstico', menu=diagnostico)
+        a.config(menu=menubar)
+
     def build(self):
         a = self.app
+        self._menu()
         container = ttk.Frame(a, padding=12)
         container.pack(fill='both', expand=True)
 
@@ -47,11 +61,14 @@ class AppUI:
         entradas.pack(fill='x')
 
         ttk.Label(entradas, text='Produtos:').grid(row=0, column=0, sticky='w')
+        # editável: digitar filtra a lista pelo índice de busca (sem acento/maiúsculas)
         a.cb_produtos = ttk.Combobox(
-            entradas, textvariable=a.produto_selecionado, values=a.produtos_lista, state='readonly', width=40
+            entradas, textvariable=a.produto_selecionado, values=a.produtos_lista, width=40
         )
         a.cb_produtos.grid(row=0, column=1, sticky='w', padx=6)
         a.cb_produtos.bind('<<ComboboxSelected>>', a.carregar_produto)
+        a.cb_produtos.bind('<KeyRelease>', a._filtrar_produtos)
+        a.cb_produtos.bind('<Return>', a._selecionar_produto_digitado)
 
         ttk.Button(
             entradas, text='Adicionar Novo Produto', bootstyle="secondary", command=a.novo_produto_popup
@@ -136,6 +153,8 @@ class AppUI:
         vsb = ttk.Scrollbar(table_card, orient='vertical', command=a.tree.yview)
         vsb.pack(side='right', fill='y')
         a.tree.configure(yscrollcommand=vsb.set)
+        # a rolagem é assumida pela TabelaServicos (janela virtualizada)
+        a.vsb_servicos = vsb
 
         # Botões da tabela
         btns = ttk.Frame(container)
@@ -143,6 +162,7 @@ class AppUI:
         ttk.Button(btns, text='Editar', bootstyle="secondary", command=a.editar_selecionado).pack(side='left', padx=6)
         ttk.Button(btns, text='Remover', bootstyle="danger", command=a.remover_selecionado).pack(side='left', padx=6)
         ttk.Button(btns, text='Limpar Serviços', bootstyle="warning-outline", command=a.limpar_servicos).pack(side='left', padx=6)
+        ttk.Button(btns, text='Reprecificar', bootstyle="info-outline", command=a.reprecificar_orcamento).pack(side='left', padx=6)
 
         # Footer
         footer = ttk.Frame(container)
@@ -150,3 +170,6 @@ class AppUI:
         ttk.Label(footer, text='Total:').pack(side='left')
         ttk.Label(footer, textvariable=a.total_valor, font=('Segoe UI', 12, 'bold')).pack(side='left', padx=6)
         ttk.Button(footer, text='Gerar DOCX', bootstyle="success", command=a.gerar_documento).pack(side='right')
+        ttk.Button(footer, text='Exportar Catálogo', bootstyle="secondary-outline", command=a.exportar_catalogo).pack(side='right', padx=6)
+        ttk.Button(footer, text='Importar Catálogo', bootstyle="secondary-outline", command=a.importar_catalogo).pack(side='right', padx=6)
+        ttk.Button(footer, text='Buscar Propostas', bootstyle="info-outline", command=a.abrir_busca_propostas).pack(side='right', padx=6)
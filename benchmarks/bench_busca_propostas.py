@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: busca no histórico de propostas (FTS5) com muitas propostas.
+
+Gera propostas sintéticas num banco temporário (indexação incremental, em
+lotes) e mede a latência das buscas típicas do painel.
+
+Uso:
+    python benchmarks/bench_busca_propostas.py [--propostas 100000] [--repeticoes 20]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features.dinheiro import centavos
+from features.historico_propostas import buscar_propostas, indexar_propostas, registro_proposta
+from features.migracoes import configurar_conexao, migrar
+from features.orcamento import ItemOrcamento, Orcamento
+
+PRODUTOS = ['BANNER LONA', 'ADESIVO VINIL', 'PLACA ACM', 'FACHADA LUMINOSA', 'CARTÃO DE VISITA',
+            'PANFLETO A5', 'ADESIVO PERFURADO', 'LETRA CAIXA', 'TOTEM', 'BANNER ROLL-UP',
+            'ENVELOPAMENTO', 'PLACA DE SINALIZAÇÃO', 'CAVALETE', 'WIND BANNER', 'IMPRESSÃO UV']
+NOMES = ['SILVA', 'SOUZA', 'OLIVEIRA', 'PEREIRA', 'COSTA', 'RODRIGUES', 'ALMEIDA', 'NASCIMENTO',
+         'LIMA', 'ARAÚJO', 'FERREIRA', 'CARVALHO', 'GOMES', 'MARTINS', 'ROCHA', 'RIBEIRO']
+RAMOS = ['PADARIA', 'MERCADO', 'FARMÁCIA', 'AUTO PEÇAS', 'CLÍNICA', 'ACADEMIA', 'ESCOLA', 'RESTAURANTE']
+
+CONSULTAS = ['banner', 'banner silva', 'padaria março 2024', 'placa acm', 'farmacia',
+             'adesivo perfurado oliveira', 'letra caixa 2023', '1500', 'wind', 'xyzinexistente']
+
+
+def _propostas(n, rnd):
+    for i in range(n):
+        cliente = f"{rnd.choice(RAMOS)} {rnd.choice(NOMES)} {rnd.randint(1, 400)}"
+        data = f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/{rnd.randint(2019, 2025)}"
+        servicos = Orcamento()
+        for _ in range(rnd.randint(1, 12)):
+            qtd = rnd.randint(1, 50)
+            preco = centavos(round(rnd.uniform(5, 400), 2))
+            servicos.append(ItemOrcamento(rnd.choice(PRODUTOS), quantidade=qtd, preco=preco, total=qtd * preco))
+        yield registro_proposta(cliente, f"{i % 999 + 1:02d}-{data[-4:]}", data, servicos,
+                                arquivo=f"orcamento_{i}.docx")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('--propostas', type=int, default=100000)
+    ap.add_argument('--repeticoes', type=int, default=20)
+    ap.add_argument('--lote', type=int, default=10000)
+    args = ap.parse_args(argv)
+
+    rnd = random.Random(42)
+    with tempfile.TemporaryDirectory() as pasta:
+        conn = sqlite3.connect(os.path.join(pasta, 'historico.db'))
+        configurar_conexao(conn)
+        migrar(conn)
+
+        t = time.perf_counter()
+        lote = []
+        for reg in _propostas(args.propostas, rnd):
+            lote.append(reg)
+            if len(lote) >= args.lote:
+                indexar_propostas(conn, lote)
+                lote = []
+        if lote:
+            indexar_propostas(conn, lote)
+        dt = time.perf_counter() - t
+        print(f'{args.propostas} propostas indexadas em {dt:.1f} s ({args.propostas / dt:.0f}/s)')
+
+        # uma proposta a mais, sozinha: custo da indexação incremental no app
+        t = time.perf_counter()
+        indexar_propostas(conn, [next(_propostas(1, rnd))])
+        print(f'indexar 1 proposta: {(time.perf_counter() - t) * 1000:.2f} ms\n')
+
+        print(f'{"consulta":<30}{"resultados":>11}{"mediana ms":>12}{"p95 ms":>9}')
+        for consulta in CONSULTAS:
+            tempos = []
+            for _ in range(args.repeticoes):
+                t = time.perf_counter()
+                res = buscar_propostas(conn, consulta, limite=50)
+                tempos.append((time.perf_counter() - t) * 1000)
+            tempos.sort()
+            p95 = tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))]
+            print(f'{consulta:<30}{len(res):>11}{statistics.median(tempos):>12.2f}{p95:>9.2f}')
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
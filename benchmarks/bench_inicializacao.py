@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark de regressão: tempo de abertura do app.
+
+Mede, em processos novos (cache de disco já quente):
+- o tempo de `import budget_system`, com o detalhamento de `-X importtime`
+  (imports diretos de budget_system ordenados pelo tempo acumulado);
+- o tempo até o primeiro quadro: import + `OrcamentoApp()` + `update()`
+  (precisa de display; sem display essa parte é pulada).
+
+Falha (código de saída 1) se algum orçamento for estourado ou se um módulo
+pesado que deve ser carregado só no primeiro uso (pandas, docx, numpy)
+aparecer na abertura. Cada execução roda num diretório temporário, então o
+produtos.db do projeto não é tocado.
+
+Uso:
+    python benchmarks/bench_inicializacao.py [--repeticoes 5] [--orcamento-import-ms 250]
+        [--orcamento-quadro-ms 1500] [--top 15] [--json resultado.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# carregados só no primeiro uso (geração do .docx, precificação em lote)
+PROIBIDOS_NA_ABERTURA = ('pandas', 'docx', 'numpy')
+
+_SCRIPT_IMPORT = (
+    "import time; t = time.perf_counter(); import budget_system; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+_SCRIPT_QUADRO = (
+    "import time; t = time.perf_counter()\n"
+    "import budget_system\n"
+    "app = budget_system.OrcamentoApp()\n"
+    "app.update()\n"
+    "print((time.perf_counter() - t) * 1000)\n"
+    "app.on_close()\n"
+)
+
+
+def _rodar(args, cwd):
+    env = dict(os.environ, PYTHONPATH=RAIZ + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    return subprocess.run([sys.executable] + args, cwd=cwd, env=env, capture_output=True, text=True)
+
+
+def ler_importtime(stderr):
+    """Lista de (modulo, self_us, acumulado_us, nivel) a partir da saída de `-X importtime`."""
+    modulos = []
+    for linha in stderr.splitlines():
+        if not linha.startswith('import time:'):
+            continue
+        partes = linha[len('import time:'):].split('|')
+        if len(partes) != 3 or not partes[0].strip().isdigit():
+            continue  # cabeçalho
+        nome = partes[2]
+        nivel = (len(nome) - len(nome.lstrip(' ')) - 1) // 2
+        modulos.append((nome.strip(), int(partes[0]), int(partes[1]), nivel))
+    return modulos
+
+
+def imports_diretos(modulos, raiz='budget_system'):
+    """Entradas importadas diretamente por `raiz` (os filhos vêm antes do pai na saída)."""
+    fim = max(i for i, m in enumerate(modulos) if m[0] == raiz and m[3] == 0)
+    filhos = []
+    for m in reversed(modulos[:fim]):
+        if m[3] == 0:
+            break
+        if m[3] == 1:
+            filhos.append(m)
+    return filhos
+
+
+def medir_import(repeticoes, cwd):
+    tempos = []
+    for _ in range(repeticoes):
+        r = _rodar(['-c', _SCRIPT_IMPORT], cwd)
+        if r.returncode != 0:
+            raise RuntimeError(r.stderr)
+        tempos.append(float(r.stdout.strip().splitlines()[-1]))
+    detalhado = _rodar(['-X', 'importtime', '-c', 'import budget_system'], cwd)
+    return tempos, ler_importtime(detalhado.stderr)
+
+
+def medir_primeiro_quadro(repeticoes, cwd):
+    """Tempos até o primeiro quadro, ou (None, motivo) se não houver display."""
+    tempos = []
+    for _ in range(repeticoes):
+        r = _rodar(['-c', _SCRIPT_QUADRO], cwd)
+        if r.returncode != 0:
+            ultima = (r.stderr.strip().splitlines() or ['erro desconhecido'])[-1]
+            return None, ultima
+        tempos.append(float(r.stdout.strip().splitlines()[-1]))
+    return tempos, None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('--repeticoes', type=int, default=5)
+    ap.add_argument('--orcamento-import-ms', type=float, default=250.0)
+    ap.add_argument('--orcamento-quadro-ms', type=float, default=1500.0)
+    ap.add_argument('--top', type=int, default=15, help='módulos listados no detalhamento')
+    ap.add_argument('--json', help='grava os resultados neste arquivo')
+    args = ap.parse_args(argv)
+
+    falhas = []
+    with tempfile.TemporaryDirectory() as cwd:
+        tempos_import, modulos = medir_import(args.repeticoes, cwd)
+        tempos_quadro, motivo = medir_primeiro_quadro(args.repeticoes, cwd)
+
+    med_import = statistics.median(tempos_import)
+    print(f'import budget_system: mediana {med_import:.0f} ms '
+          f'(min {min(tempos_import):.0f}, max {max(tempos_import):.0f}, n={len(tempos_import)})')
+
+    primeiro_nivel = sorted(imports_diretos(modulos), key=lambda m: -m[2])
+    print(f'\nimports diretos de budget_system ({len(primeiro_nivel)}):')
+    print(f'{"módulo":<40}{"acumulado ms":>14}{"próprio ms":>12}')
+    for nome, proprio, acumulado, _ in primeiro_nivel[:args.top]:
+        print(f'{nome:<40}{acumulado / 1000:>14.1f}{proprio / 1000:>12.1f}')
+
+    carregados = {m[0].split('.')[0] for m in modulos}
+    indevidos = [p for p in PROIBIDOS_NA_ABERTURA if p in carregados]
+    if indevidos:
+        falhas.append(f'carregados na abertura: {", ".join(indevidos)}')
+    if med_import > args.orcamento_import_ms:
+        falhas.append(f'import {med_import:.0f} ms > orçamento {args.orcamento_import_ms:.0f} ms')
+
+    med_quadro = None
+    if tempos_quadro is None:
+        print(f'\nprimeiro quadro: pulado ({motivo})')
+    else:
+        med_quadro = statistics.median(tempos_quadro)
+        print(f'\nprimeiro quadro: mediana {med_quadro:.0f} ms '
+              f'(min {min(tempos_quadro):.0f}, max {max(tempos_quadro):.0f})')
+        if med_quadro > args.orcamento_quadro_ms:
+            falhas.append(f'primeiro quadro {med_quadro:.0f} ms > orçamento {args.orcamento_quadro_ms:.0f} ms')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'import_ms': tempos_import,
+                'primeiro_quadro_ms': tempos_quadro,
+                'modulos': [
+                    {'modulo': n, 'proprio_us': p, 'acumulado_us': a}
+                    for n, p, a, _ in primeiro_nivel
+                ],
+                'falhas': falhas,
+            }, f, ensure_ascii=False, indent=1)
+
+    for falha in falhas:
+        print(f'FALHA: {falha}')
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
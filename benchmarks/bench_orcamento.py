@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memória e iteração dos serviços do orçamento.
+
+Compara a lista de dicts antiga com `ItemOrcamento` (lista de objetos com
+__slots__) e com o `Orcamento` colunar (arrays), para orçamentos grandes.
+
+Uso:
+    python benchmarks/bench_orcamento.py [--linhas 50000] [--repeticoes 5]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features.dinheiro import centavos
+from features.orcamento import ItemOrcamento, Orcamento
+
+
+def _dicts(n):
+    return [
+        {'Descrição': f'SERVIÇO {i % 500}', 'Largura': str(80 + i % 40), 'Altura': 'X',
+         'Quantidade': i % 7 + 1, 'Preço': 12.5 + i % 3, 'Total (R$)': (12.5 + i % 3) * (i % 7 + 1)}
+        for i in range(n)
+    ]
+
+
+def _memoria(construir):
+    tracemalloc.start()
+    obj = construir()
+    usado = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, usado
+
+
+def _tempo(fn, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        t = time.perf_counter()
+        fn()
+        melhor = min(melhor, time.perf_counter() - t)
+    return melhor * 1000
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('--linhas', type=int, default=50000)
+    ap.add_argument('--repeticoes', type=int, default=5)
+    args = ap.parse_args(argv)
+    n = args.linhas
+
+    # textos criados fora da medição: as três formas compartilham as mesmas strings
+    base = _dicts(n)
+    dicts, mem_dicts = _memoria(lambda: [dict(d) for d in base])
+    itens, mem_itens = _memoria(lambda: [ItemOrcamento.de_dict(d) for d in base])
+    orc, mem_orc = _memoria(lambda: Orcamento(itens))
+
+    print(f'{n} linhas')
+    print(f'{"formato":<24}{"memória MB":>12}{"bytes/linha":>13}')
+    for nome, mem in (('lista de dicts', mem_dicts), ('lista de ItemOrcamento', mem_itens), ('Orcamento (colunas)', mem_orc)):
+        print(f'{nome:<24}{mem / 1e6:>12.2f}{mem / n:>13.0f}')
+
+    def soma_dicts():
+        return sum(d['Total (R$)'] for d in dicts)
+
+    def soma_itens():
+        return sum(i.total for i in itens)
+
+    def linhas_dicts():
+        for d in dicts:
+            (d['Descrição'], d['Largura'], d['Altura'], d['Quantidade'], d['Preço'], d['Total (R$)'])
+
+    def linhas_itens():
+        for i in itens:
+            (i.descricao, i.largura, i.altura, i.quantidade, i.preco, i.total)
+
+    def linhas_orc():
+        for _ in orc.linhas():
+            pass
+
+    def remover_inserir_dicts():
+        for _ in range(100):
+            dicts.insert(0, dicts.pop())
+
+    def remover_inserir_orc():
+        for _ in range(100):
+            orc.insert(0, orc.pop())
+
+    casos = [
+        ('total: lista de dicts', soma_dicts),
+        ('total: ItemOrcamento', soma_itens),
+        ('total: Orcamento.total', lambda: orc.total),
+        ('total: Orcamento.recalcular', orc.recalcular_total),
+        ('linhas: lista de dicts', linhas_dicts),
+        ('linhas: ItemOrcamento', linhas_itens),
+        ('linhas: Orcamento.linhas()', linhas_orc),
+        ('100x pop+insert: dicts', remover_inserir_dicts),
+        ('100x pop+insert: Orcamento', remover_inserir_orc),
+    ]
+    print(f'\n{"operação":<32}{"ms":>10}')
+    for nome, fn in casos:
+        print(f'{nome:<32}{_tempo(fn, args.repeticoes):>10.3f}')
+
+    # centavos inteiros: o total do Orcamento é exato
+    assert sum(centavos(d['Total (R$)']) for d in dicts) == orc.recalcular_total() == orc.total
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Benchmark: suíte reprodutível dos caminhos quentes do app, com resultados em JSON.
+
+Gera um catálogo sintético (`dados_sinteticos`: N produtos, M faixas por
+produto unitário, orçamento de K linhas, sempre com a mesma semente) num
+banco temporário e mede:
+
+    get_preco_por_quantidade             (budget_system)
+    CarregarProduto.carregar_produto
+    TotalCalculator.calcular_total       (total_calculator e features.total)
+    OrcamentoApp._atualizar_produtos
+    OrcamentoApp._refresh_tree
+    reprecificacao.reprecificar          (orçamento inteiro pelo catálogo)
+    docxGenerator.renderizar             (corpo de gerar_docx, sem o diálogo)
+    docxGenerator.montar_documento       (mesmo .docx sempre pelo python-docx)
+
+Os caminhos de UI rodam sobre widgets falsos (Entry/Var/Treeview/Combobox
+em Python puro), então não é preciso display nem Xvfb; o que se mede é o
+código do app, não o Tk. Os resultados (mediana, p95 e mínimo por lote, em
+ms) vão para um JSON com o commit atual, para comparar entre commits.
+
+Uso:
+    python benchmarks/bench_suite.py [--produtos 2000] [--faixas 5] [--linhas 500]
+        [--repeticoes 7] [--saida resultado.json] [--comparar base.json] [--apenas NOME ...]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from budget_system import OrcamentoApp, get_preco_por_quantidade
+from carregar_produto import CarregarProduto
+from features import total as total_features
+from features.busca_produtos import IndiceBusca
+from features.faixas_index import descartar_indice, get_indice
+from features.gerar_docx import docxGenerator
+from features.reprecificacao import reprecificar
+from features.repositorio import descartar_repositorio
+from tabela_servicos import TabelaServicos
+import total_calculator
+
+from dados_sinteticos import criar_banco, criar_modelo_docx, gerar_orcamento
+
+
+# ----------------------- widgets falsos (sem Tk) -----------------------
+class VarFalsa:
+    """Substitui tk.StringVar/BooleanVar e o Combobox de tipo (get/set)."""
+
+    def __init__(self, valor=''):
+        self.valor = valor
+
+    def get(self):
+        return self.valor
+
+    def set(self, valor):
+        self.valor = valor
+
+
+class EntradaFalsa:
+    """Substitui ttk.Entry: texto + get/insert/delete/config."""
+
+    def __init__(self, texto=''):
+        self.texto = texto
+
+    def get(self):
+        return self.texto
+
+    def insert(self, pos, s):
+        pos = len(self.texto) if pos == 'end' else int(pos)
+        self.texto = self.texto[:pos] + str(s) + self.texto[pos:]
+
+    def delete(self, ini, fim=None):
+        ini = int(ini)
+        if fim is None:
+            fim = ini + 1
+        fim = len(self.texto) if fim == 'end' else int(fim)
+        self.texto = self.texto[:ini] + self.texto[fim:]
+
+    def config(self, **kw):
+        pass
+
+    configure = config
+
+
+class ComboboxFalso:
+    """Substitui o combobox de produtos (só recebe `values`)."""
+
+    def __init__(self):
+        self.opcoes = {}
+
+    def __setitem__(self, chave, valor):
+        self.opcoes[chave] = valor
+
+
+class TreeviewFalso:
+    """Substitui ttk.Treeview no que a TabelaServicos usa."""
+
+    def __init__(self):
+        self.linhas = {}
+        self.ordem = []
+        self._selecao = ()
+
+    def insert(self, parent, index, iid=None, values=()):
+        self.linhas[iid] = values
+        self.ordem.append(iid)
+        return iid
+
+    def item(self, iid, values=None):
+        if values is not None:
+            self.linhas[iid] = values
+        return {'values': self.linhas[iid]}
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.linhas[iid]
+            self.ordem.remove(iid)
+
+    def get_children(self, item=''):
+        return tuple(self.ordem)
+
+    def selection(self):
+        return self._selecao
+
+    def selection_set(self, *iids):
+        self._selecao = tuple(iids)
+
+    def selection_remove(self, *iids):
+        self._selecao = tuple(i for i in self._selecao if i not in iids)
+
+    def bind(self, *args, **kw):
+        pass
+
+    def configure(self, **kw):
+        pass
+
+
+class AppFalsa:
+    """Os atributos de `OrcamentoApp` usados pelos caminhos medidos.
+
+    Os métodos medidos são os próprios da `OrcamentoApp`; só `calcular_total`
+    passa o rótulo do tipo em vez do Combobox (o `TotalCalculator` aceita os dois).
+    """
+
+    LIMITE_BUSCA_PRODUTOS = OrcamentoApp.LIMITE_BUSCA_PRODUTOS
+    _atualizar_produtos = OrcamentoApp._atualizar_produtos
+    _filtrar_produtos = OrcamentoApp._filtrar_produtos
+    _refresh_tree = OrcamentoApp._refresh_tree
+
+    def __init__(self, conn, servicos):
+        self.conn = conn
+        self.servicos = servicos
+        self.produto_selecionado = VarFalsa()
+        self.tipo_calculo = VarFalsa('Por unidade')
+        self.install_var = VarFalsa(False)
+        self.struct_var = VarFalsa(False)
+        for nome in ('ent_desc', 'ent_larg', 'ent_alt', 'ent_qtd', 'ent_preco', 'ent_total',
+                     'ent_install', 'ent_struct'):
+            setattr(self, nome, EntradaFalsa())
+        self.busca_produtos = IndiceBusca()
+        self.produtos_lista = []
+        self.cb_produtos = ComboboxFalso()
+        self.tree = TreeviewFalso()
+        self.vsb_servicos = None
+        self.tabela_servicos = TabelaServicos(self)
+
+    def calcular_total(self):
+        total_calculator.TotalCalculator(
+            self.produto_selecionado, self.ent_qtd, self.ent_preco, self.ent_larg, self.ent_alt,
+            self.tipo_calculo.get(), self.conn, self.ent_total,
+            self.install_var, self.ent_install, self.struct_var, self.ent_struct,
+        ).calcular_total()
+
+
+# ----------------------- medição -----------------------
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _percentil(tempos, p):
+    ordenados = sorted(tempos)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def medir(fn, repeticoes, chamadas):
+    """Executa `fn` (um lote de `chamadas` operações) uma vez de aquecimento + `repeticoes` vezes."""
+    try:
+        fn()
+        tempos = []
+        for _ in range(repeticoes):
+            t = time.perf_counter()
+            fn()
+            tempos.append((time.perf_counter() - t) * 1000)
+    except Exception as e:
+        return {'erro': f'{type(e).__name__}: {e}'}
+    return {
+        'chamadas': chamadas,
+        'mediana_ms': statistics.median(tempos),
+        'p95_ms': _percentil(tempos, 0.95),
+        'min_ms': min(tempos),
+        'por_chamada_us': statistics.median(tempos) * 1000 / chamadas,
+    }
+
+
+def _casos(conn, nomes, orc, pasta, args):
+    rnd = random.Random(args.semente)
+    unitarios = nomes['unit'] or [None]
+    todos = nomes['unit'] + nomes['m2'] + nomes['m']
+    consultas = [(rnd.choice(unitarios), rnd.randint(1, 1500)) for _ in range(args.consultas)]
+    selecionados = [rnd.choice(todos) for _ in range(min(args.consultas, 200))]
+    linhas = list(orc.linhas())[:args.consultas]
+
+    app = AppFalsa(conn, orc)
+    loader = CarregarProduto(app)
+
+    def preco_por_quantidade():
+        for nome, qtd in consultas:
+            get_preco_por_quantidade(conn, nome, qtd)
+
+    def carregar_produto():
+        for nome in selecionados:
+            app.produto_selecionado.set(nome)
+            app.ent_qtd.texto = '10'
+            loader.carregar_produto()
+
+    def _calculadora(classe, tipo):
+        return classe(app.produto_selecionado, app.ent_qtd, app.ent_preco, app.ent_larg, app.ent_alt,
+                      tipo, conn, app.ent_total, app.install_var, app.ent_install,
+                      app.struct_var, app.ent_struct)
+
+    def _calcular(calc, rotulo):
+        for desc, larg, alt, qtd, preco, _ in linhas:
+            app.produto_selecionado.set(desc)
+            tipo = get_indice(conn).tipo(desc)
+            rotulo(tipo)
+            app.ent_larg.texto, app.ent_alt.texto = larg, alt
+            app.ent_qtd.texto, app.ent_preco.texto = str(qtd), f'{preco:.2f}'
+            calc.calcular_total()
+
+    rotulos = {'unit': 'Por unidade', 'm2': 'Por m²', 'm': 'Por m'}
+    # total_calculator recebe o rótulo (str); features.total lê o "combobox" (Var)
+    calc_raiz = _calculadora(total_calculator.TotalCalculator, 'Por unidade')
+    calc_features = _calculadora(total_features.TotalCalculator, app.tipo_calculo)
+
+    def total_raiz():
+        def rotulo(tipo):
+            calc_raiz.tipo_calculo = rotulos.get(tipo, 'Por unidade')
+        _calcular(calc_raiz, rotulo)
+
+    def total_features_():
+        _calcular(calc_features, lambda tipo: app.tipo_calculo.set(rotulos.get(tipo, 'Por unidade')))
+
+    tabela = app.tabela_servicos
+
+    def refresh_tree():
+        # cada chamada reexibe outra janela (como após rolar/editar)
+        n = len(orc)
+        tabela.inicio = (tabela.inicio + tabela.janela) % max(1, n)
+        app._refresh_tree()
+
+    modelo = criar_modelo_docx(os.path.join(pasta, 'modelo.docx'))
+    gerador = docxGenerator(modelo, 'CLIENTE SINTÉTICO', '01', '01-2025', '01/01/2025', orc)
+    destino = os.path.join(pasta, 'proposta.docx')
+
+    return [
+        ('get_preco_por_quantidade', preco_por_quantidade, len(consultas)),
+        ('CarregarProduto.carregar_produto', carregar_produto, len(selecionados)),
+        ('total_calculator.TotalCalculator.calcular_total', total_raiz, len(linhas)),
+        ('features.total.TotalCalculator.calcular_total', total_features_, len(linhas)),
+        ('OrcamentoApp._atualizar_produtos', app._atualizar_produtos, 1),
+        ('OrcamentoApp._refresh_tree', refresh_tree, 1),
+        ('reprecificacao.reprecificar', lambda: reprecificar(conn, orc), len(orc)),
+        ('docxGenerator.gerar_docx', lambda: gerador.renderizar(destino), 1),
+        ('docxGenerator.montar_documento', lambda: gerador.montar_documento().save(destino), 1),
+    ]
+
+
+def comparar(atual, base):
+    """Imprime a razão atual/base da mediana de cada caminho."""
+    print(f'\ncomparação com {base.get("commit") or "base"}:')
+    print(f'{"caminho":<50}{"base ms":>10}{"atual ms":>10}{"razão":>8}')
+    for nome, r in atual['resultados'].items():
+        b = base.get('resultados', {}).get(nome)
+        if not b or 'erro' in b or 'erro' in r:
+            print(f'{nome:<50}{"-":>10}{"-":>10}{"-":>8}')
+            continue
+        razao = r['mediana_ms'] / b['mediana_ms'] if b['mediana_ms'] else float('inf')
+        print(f'{nome:<50}{b["mediana_ms"]:>10.2f}{r["mediana_ms"]:>10.2f}{razao:>8.2f}')
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument('--produtos', type=int, default=2000)
+    ap.add_argument('--faixas', type=int, default=5, help='faixas por produto unitário')
+    ap.add_argument('--linhas', type=int, default=500, help='linhas do orçamento')
+    ap.add_argument('--consultas', type=int, default=1000, help='operações por lote')
+    ap.add_argument('--repeticoes', type=int, default=7)
+    ap.add_argument('--semente', type=int, default=42)
+    ap.add_argument('--apenas', nargs='+', help='mede só os caminhos que contêm algum destes textos')
+    ap.add_argument('--saida', help='grava os resultados neste arquivo JSON')
+    ap.add_argument('--comparar', help='JSON de uma execução anterior para comparar')
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        t = time.perf_counter()
+        conn, nomes = criar_banco(os.path.join(pasta, 'produtos.db'), args.produtos, args.faixas, args.semente)
+        orc = gerar_orcamento(nomes, args.linhas, args.semente)
+        print(f'catálogo sintético: {args.produtos} produtos, {args.faixas} faixas/unitário, '
+              f'orçamento de {args.linhas} linhas ({time.perf_counter() - t:.1f} s)\n')
+
+        resultados = {}
+        print(f'{"caminho":<50}{"mediana ms":>12}{"p95 ms":>9}{"us/chamada":>12}')
+        for nome, fn, chamadas in _casos(conn, nomes, orc, pasta, args):
+            if args.apenas and not any(a in nome for a in args.apenas):
+                continue
+            r = resultados[nome] = medir(fn, args.repeticoes, chamadas)
+            if 'erro' in r:
+                print(f'{nome:<50}  ERRO {r["erro"]}')
+            else:
+                print(f'{nome:<50}{r["mediana_ms"]:>12.2f}{r["p95_ms"]:>9.2f}{r["por_chamada_us"]:>12.1f}')
+        descartar_indice(conn)
+        descartar_repositorio(conn)
+        conn.close()
+
+    relatorio = {
+        'commit': _commit_atual(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': {k: getattr(args, k) for k in ('produtos', 'faixas', 'linhas', 'consultas', 'repeticoes', 'semente')},
+        'resultados': resultados,
+    }
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=1)
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(relatorio, json.load(f))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tempo de preenchimento/salvamento da tabela de serviços x nº de linhas.
+
+Compara o preenchimento linha a linha antigo (add_row + reinserção +
+`tabela.rows[-2]`) com `features.tabela_docx.preencher_tabela`.
+
+Uso:
+    python benchmarks/bench_tabela_docx.py [--linhas 100 500 1000 2000] [--sem-legado]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+from features.tabela_docx import dados_linha, preencher_tabela
+
+
+def _modelo():
+    doc = Document()
+    doc.add_paragraph('Cliente: {{NOME}}')
+    tabela = doc.add_table(rows=2, cols=7)
+    for i, h in enumerate(['#', 'Descrição', 'Largura', 'Altura', 'Qtd', 'Preço', 'Total (R$)']):
+        tabela.rows[0].cells[i].text = h
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def _servicos(n):
+    return [
+        {'Descrição': f'SERVIÇO {i}', 'Largura': 80, 'Altura': 120,
+         'Quantidade': i % 7 + 1, 'Preço': 12.5, 'Total (R$)': 12.5 * (i % 7 + 1)}
+        for i in range(n)
+    ]
+
+
+def _legado(tabela, servicos):
+    """Cópia do laço original de `docxGenerator.gerar_docx`."""
+    while len(tabela.rows) > 2:
+        tabela._tbl.remove(tabela.rows[-2]._tr)
+    for i, row_data in enumerate(servicos, start=1):
+        last_row = tabela.rows[-1]._tr
+        new_row = tabela.add_row()._tr
+        tabela._tbl.remove(new_row)
+        last_row.addprevious(new_row)
+        row_cells = tabela.rows[-2].cells
+        dados = dados_linha(i, row_data)
+        for idx_col, cell in enumerate(row_cells):
+            cell.text = ''
+            p = cell.paragraphs[0]
+            p.text = dados[idx_col]
+            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+
+def _medir(dados_modelo, servicos, preencher, destino):
+    inicio = time.perf_counter()
+    doc = Document(BytesIO(dados_modelo))
+    preencher(doc.tables[0], servicos)
+    meio = time.perf_counter()
+    doc.save(destino)
+    return meio - inicio, time.perf_counter() - meio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[100, 500, 1000, 2000])
+    parser.add_argument('--sem-legado', action='store_true', help='não mede o preenchimento antigo')
+    args = parser.parse_args(argv)
+
+    dados_modelo = _modelo()
+    destino = os.path.join(tempfile.mkdtemp(), 'bench.docx')
+    print(f"{'linhas':>7} {'lote (s)':>10} {'save (s)':>10} {'legado (s)':>11} {'ganho':>7}")
+    for n in args.linhas:
+        servicos = _servicos(n)
+        lote, save = _medir(dados_modelo, servicos, preencher_tabela, destino)
+        if args.sem_legado:
+            print(f"{n:>7} {lote:>10.3f} {save:>10.3f} {'-':>11} {'-':>7}")
+            continue
+        legado, _ = _medir(dados_modelo, servicos, _legado, destino)
+        print(f"{n:>7} {lote:>10.3f} {save:>10.3f} {legado:>11.3f} {legado / lote:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Dados sintéticos e reprodutíveis para os benchmarks.
+
+Gera um catálogo com N produtos (unidade, m² e metro linear), M faixas por
+produto unitário e orçamentos de K linhas, sempre a partir de uma semente,
+para que duas execuções (ou dois commits) meçam exatamente os mesmos dados.
+O catálogo é gravado pelo repositório do app (`features.repositorio`), num
+banco já migrado.
+"""
+import os
+import random
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from features.dinheiro import centavos
+from features.migracoes import configurar_conexao, migrar
+from features.orcamento import ItemOrcamento, Orcamento
+from features.repositorio import get_repositorio
+
+MATERIAIS = ['BANNER', 'ADESIVO', 'PLACA', 'FACHADA', 'CARTÃO', 'PANFLETO', 'LETRA CAIXA',
+             'TOTEM', 'ENVELOPAMENTO', 'CAVALETE', 'WIND BANNER', 'LONA', 'IMPRESSÃO UV']
+ACABAMENTOS = ['VINIL', 'ACM', 'PVC', 'FOSCO', 'BRILHO', 'PERFURADO', 'LUMINOSO', 'COUCHÉ']
+
+# proporção dos tipos no catálogo: unidade, m², metro linear
+PROPORCAO_TIPOS = (('unit', 0.5), ('m2', 0.35), ('m', 0.15))
+
+
+def _tipo(i, n):
+    """Tipos distribuídos de forma determinística (sem depender do sorteio)."""
+    limite = 0.0
+    for tipo, fracao in PROPORCAO_TIPOS:
+        limite += fracao
+        if i < round(limite * n):
+            return tipo
+    return PROPORCAO_TIPOS[-1][0]
+
+
+def faixas_sinteticas(m, rnd):
+    """M faixas contíguas e sem sobreposição, com preço decrescente."""
+    faixas = []
+    qmin = 1
+    preco = round(rnd.uniform(2, 300), 2)
+    for _ in range(m):
+        qmax = qmin + rnd.choice((9, 24, 49, 99, 249))
+        faixas.append((qmin, qmax, preco))
+        qmin = qmax + 1
+        preco = round(max(0.05, preco * rnd.uniform(0.8, 0.97)), 2)
+    return faixas
+
+
+def gerar_catalogo(conn, produtos=2000, faixas=5, semente=42):
+    """Grava o catálogo sintético em `conn` numa transação. Retorna {tipo: [nomes]}."""
+    rnd = random.Random(semente)
+    repo = get_repositorio(conn)
+    nomes = {'unit': [], 'm2': [], 'm': []}
+    with repo.transacao():
+        for i in range(produtos):
+            tipo = _tipo(i, produtos)
+            nome = f"{rnd.choice(MATERIAIS)} {rnd.choice(ACABAMENTOS)} {i:05d}"
+            if tipo == 'unit':
+                tabela = faixas_sinteticas(faixas, rnd)
+                repo.salvar_produto(
+                    nome, tipo, preco_unit=tabela[0][2] if tabela else round(rnd.uniform(2, 300), 2),
+                )
+                for qmin, qmax, preco in tabela:
+                    repo.add_faixa(nome, qmin, qmax, preco)
+            elif tipo == 'm2':
+                repo.salvar_produto(nome, tipo, largura=rnd.choice((80, 100, 120)),
+                                    altura=rnd.choice((60, 100, 200)), preco_m2=round(rnd.uniform(20, 400), 2))
+            else:
+                repo.salvar_produto(nome, tipo, preco_m=round(rnd.uniform(5, 150), 2))
+            nomes[tipo].append(nome)
+    return nomes
+
+
+def gerar_orcamento(nomes, linhas=200, semente=42):
+    """`Orcamento` com K linhas sorteadas do catálogo (de `gerar_catalogo`)."""
+    rnd = random.Random(semente)
+    orc = Orcamento()
+    tipos = [t for t in nomes if nomes[t]]
+    for _ in range(linhas):
+        tipo = rnd.choice(tipos)
+        qtd = rnd.randint(1, 300)
+        preco = round(rnd.uniform(1, 400), 2)
+        if tipo == 'unit':
+            larg = alt = 'X'
+        else:
+            larg, alt = str(rnd.randint(20, 500)), str(rnd.randint(20, 300))
+        nome = rnd.choice(nomes[tipo])
+        orc.append(ItemOrcamento(nome, larg, alt, qtd, centavos(preco), centavos(preco) * qtd, produto=nome))
+    return orc
+
+
+def criar_banco(path, produtos=2000, faixas=5, semente=42):
+    """Banco novo e migrado em `path` com o catálogo sintético. Retorna (conn, nomes)."""
+    conn = sqlite3.connect(path)
+    configurar_conexao(conn)
+    migrar(conn)
+    return conn, gerar_catalogo(conn, produtos, faixas, semente)
+
+
+def criar_modelo_docx(path):
+    """Modelo .docx mínimo com os placeholders e a tabela de serviços do app."""
+    from docx import Document
+
+    doc = Document()
+    doc.add_paragraph('Cliente: {{NOME}}')
+    doc.add_paragraph('Proposta: {{PROPOSTA}} - {{DATA}}')
+    tabela = doc.add_table(rows=2, cols=7)
+    for i, h in enumerate(['#', 'Descrição', 'Largura', 'Altura', 'Qtd', 'Preço', 'Total (R$)']):
+        tabela.rows[0].cells[i].text = h
+    doc.save(path)
+    return path
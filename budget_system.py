@@ -3,7 +3,7 @@
 Sistema de Orçamento - Integrado com faixas unitárias (tabelas)
 Versão: adiciona suporte completo a produtos unitários com faixas em tabelas
 Dependências:
-pip install ttkbootstrap python-docx pandas
+pip install ttkbootstrap python-docx
 
 Observações:
 - Substitui/integra a lógica anterior para lidar com produtos unitários em tabelas separadas
@@ -16,15 +16,14 @@ Use este arquivo como drop-in ou referência para adaptar ao seu projeto.
 """
 
 import os
+import csv
 import sqlite3
-import json
 from datetime import datetime
 import tkinter as tk
 from tkinter import Scrollbar, filedialog, messagebox
 from ttkbootstrap import ttk, Style
-from docx import Document
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-import pandas as pd
+# python-docx e NumPy são importados só no primeiro uso (geração do .docx,
+# precificação em lote) para não pesar na abertura; ver benchmarks/bench_inicializacao.py
 
 # Se você possui módulos externos (Clean, docxGenerator), mantenha os imports
 try:
@@ -55,136 +54,83 @@ try:
 except Exception:
     CarregarProduto = None
 
+try:
+    from painel_propostas import PainelPropostas
+except Exception:
+    PainelPropostas = None
+
+try:
+    from painel_reprecificacao import PainelReprecificacao
+except Exception:
+    PainelReprecificacao = None
+
+from tabela_servicos import TabelaServicos
+
+from features.faixas_index import get_indice, descartar_indice
+from features.repositorio import get_repositorio, descartar_repositorio
+from features.regras_preco import descartar_regras
+from features.migracoes import configurar_conexao, migrar
+from features.busca_produtos import IndiceBusca
+from features.catalogo_io import ErroImportacao, exportar_catalogo, importar_catalogo
+from features.dinheiro import centavos, formatar
+from features.orcamento import CHAVES, ItemOrcamento, Orcamento
+from features.diario_orcamento import DiarioOrcamento
+from features.historico_propostas import indexar_proposta
+from features.rastreamento import ConexaoRastreada, rastreado, rastreador
+from features.vigia_travamentos import VigiaTravamentos
+from features.faixas_validacao import verificar_catalogo
+from features.migracao_tiers import FAIXAS_AJUSTADAS, faixas_do_tiers, migrar_tiers
+from features.reprecificacao import itens_reprecificados, reprecificar
+
 DB_PATH = "produtos.db"
+# autosave do orçamento: compactação periódica do diário e debounce do cabeçalho
+INTERVALO_COMPACTACAO_MS = 60_000
+MINIMO_COMPACTACAO = 50
+ATRASO_CABECALHO_MS = 500
+# laço do Tk parado por mais que isso grava as pilhas em travamentos.log
+LIMITE_TRAVAMENTO_MS = 300
 
 # ----------------------- Helpers para DB das faixas unitárias -----------------------
 def get_conn(path=DB_PATH):
-    conn = sqlite3.connect(path)
+    # cada comando SQL vira um span quando o rastreamento está ligado
+    conn = sqlite3.connect(path, factory=ConexaoRastreada)
     conn.row_factory = sqlite3.Row
+    configurar_conexao(conn)
     return conn
 
 
 def init_db(conn):
-    """Cria/atualiza tabelas necessárias: produtos (compatível), produtos_unitarios, faixas_unitarias."""
-    cursor = conn.cursor()
-
-    # tabela produtos (mantemos compatibilidade com seu schema anterior)
-    cursor.execute("PRAGMA table_info(produtos)")
-    cols = [r[1] for r in cursor.fetchall()]
-    if not cols:
-        cursor.execute("""
-            CREATE TABLE produtos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT NOT NULL UNIQUE,
-                tipo TEXT,
-                largura REAL,
-                altura REAL,
-                preco_m2 REAL,
-                preco_m REAL,
-                preco_unit REAL,
-                tiers TEXT
-            )
-        """)
+    """Aplica as migrações pendentes do esquema (produtos, produtos_unitarios, faixas_unitarias).
 
-    # tabela produtos_unitarios: mapeia um produto unitário com um id próprio
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS produtos_unitarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL UNIQUE
-        )
-    """)
-
-    # tabela faixas_unitarias: faixas por produto_unitario
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS faixas_unitarias (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            produto_id INTEGER NOT NULL,
-            qtd_min INTEGER NOT NULL,
-            qtd_max INTEGER NOT NULL,
-            preco REAL NOT NULL,
-            FOREIGN KEY(produto_id) REFERENCES produtos_unitarios(id)
-        )
-    """)
-
-    conn.commit()
+    Com o banco já na versão atual nada é executado além da leitura de `user_version`.
+    """
+    migrar(conn)
 
 # ----------------------- CRUD para produtos unitários e faixas -----------------------
+# Delegam ao repositório da conexão (features.repositorio): sozinhas gravam na
+# hora; dentro de `get_repositorio(conn).transacao()` entram na mesma transação.
 def ensure_produto_unitario(conn, nome):
     """Garante que exista um registro em produtos_unitarios com esse nome. Retorna id."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM produtos_unitarios WHERE nome = ?", (nome,))
-    row = cursor.fetchone()
-    if row:
-        return row["id"]
-    cursor.execute("INSERT INTO produtos_unitarios (nome) VALUES (?)", (nome,))
-    conn.commit()
-    return cursor.lastrowid
+    return get_repositorio(conn).ensure_produto_unitario(nome)
 
 def delete_produto_unitario(conn, nome):
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM produtos_unitarios WHERE nome = ?", (nome,))
-    row = cursor.fetchone()
-    if not row:
-        return False
-    pid = row["id"]
-    cursor.execute("DELETE FROM faixas_unitarias WHERE produto_id = ?", (pid,))
-    cursor.execute("DELETE FROM produtos_unitarios WHERE id = ?", (pid,))
-    conn.commit()
-    return True
+    return get_repositorio(conn).delete_produto_unitario(nome)
 
 def add_faixa(conn, produto_nome, qtd_min, qtd_max, preco):
-    pid = ensure_produto_unitario(conn, produto_nome)
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO faixas_unitarias (produto_id, qtd_min, qtd_max, preco) VALUES (?, ?, ?, ?)",
-        (pid, int(qtd_min), int(qtd_max), float(preco)),
-    )
-    conn.commit()
-    return cursor.lastrowid
+    return get_repositorio(conn).add_faixa(produto_nome, qtd_min, qtd_max, preco)
 
 def update_faixa(conn, faixa_id, qtd_min, qtd_max, preco):
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE faixas_unitarias SET qtd_min = ?, qtd_max = ?, preco = ? WHERE id = ?",
-        (int(qtd_min), int(qtd_max), float(preco), int(faixa_id)),
-    )
-    conn.commit()
+    get_repositorio(conn).update_faixa(faixa_id, qtd_min, qtd_max, preco)
 
 def delete_faixa(conn, faixa_id):
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM faixas_unitarias WHERE id = ?", (int(faixa_id),))
-    conn.commit()
+    get_repositorio(conn).delete_faixa(faixa_id)
 
 def get_faixas_por_produto(conn, produto_nome):
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM produtos_unitarios WHERE nome = ?", (produto_nome,))
-    row = cursor.fetchone()
-    if not row:
-        return []
-    pid = row["id"]
-    cursor.execute(
-        "SELECT id, qtd_min, qtd_max, preco FROM faixas_unitarias WHERE produto_id = ? ORDER BY qtd_min",
-        (pid,)
-    )
-    return [dict(r) for r in cursor.fetchall()]
+    return get_repositorio(conn).get_faixas_por_produto(produto_nome)
 
 def get_preco_por_quantidade(conn, produto_nome, quantidade):
-    try:
-        qtd = int(quantidade)
-    except Exception:
-        return None
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM produtos_unitarios WHERE nome = ?", (produto_nome,))
-    row = cursor.fetchone()
-    if not row:
-        return None
-    pid = row["id"]
-    cursor.execute(
-        "SELECT preco FROM faixas_unitarias WHERE produto_id = ? AND ? BETWEEN qtd_min AND qtd_max LIMIT 1",
-        (pid, qtd),
-    )
-    r = cursor.fetchone()
-    return float(r["preco"]) if r else None
+    # busca binária no índice em memória (carregado uma vez por conexão)
+    return get_indice(conn).preco(produto_nome, quantidade)
 
 from total_calculator import TotalCalculator
 
@@ -206,87 +152,143 @@ class OrcamentoApp(tk.Tk):
         self.proposta_completa = tk.StringVar()
         self.data_label = tk.StringVar(value=self.data_orcamento)
         self.total_valor = tk.StringVar(value="R$ 0,00")
-        self.servicos = []
+        # rastreamento de desempenho (ORCAMENTO_RASTREAR ou menu Diagnóstico)
+        self.rastreamento_var = tk.BooleanVar(value=rastreador.configurar_pelo_ambiente())
+        # serviços do orçamento (colunas compactas + total acumulado)
+        self.servicos = Orcamento()
 
         # Banco de dados
         self.conn = get_conn()
         init_db(self.conn)
-        self._corrigir_estrutura_produtos()
+        # repositório do catálogo (unidade de trabalho sobre a conexão)
+        self.repo = get_repositorio(self.conn)
+        # índice de faixas em memória (preço por quantidade sem consultar o DB)
+        self.indice_faixas = get_indice(self.conn)
         # loader de produtos (orientado a objeto)
         self.produto_loader = CarregarProduto(self) if CarregarProduto else None
 
         # Produto selecionado
         self.produto_selecionado = tk.StringVar()
         self.produtos_lista = []
+        # busca por digitação no combobox de produtos
+        self.busca_produtos = IndiceBusca()
 
         # Limpeza (opcional)
         self.clean = Clean(self) if Clean else None
+        # geração de DOCX em segundo plano (features.geracao_docx)
+        self._geracao = None
 
         # Monta interface (UI movida para UI.AppUI)
         if AppUI is None:
             messagebox.showerror("Erro", "Módulo UI.py não encontrado — interface não construída.")
         else:
             AppUI(self)
+        # orçamento em andamento salvo no banco (recupera o da última sessão)
+        self.diario_orcamento = None
+        self._cabecalho_after = None
+        self._recuperar_orcamento()
+        # tabela de serviços incremental (diffs por linha + total acumulado)
+        self.tabela_servicos = TabelaServicos(self)
+        self.tabela_servicos.diario = self.diario_orcamento
         self._refresh_proposta()
         self._refresh_total()
         self._atualizar_produtos()
 
         # protocolo de fechamento
         self.protocol("WM_DELETE_WINDOW", self.on_close)
-
-    # ==================== Banco de Dados (compatibilidade atualizada) ====================
-    def _corrigir_estrutura_produtos(self):
-        cursor = self.conn.cursor()
-        cursor.execute("PRAGMA table_info(produtos)")
-        cols_info = cursor.fetchall()
-        existing_cols = [c[1] for c in cols_info]
-
-        def add_col(col_def):
-            try:
-                cursor.execute(f"ALTER TABLE produtos ADD COLUMN {col_def}")
-            except Exception:
-                pass
-
-        needed_cols = {
-            "tipo": "tipo TEXT",
-            "largura": "largura REAL",
-            "altura": "altura REAL",
-            "preco_m2": "preco_m2 REAL",
-            "preco_m": "preco_m REAL",
-            "preco_unit": "preco_unit REAL",
-            "tiers": "tiers TEXT",
-        }
-        for col_name, col_def in needed_cols.items():
-            if col_name not in existing_cols:
-                add_col(col_def)
-        self.conn.commit()
+        self.vigia = VigiaTravamentos(self, limite_ms=LIMITE_TRAVAMENTO_MS)
+        self.vigia.iniciar()
+        if self.diario_orcamento is not None:
+            for var in (self.cliente, self.numero_proposta, self.data_label):
+                var.trace_add('write', self._agendar_cabecalho)
+            self.after(INTERVALO_COMPACTACAO_MS, self._compactar_orcamento)
+
+    # ---------------- orçamento em andamento (autosave) ----------------
+    def _recuperar_orcamento(self):
+        try:
+            self.diario_orcamento, cab, servicos = DiarioOrcamento.recuperar_ou_criar(DB_PATH)
+        except sqlite3.Error as e:
+            messagebox.showwarning("Aviso", f"Orçamento não será salvo automaticamente:\n{e}")
+            return
+        if self.diario_orcamento.descartadas:
+            messagebox.showwarning(
+                "Aviso",
+                f"{self.diario_orcamento.descartadas} alteração(ões) do orçamento salvo não puderam ser "
+                "recuperadas; o orçamento foi aberto como estava antes delas.",
+            )
+        self.servicos = servicos
+        if cab['cliente']:
+            self.cliente.set(cab['cliente'])
+        if cab['numero']:
+            self.numero_proposta.set(cab['numero'])
+        if cab['data']:
+            self.data_label.set(cab['data'])
+
+    def _agendar_cabecalho(self, *args):
+        # grava o cabeçalho só quando a digitação para
+        if self._cabecalho_after is not None:
+            self.after_cancel(self._cabecalho_after)
+        self._cabecalho_after = self.after(ATRASO_CABECALHO_MS, self._salvar_cabecalho)
+
+    def _salvar_cabecalho(self):
+        self._cabecalho_after = None
+        self.diario_orcamento.cabecalho(self.cliente.get(), self.numero_proposta.get(), self.data_label.get())
+
+    def _compactar_orcamento(self):
+        self.diario_orcamento.compactar_em_segundo_plano(minimo=MINIMO_COMPACTACAO)
+        self.after(INTERVALO_COMPACTACAO_MS, self._compactar_orcamento)
 
     # ---------------- DB helpers (produtos table) ----------------
     def adicionar_produto_db(self, nome, tipo, preco_m2=None, preco_m=None, preco_unit=None, tiers=None, largura=None, altura=None):
-        cursor = self.conn.cursor()
-        tiers_json = json.dumps(tiers, ensure_ascii=False) if tiers else None
-        cursor.execute(
-            "INSERT OR REPLACE INTO produtos (nome, tipo, largura, altura, preco_m2, preco_m, preco_unit, tiers) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (nome, tipo, largura, altura, preco_m2, preco_m, preco_unit, tiers_json),
-        )
-        self.conn.commit()
-
-        # se for unit e tiver faixas (ou não), garantimos tabela produtos_unitarios esteja consistente
-        if tipo == 'unit':
-            ensure_produto_unitario(self.conn, nome)
+        with self.repo.transacao():
+            self.repo.salvar_produto(
+                nome, tipo, largura=largura, altura=altura,
+                preco_m2=preco_m2, preco_m=preco_m, preco_unit=preco_unit,
+            )
+            # faixas no formato legado ([{"min", "max", "price"}]) viram faixas_unitarias
+            if tiers and tipo == 'unit':
+                for qmin, qmax, preco in faixas_do_tiers(tiers)[0]:
+                    self.repo.add_faixa(nome, qmin, qmax, preco)
 
-        self._atualizar_produtos()
+        def _atualizar_busca():
+            self.busca_produtos.adicionar(nome)
+            self._filtrar_produtos()
+        # se estiver dentro de uma transação (ex.: popup), só após o commit
+        self.repo.apos_commit(_atualizar_busca)
 
     def _atualizar_produtos(self):
+        """Recarrega o índice de busca com todo o catálogo (carga inicial)."""
         cursor = self.conn.cursor()
-        cursor.execute("SELECT nome FROM produtos ORDER BY nome")
-        produtos = [row[0] for row in cursor.fetchall()]
-        self.produtos_lista = produtos
+        cursor.execute("SELECT nome FROM produtos")
+        self.busca_produtos.carregar([row[0] for row in cursor.fetchall()])
+        self._filtrar_produtos()
+
+    # quantos produtos o combobox mostra por vez
+    LIMITE_BUSCA_PRODUTOS = 50
+
+    def _filtrar_produtos(self, event=None):
+        """Mostra no combobox os melhores resultados para o texto digitado."""
+        if event is not None and event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        texto = self.produto_selecionado.get()
+        # texto igual a um produto cadastrado: lista completa desde o início
+        if texto in self.busca_produtos:
+            texto = ''
+        self.produtos_lista = self.busca_produtos.buscar(texto, self.LIMITE_BUSCA_PRODUTOS)
         try:
-            self.cb_produtos["values"] = produtos
+            self.cb_produtos["values"] = self.produtos_lista
         except Exception:
             pass
 
+    def _selecionar_produto_digitado(self, event=None):
+        """Enter no combobox: escolhe o primeiro resultado e carrega o produto."""
+        if self.produto_selecionado.get() not in self.busca_produtos:
+            if not self.produtos_lista:
+                return
+            self.produto_selecionado.set(self.produtos_lista[0])
+        self.carregar_produto()
+
+    @rastreado()
     def carregar_produto(self, event=None):
         if self.produto_loader:
             return self.produto_loader.carregar_produto(event)
@@ -301,14 +303,11 @@ class OrcamentoApp(tk.Tk):
             return
         if not messagebox.askyesno("Confirmar", f"Deseja realmente remover o produto '{nome}'?"):
             return
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM produtos WHERE nome = ?", (nome,))
-        # removemos também das tabelas unitárias para manter consistente
-        delete_produto_unitario(self.conn, nome)
-        self.conn.commit()
+        self.repo.remover_produto(nome)
+        self.busca_produtos.remover(nome)
         messagebox.showinfo("Sucesso", f"Produto '{nome}' removido com sucesso.")
-        self._atualizar_produtos()
         self.produto_selecionado.set("")
+        self._filtrar_produtos()
         try:
             self.cb_produtos.set("")
         except Exception:
@@ -321,29 +320,27 @@ class OrcamentoApp(tk.Tk):
     def limpar_todos_produtos_db(self):
         if not messagebox.askyesno("Confirmar", "Deseja realmente apagar TODOS os produtos cadastrados?"):
             return
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM produtos")
-        cursor.execute("DELETE FROM produtos_unitarios")
-        cursor.execute("DELETE FROM faixas_unitarias")
-        self.conn.commit()
+        self.repo.limpar_catalogo()
+        self.busca_produtos.limpar()
         messagebox.showinfo("Sucesso", "Todos os produtos foram removidos.")
-        self._atualizar_produtos()
+        self._filtrar_produtos()
         try:
             self._clear_produto_inputs()
         except Exception:
             pass
     
     def limpar_servicos(self):
-        """Remove todos os serviços da treeview e zera o total."""
-        for item in self.tree_servicos.get_children():
-            self.tree_servicos.delete(item)
-
-        self.ent_total.delete(0, tk.END)
-        self.ent_total.insert(0, "0.00")
+        """Remove todos os serviços (tabela, diário do autosave) e zera o total."""
+        self.tabela_servicos.limpar()
+        self._refresh_total()
 
     # ==================== Cálculos ====================
+    @rastreado()
     def calcular_total(self):
-        calculator = TotalCalculator(
+        self._calculadora().calcular_total()
+
+    def _calculadora(self):
+        return TotalCalculator(
             self.produto_selecionado,
             self.ent_qtd,
             self.ent_preco,
@@ -357,24 +354,19 @@ class OrcamentoApp(tk.Tk):
             self.struct_var,
             self.ent_struct,
         )
-        calculator.calcular_total()
 
     # bind da quantidade para auto ajuste do preço em produtos unitários
+    @rastreado()
     def _on_qtd_change(self, event=None):
         nome = self.produto_selecionado.get()
         if not nome:
             return
 
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT tipo FROM produtos WHERE nome = ?", (nome,))
-        r = cursor.fetchone()
-        tipo = r[0] if r else None
-
         # delegate to produto_loader when available
         if self.produto_loader:
             return self.produto_loader.on_qtd_change(event)
 
-        if tipo == 'unit':
+        if self.indice_faixas.tipo(nome) == 'unit':
             qtd = self.ent_qtd.get().strip()
             preco = get_preco_por_quantidade(self.conn, nome, qtd)
             if preco is not None:
@@ -423,11 +415,15 @@ class OrcamentoApp(tk.Tk):
         self.proposta_completa.set(f"{nro}-{self.ano_atual}")
 
     # ==================== Adicionar serviço ====================
+    @rastreado()
     def adicionar_servico(self):
+        # preço da faixa ainda no debounce da quantidade: aplica antes de ler o total
+        if self.produto_loader:
+            self.produto_loader.concluir_consulta_qtd()
         desc = self.ent_desc.get().strip().upper()
         qtd = self.ent_qtd.get().strip()
-        preco = self.ent_preco.get().strip().replace(',', '.')
-        total = self.ent_total.get().strip().replace(',', '.')
+        preco = self.ent_preco.get().strip()
+        total = self.ent_total.get().strip()
         larg = self.ent_larg.get().strip()
         alt = self.ent_alt.get().strip()
 
@@ -439,26 +435,26 @@ class OrcamentoApp(tk.Tk):
             return
         if not total:
             self.calcular_total()
+            total = self.ent_total.get().strip()
 
         try:
             qtd_i = int(qtd) if qtd else 1
-            preco_f = float(preco) if preco else 0.0
-            total_f = float(total)
+            # dinheiro em centavos inteiros daqui em diante (features.dinheiro)
+            preco_c = centavos(preco)
+            if not total:
+                raise ValueError('total vazio')
+            total_c = centavos(total)
         except Exception:
             messagebox.showwarning('Aviso', 'Valores numéricos inválidos')
             return
 
-        item = {
-            'Descrição': desc,
-            'Largura': larg,
-            'Altura': alt,
-            'Quantidade': qtd_i,
-            'Preço': preco_f,
-            'Total (R$)': total_f
-        }
-
-        self.servicos.append(item)
-        self._refresh_tree()
+        # origem do preço (produto do catálogo + adicional), para reprecificar depois
+        linha = self._calculadora().linha_preco()
+        produto = linha.produto if linha.produto in self.busca_produtos else None
+        adicional = (linha.instalacao or 0.0) + (linha.estrutura or 0.0)
+        item = ItemOrcamento(desc, larg, alt, qtd_i, preco_c, total_c, produto, adicional)
+
+        self.tabela_servicos.inserir(item)
         self._clear_inputs()
         self._refresh_total()
 
@@ -470,15 +466,12 @@ class OrcamentoApp(tk.Tk):
                 pass
 
     def _refresh_tree(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        for idx, s in enumerate(self.servicos, start=1):
-            self.tree.insert('', 'end', values=(idx, s['Descrição'], s['Largura'], s['Altura'],
-                                                s['Quantidade'], f"R$ {s['Preço']:.2f}", f"R$ {s['Total (R$)']:.2f}"))
+        # reexibe apenas a janela visível (ver TabelaServicos)
+        self.tabela_servicos.recarregar()
 
     def _refresh_total(self):
-        total = sum(item['Total (R$)'] for item in self.servicos)
-        self.total_valor.set(f"R$ {total:,.2f}")
+        # total acumulado mantido pela TabelaServicos a cada inserção/remoção
+        self.total_valor.set(f"R$ {formatar(self.tabela_servicos.total, milhar=True)}")
 
     def editar_selecionado(self):
         sel = self.tree.selection()
@@ -487,14 +480,20 @@ class OrcamentoApp(tk.Tk):
             return
         idx = int(self.tree.item(sel)['values'][0]) - 1
         item = self.servicos[idx]
-        self.ent_desc.insert(0, item['Descrição'])
-        self.ent_larg.insert(0, item['Largura'])
-        self.ent_alt.insert(0, item['Altura'])
-        self.ent_qtd.insert(0, str(item['Quantidade']))
-        self.ent_preco.insert(0, f"{item['Preço']:.2f}")
-        self.ent_total.insert(0, f"{item['Total (R$)']:.2f}")
-        del self.servicos[idx]
-        self._refresh_tree()
+        self.ent_desc.insert(0, item.descricao)
+        self.ent_larg.insert(0, item.largura)
+        self.ent_alt.insert(0, item.altura)
+        self.ent_qtd.insert(0, str(item.quantidade))
+        self.ent_preco.insert(0, formatar(item.preco))
+        self.ent_total.insert(0, formatar(item.total))
+        # volta a origem do preço para os campos, para que a linha readicionada a mantenha
+        self.produto_selecionado.set(item.produto or '')
+        if item.adicional:
+            self.install_var.set(True)
+            self.toggle_install()
+            self.ent_install.delete(0, tk.END)
+            self.ent_install.insert(0, f"{item.adicional:.2f}")
+        self.tabela_servicos.remover(idx)
         self._refresh_total()
 
     def remover_selecionado(self):
@@ -503,17 +502,67 @@ class OrcamentoApp(tk.Tk):
             messagebox.showinfo('Info', 'Nenhum item selecionado')
             return
         idx = int(self.tree.item(sel)['values'][0]) - 1
-        del self.servicos[idx]
-        self._refresh_tree()
+        self.tabela_servicos.remover(idx)
+        self._refresh_total()
+
+    def reprecificar_orcamento(self):
+        """Recalcula o orçamento pelo catálogo atual e mostra a diferença antes de aplicar."""
+        if not self.servicos:
+            messagebox.showinfo('Info', 'Adicione pelo menos um serviço')
+            return
+        try:
+            resultado = reprecificar(self.conn, self.servicos, self.indice_faixas)
+        except sqlite3.Error as e:
+            messagebox.showerror('Erro', f'Não foi possível consultar o catálogo: {e}')
+            return
+        if not resultado.alteracoes:
+            messagebox.showinfo('Reprecificar', resultado.resumo())
+            return
+        if PainelReprecificacao is None:
+            if messagebox.askyesno('Reprecificar', resultado.resumo() + '\n\nAplicar os novos preços?'):
+                self._aplicar_reprecificacao(resultado)
+            return
+        PainelReprecificacao(self, resultado, self._aplicar_reprecificacao)
+
+    def _aplicar_reprecificacao(self, resultado):
+        self.tabela_servicos.atualizar_varios(itens_reprecificados(self.servicos, resultado))
         self._refresh_total()
 
     def limpar_tudo(self):
         if messagebox.askyesno('Confirmar', 'Deseja remover todos os serviços?'):
-            self.servicos.clear()
-            self._refresh_tree()
+            self.tabela_servicos.limpar()
             self._refresh_total()
 
 
+    # ==================== Importar / exportar catálogo ====================
+    def importar_catalogo(self):
+        path = filedialog.askopenfilename(title='Importar catálogo', filetypes=[('Catálogo', '*.csv *.json')])
+        if not path:
+            return
+        upsert = messagebox.askyesno('Importar', 'Atualizar produtos já cadastrados com o mesmo nome (substituindo suas faixas)?')
+        try:
+            resumo = importar_catalogo(self.conn, path, upsert=upsert)
+        except ErroImportacao as e:
+            messagebox.showerror('Erro', f'Catálogo não importado:\n{e}')
+            return
+        except Exception as e:
+            messagebox.showerror('Erro', f'Não foi possível importar o catálogo: {e}')
+            return
+        # o índice de faixas já foi recarregado pelo repositório (apos_commit)
+        self._atualizar_produtos()
+        messagebox.showinfo('Sucesso', f"{resumo['inseridos']} produto(s) inserido(s), {resumo['atualizados']} atualizado(s), {resumo['faixas']} faixa(s).")
+
+    def exportar_catalogo(self):
+        path = filedialog.asksaveasfilename(title='Exportar catálogo', defaultextension='.csv', filetypes=[('CSV', '*.csv'), ('JSON', '*.json')])
+        if not path:
+            return
+        try:
+            n_produtos, n_faixas = exportar_catalogo(self.conn, path)
+        except Exception as e:
+            messagebox.showerror('Erro', f'Não foi possível exportar o catálogo: {e}')
+            return
+        messagebox.showinfo('Exportado', f'{n_produtos} produto(s) e {n_faixas} faixa(s) salvos em {path}')
+
     def novo_produto_popup(self):
         if NovoProdutoPopup is None:
             messagebox.showerror("Erro", "Classe NovoProdutoPopup não encontrada.")
@@ -541,6 +590,10 @@ class OrcamentoApp(tk.Tk):
 
     # ==================== Gerar documento (usa docxGenerator se disponível) ====================
     def gerar_documento(self):
+        if self._geracao is not None and self._geracao.ativa:
+            # já há uma geração em andamento: traz a janela de progresso para frente
+            self._geracao.janela.lift()
+            return
         if docxGenerator:
             generator = docxGenerator(
                 template_path=self.template_path.get() if isinstance(self.template_path, tk.StringVar) else self.template_path,
@@ -550,17 +603,120 @@ class OrcamentoApp(tk.Tk):
                 data_label=self.data_label.get() if isinstance(self.data_label, tk.StringVar) else self.data_label,
                 servicos=self.servicos
             )
-            generator.gerar_docx()
+            # roda em segundo plano; a janela continua respondendo
+            self._geracao = generator.gerar_docx(parent=self, ao_concluir=self._registrar_proposta)
         else:
             # fallback simples: exporta CSV
-            df = pd.DataFrame(self.servicos)
             fname = filedialog.asksaveasfilename(defaultextension='.csv', filetypes=[('CSV','*.csv')])
             if not fname:
                 return
-            df.to_csv(fname, index=False)
+            with open(fname, 'w', newline='', encoding='utf-8') as f:
+                w = csv.writer(f)
+                w.writerow(CHAVES)
+                w.writerows((desc, larg, alt, qtd, formatar(preco), formatar(total))
+                            for desc, larg, alt, qtd, preco, total in self.servicos.linhas())
             messagebox.showinfo('Exportado', f'Arquivo salvo em {fname}')
 
+    def _registrar_proposta(self, gerador, save_path):
+        """Indexa a proposta recém-gerada no histórico pesquisável."""
+        try:
+            indexar_proposta(
+                self.conn, gerador.cliente, gerador.proposta_completa, gerador.data_label,
+                gerador.servicos, arquivo=os.path.abspath(save_path),
+                orcamento_id=self.diario_orcamento.orcamento_id if self.diario_orcamento else None,
+            )
+        except Exception as e:
+            messagebox.showwarning('Aviso', f'Proposta gerada, mas não foi registrada no histórico:\n{e}')
+
+    def abrir_busca_propostas(self):
+        if PainelPropostas is None:
+            messagebox.showerror("Erro", "Módulo painel_propostas.py não encontrado.")
+            return
+        PainelPropostas(self, self.conn)
+
+    # ==================== Diagnóstico ====================
+    def alternar_rastreamento(self):
+        if self.rastreamento_var.get():
+            rastreador.ativar()
+            messagebox.showinfo('Rastreamento', f'Rastreamento ligado.\nSpans em: {os.path.abspath(rastreador.caminho)}')
+        else:
+            try:
+                rastreador.desativar()
+            except OSError as e:
+                messagebox.showerror('Erro', f'Não foi possível gravar o rastreamento: {e}')
+
+    def mostrar_resumo_rastreamento(self):
+        resumo = rastreador.resumo()
+        if not resumo:
+            messagebox.showinfo('Rastreamento', 'Nenhum span registrado. Ligue em Diagnóstico > Rastrear desempenho.')
+            return
+        linhas = [f"{'n':>6} {'p50 ms':>9} {'p95 ms':>9}  span"]
+        for nome, r in list(resumo.items())[:20]:
+            linhas.append(f"{r['n']:>6} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f}  {nome[:60]}")
+        try:
+            rastreador.gravar()
+            linhas.append(f'\nResumo completo: {os.path.abspath(rastreador.caminho_resumo)}')
+        except OSError as e:
+            linhas.append(f'\nNão foi possível gravar o resumo: {e}')
+        messagebox.showinfo('Resumo do rastreamento', '\n'.join(linhas))
+
+    def verificar_faixas(self):
+        try:
+            rel = verificar_catalogo(self.conn)
+        except sqlite3.Error as e:
+            messagebox.showerror('Erro', f'Não foi possível verificar as faixas: {e}')
+            return
+        mostrar = messagebox.showinfo if rel.ok else messagebox.showwarning
+        mostrar('Verificação das faixas', rel.texto(limite=25))
+
+    def migrar_faixas_legadas(self):
+        try:
+            rel = migrar_tiers(self.conn)
+            ajustaveis = sum(1 for c in rel.conflitos if c.tipo == FAIXAS_AJUSTADAS)
+            if ajustaveis and messagebox.askyesno(
+                'Migração das faixas legadas',
+                rel.texto(limite=25) + f"\n\nConverter mesmo assim o(s) {ajustaveis} produto(s) cujas faixas "
+                "precisam de ajuste? Sobreposições ficam com a primeira faixa do JSON; faixas inválidas "
+                "ou ilegíveis são descartadas.",
+            ):
+                rel = migrar_tiers(self.conn, ajustar=True)
+            elif ajustaveis:
+                return
+        except sqlite3.Error as e:
+            messagebox.showerror('Erro', f'Não foi possível migrar as faixas legadas: {e}')
+            return
+        mostrar = messagebox.showwarning if rel.conflitos else messagebox.showinfo
+        mostrar('Migração das faixas legadas', rel.texto(limite=25))
+
+    def mostrar_travamentos(self):
+        caminho = os.path.abspath(self.vigia.caminho)
+        if not os.path.isfile(caminho):
+            messagebox.showinfo('Travamentos', f'Nenhum travamento acima de {LIMITE_TRAVAMENTO_MS} ms registrado.')
+            return
+        messagebox.showinfo('Travamentos', f'{self.vigia.travamentos} travamento(s) nesta sessão.\nPilhas em: {caminho}')
+
     def on_close(self):
+        self.vigia.parar()
+        if self._geracao is not None and self._geracao.ativa:
+            self._geracao.cancelar()
+        if self.diario_orcamento is not None:
+            if self._cabecalho_after is not None:
+                self.after_cancel(self._cabecalho_after)
+                self._salvar_cabecalho()
+            try:
+                self.diario_orcamento.fechar()
+            except sqlite3.Error:
+                pass  # o diário fica para a próxima abertura
+        if self.produto_loader:
+            self.produto_loader.encerrar()
+        if rastreador.ativo:
+            try:
+                rastreador.desativar()
+            except OSError:
+                pass
+        descartar_indice(self.conn)
+        descartar_repositorio(self.conn)
+        descartar_regras(self.conn)
         try:
             self.conn.close()
         except Exception:
@@ -1,6 +1,9 @@
 import sqlite3
 import tkinter as tk
 
+from features.consulta_adiada import ConsultaAdiada
+from features.faixas_index import get_indice
+
 
 class CarregarProduto:
     """Classe responsável por carregar dados do produto na interface.
@@ -12,51 +15,32 @@ class CarregarProduto:
         self.app = app
         # usa a conexão já aberta pela aplicação
         self.conn = getattr(app, 'conn', None)
+        # digitação da quantidade: debounce + busca do preço fora da thread do Tk
+        self._consulta_qtd = None
 
     def _get_faixas_por_produto(self, produto_nome):
         if not produto_nome or not self.conn:
             return []
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id FROM produtos_unitarios WHERE nome = ?", (produto_nome,))
-        row = cursor.fetchone()
-        if not row:
-            return []
-        pid = row[0]
-        cursor.execute(
-            "SELECT id, qtd_min, qtd_max, preco FROM faixas_unitarias WHERE produto_id = ? ORDER BY qtd_min",
-            (pid,)
-        )
-        return [dict(r) for r in cursor.fetchall()]
+        return get_indice(self.conn).faixas(produto_nome)
 
     def _get_preco_por_quantidade(self, produto_nome, quantidade):
         if not produto_nome or not self.conn:
             return None
-        try:
-            qtd = int(quantidade)
-        except Exception:
-            return None
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id FROM produtos_unitarios WHERE nome = ?", (produto_nome,))
-        row = cursor.fetchone()
-        if not row:
-            return None
-        pid = row[0]
-        cursor.execute(
-            "SELECT preco FROM faixas_unitarias WHERE produto_id = ? AND ? BETWEEN qtd_min AND qtd_max LIMIT 1",
-            (pid, qtd),
-        )
-        r = cursor.fetchone()
-        return float(r[0]) if r else None
+        # busca binária no índice em memória, sem consultar o DB
+        return get_indice(self.conn).preco(produto_nome, quantidade)
 
     def carregar_produto(self, event=None):
         nome = self.app.produto_selecionado.get()
         if not nome:
             return
+        # descarta preço pendente de outro produto
+        if self._consulta_qtd is not None:
+            self._consulta_qtd.cancelar()
         cursor = self.conn.cursor()
-        cursor.execute("SELECT tipo, largura, altura, preco_m2, preco_m, preco_unit, tiers FROM produtos WHERE nome = ?", (nome,))
+        cursor.execute("SELECT tipo, largura, altura, preco_m2, preco_m, preco_unit FROM produtos WHERE nome = ?", (nome,))
         result = cursor.fetchone()
         if result:
-            tipo, largura, altura, preco_m2, preco_m, preco_unit, tiers_json = result
+            tipo, largura, altura, preco_m2, preco_m, preco_unit = result
             # atualiza campos da UI (usa referências da app)
             try:
                 self.app.ent_desc.delete(0, tk.END)
@@ -139,19 +123,46 @@ class CarregarProduto:
         nome = self.app.produto_selecionado.get()
         if not nome:
             return
+        if self._consulta_qtd is None:
+            self._consulta_qtd = ConsultaAdiada(self.app, self._resolver_preco_qtd, self._aplicar_preco_qtd)
+        # o índice é obtido aqui (thread do Tk); a thread de trabalho só o lê
+        self._consulta_qtd.agendar(get_indice(self.conn), nome, self.app.ent_qtd.get().strip())
 
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT tipo FROM produtos WHERE nome = ?", (nome,))
-        r = cursor.fetchone()
-        tipo = r[0] if r else None
-
-        if tipo == 'unit':
-            qtd = self.app.ent_qtd.get().strip()
-            preco = self._get_preco_por_quantidade(nome, qtd)
-            if preco is not None:
-                try:
-                    self.app.ent_preco.delete(0, tk.END)
-                    self.app.ent_preco.insert(0, f"{preco:.2f}")
-                    self.app.calcular_total()
-                except Exception:
-                    pass
+    def concluir_consulta_qtd(self):
+        """Aplica já o preço da faixa ainda pendente no debounce (antes de ler o total, ao adicionar).
+
+        A consulta adiada é cancelada e o preço é resolvido na thread do Tk:
+        o índice responde em O(1).
+        """
+        consulta = self._consulta_qtd
+        if consulta is None or not consulta.pendente:
+            return
+        consulta.cancelar()
+        nome = self.app.produto_selecionado.get()
+        if not nome:
+            return
+        self._aplicar_preco_qtd(self._resolver_preco_qtd(get_indice(self.conn), nome, self.app.ent_qtd.get().strip()))
+
+    @staticmethod
+    def _resolver_preco_qtd(indice, nome, qtd):
+        """Executado na thread de trabalho: preço da faixa ou None."""
+        if indice.tipo(nome) != 'unit':
+            return None
+        return indice.preco(nome, qtd)
+
+    def _aplicar_preco_qtd(self, preco):
+        """Executado na thread do Tk apenas para o resultado da última tecla."""
+        if preco is None:
+            return
+        try:
+            texto = f"{preco:.2f}"
+            if self.app.ent_preco.get() != texto:
+                self.app.ent_preco.delete(0, tk.END)
+                self.app.ent_preco.insert(0, texto)
+            self.app.calcular_total()
+        except Exception:
+            pass
+
+    def encerrar(self):
+        if self._consulta_qtd is not None:
+            self._consulta_qtd.encerrar()
@@ -0,0 +1,140 @@
+"""Índice em memória para busca de produtos enquanto se digita.
+
+Normaliza os nomes (sem acento, casefold) e mantém:
+- lista ordenada de nomes normalizados (prefixo do nome por busca binária);
+- lista ordenada de palavras (prefixo de qualquer palavra do nome);
+- trigramas -> nomes (trechos no meio do nome, a partir de 3 caracteres).
+
+Inserções e remoções são incrementais: não é preciso recarregar o catálogo.
+"""
+import heapq
+import unicodedata
+from bisect import bisect_left, insort
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos: 'Placa de Sinalização' -> 'placa de sinalizacao'."""
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold().strip()
+
+
+def _trigramas(norm):
+    return {norm[i:i + 3] for i in range(len(norm) - 2)}
+
+
+def _faixa_prefixo(lista, prefixo):
+    """Itera os itens de `lista` (ordenada por tupla) cujo primeiro campo começa com `prefixo`."""
+    i = bisect_left(lista, (prefixo,))
+    while i < len(lista) and lista[i][0].startswith(prefixo):
+        yield lista[i]
+        i += 1
+
+
+class IndiceBusca:
+    def __init__(self, nomes=()):
+        self.normalizados = {}  # nome -> normalizado
+        self.por_nome = []      # [(normalizado, nome)] ordenada
+        self.por_palavra = []   # [(palavra, nome)] ordenada
+        self.trigramas = {}     # trigrama -> {nome}
+        if nomes:
+            self.carregar(nomes)
+
+    def __len__(self):
+        return len(self.normalizados)
+
+    def __contains__(self, nome):
+        return nome in self.normalizados
+
+    def carregar(self, nomes):
+        """Reconstrói o índice inteiro (carga inicial)."""
+        self.normalizados = {}
+        self.trigramas = {}
+        por_nome = []
+        por_palavra = []
+        for nome in nomes:
+            norm = normalizar(nome)
+            self.normalizados[nome] = norm
+            por_nome.append((norm, nome))
+            por_palavra.extend((p, nome) for p in set(norm.split()))
+            for t in _trigramas(norm):
+                self.trigramas.setdefault(t, set()).add(nome)
+        por_nome.sort()
+        por_palavra.sort()
+        self.por_nome = por_nome
+        self.por_palavra = por_palavra
+
+    def adicionar(self, nome):
+        if nome in self.normalizados:
+            return
+        norm = normalizar(nome)
+        self.normalizados[nome] = norm
+        insort(self.por_nome, (norm, nome))
+        for p in set(norm.split()):
+            insort(self.por_palavra, (p, nome))
+        for t in _trigramas(norm):
+            self.trigramas.setdefault(t, set()).add(nome)
+
+    def remover(self, nome):
+        norm = self.normalizados.pop(nome, None)
+        if norm is None:
+            return
+        i = bisect_left(self.por_nome, (norm, nome))
+        if i < len(self.por_nome) and self.por_nome[i] == (norm, nome):
+            del self.por_nome[i]
+        for p in set(norm.split()):
+            i = bisect_left(self.por_palavra, (p, nome))
+            if i < len(self.por_palavra) and self.por_palavra[i] == (p, nome):
+                del self.por_palavra[i]
+        for t in _trigramas(norm):
+            nomes = self.trigramas.get(t)
+            if nomes is not None:
+                nomes.discard(nome)
+                if not nomes:
+                    del self.trigramas[t]
+
+    def limpar(self):
+        self.carregar(())
+
+    def buscar(self, texto, limite=50):
+        """Até `limite` nomes: primeiro os que começam com o texto, depois os que
+        têm uma palavra que começa com ele, depois os que o contêm."""
+        q = normalizar(texto or '')
+        if not q:
+            return [nome for _, nome in self.por_nome[:limite]]
+
+        resultado = []
+        vistos = set()
+
+        def _add(nome):
+            if nome not in vistos:
+                vistos.add(nome)
+                resultado.append(nome)
+            return len(resultado) >= limite
+
+        for _, nome in _faixa_prefixo(self.por_nome, q):
+            if _add(nome):
+                return resultado
+
+        # prefixo de palavra: candidatos pela primeira palavra digitada; as demais
+        # também precisam ser prefixo de alguma palavra do nome
+        palavras = q.split()
+        for _, nome in _faixa_prefixo(self.por_palavra, palavras[0]):
+            if len(palavras) > 1:
+                do_nome = self.normalizados[nome].split()
+                if not all(any(w.startswith(p) for w in do_nome) for p in palavras[1:]):
+                    continue
+            if _add(nome):
+                return resultado
+
+        # trecho no meio do nome: interseção dos trigramas e conferência final
+        if len(q) >= 3:
+            conjuntos = [self.trigramas.get(t) for t in _trigramas(q)]
+            if all(conjuntos):
+                conjuntos.sort(key=len)
+                candidatos = set(conjuntos[0]).intersection(*conjuntos[1:])
+                achados = (n for n in candidatos if q in self.normalizados[n])
+                # os já incluídos acima podem reaparecer: pede folga para eles
+                for nome in heapq.nsmallest(limite + len(vistos), achados, key=self.normalizados.get):
+                    if _add(nome):
+                        return resultado
+        return resultado
@@ -0,0 +1,260 @@
+"""Importação/exportação do catálogo completo (produtos + faixas unitárias).
+
+Formatos:
+- CSV: uma linha por faixa (produtos sem faixas ocupam uma linha com as
+  colunas de faixa vazias). Colunas: nome, tipo, largura, altura, preco_m2,
+  preco_m, preco_unit, qtd_min, qtd_max, preco_faixa.
+- JSON: lista de produtos, cada um com a lista `faixas`
+  ([{"qtd_min", "qtd_max", "preco"}]) e, opcionalmente, o `tiers` legado
+  ([{"min", "max", "price"}]), que na importação vira faixas quando o
+  produto unitário não traz `faixas`.
+
+A importação valida tudo (tipos, faixas invertidas e sobrepostas) antes de
+gravar e grava numa única transação do repositório (`features.repositorio`)
+com `executemany`; o índice de faixas e as regras de preço são atualizados
+após o commit.
+"""
+import csv
+import json
+
+from features.faixas_validacao import validar_faixas
+from features.migracao_tiers import faixas_do_tiers
+from features.repositorio import get_repositorio
+
+COLUNAS_PRODUTO = ('nome', 'tipo', 'largura', 'altura', 'preco_m2', 'preco_m', 'preco_unit')
+COLUNAS_CSV = COLUNAS_PRODUTO + ('qtd_min', 'qtd_max', 'preco_faixa')
+TIPOS_VALIDOS = ('unit', 'm2', 'm')
+
+
+class ErroImportacao(ValueError):
+    """Arquivo de catálogo inválido; `problemas` lista cada erro encontrado."""
+
+    def __init__(self, problemas):
+        self.problemas = problemas
+        resumo = '\n'.join(problemas[:20])
+        if len(problemas) > 20:
+            resumo += f'\n... e mais {len(problemas) - 20} problema(s)'
+        super().__init__(resumo)
+
+
+def _num(v, conv=float):
+    """Número de um campo do arquivo (None se vazio). Com `conv=int`, ValueError se não for inteiro ('10.7')."""
+    if v is None:
+        return None
+    if not isinstance(v, (int, float)):
+        v = str(v).strip()
+        if not v:
+            return None
+        v = float(v.replace(',', '.'))
+    if conv is int:
+        if not float(v).is_integer():
+            raise ValueError(f"quantidade não inteira: {v!r}")
+        return int(v)
+    return conv(v)
+
+
+# ----------------------- exportação -----------------------
+def _ler_catalogo(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {', '.join(COLUNAS_PRODUTO)}, tiers FROM produtos ORDER BY nome")
+    produtos = {}
+    for row in cursor.fetchall():
+        p = dict(zip(COLUNAS_PRODUTO, row[:-1]))
+        p['tiers'] = row[-1]
+        p['faixas'] = []
+        produtos[p['nome']] = p
+    cursor.execute(
+        "SELECT pu.nome, f.qtd_min, f.qtd_max, f.preco FROM faixas_unitarias f "
+        "JOIN produtos_unitarios pu ON pu.id = f.produto_id ORDER BY pu.nome, f.qtd_min"
+    )
+    for nome, qmin, qmax, preco in cursor.fetchall():
+        p = produtos.get(nome)
+        if p is None:
+            # faixas de um produto unitário sem linha em produtos
+            p = produtos[nome] = dict.fromkeys(COLUNAS_PRODUTO)
+            p.update(nome=nome, tipo='unit', tiers=None, faixas=[])
+        p['faixas'].append({'qtd_min': qmin, 'qtd_max': qmax, 'preco': preco})
+    return list(produtos.values())
+
+
+def exportar_catalogo(conn, path):
+    """Exporta o catálogo para `path` (.csv ou .json). Retorna (nº produtos, nº faixas)."""
+    produtos = _ler_catalogo(conn)
+    n_faixas = sum(len(p['faixas']) for p in produtos)
+    if path.lower().endswith('.csv'):
+        with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+            w = csv.writer(f)
+            w.writerow(COLUNAS_CSV)
+            for p in produtos:
+                base = [p[c] if p[c] is not None else '' for c in COLUNAS_PRODUTO]
+                if not p['faixas']:
+                    w.writerow(base + ['', '', ''])
+                for fx in p['faixas']:
+                    w.writerow(base + [fx['qtd_min'], fx['qtd_max'], fx['preco']])
+    else:
+        for p in produtos:
+            tiers = p.pop('tiers')
+            if tiers:
+                try:
+                    p['tiers'] = json.loads(tiers)
+                except Exception:
+                    pass
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(produtos, f, ensure_ascii=False, indent=1)
+    return len(produtos), n_faixas
+
+
+# ----------------------- importação -----------------------
+def ler_arquivo_catalogo(path):
+    """Lê o arquivo e retorna a lista de produtos (dicts com `faixas`), sem validar."""
+    if path.lower().endswith('.csv'):
+        produtos = {}
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            for linha, row in enumerate(csv.DictReader(f), start=2):
+                nome = (row.get('nome') or '').strip()
+                p = produtos.get(nome)
+                if p is None:
+                    p = produtos[nome] = {c: row.get(c) for c in COLUNAS_PRODUTO}
+                    p['nome'] = nome
+                    p['faixas'] = []
+                    p['_linha'] = linha
+                if any((row.get(c) or '').strip() for c in ('qtd_min', 'qtd_max', 'preco_faixa')):
+                    p['faixas'].append({
+                        'qtd_min': row.get('qtd_min'),
+                        'qtd_max': row.get('qtd_max'),
+                        'preco': row.get('preco_faixa'),
+                        '_linha': linha,
+                    })
+        return list(produtos.values())
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def validar_catalogo(produtos):
+    """Normaliza os valores e confere tudo de uma vez. Levanta ErroImportacao."""
+    problemas = []
+    validos = []
+    vistos = set()
+    for i, p in enumerate(produtos, start=1):
+        onde = f"linha {p['_linha']}" if '_linha' in p else f"produto #{i}"
+        nome = str(p.get('nome') or '').strip()
+        if not nome:
+            problemas.append(f"{onde}: nome vazio")
+            continue
+        if nome in vistos:
+            problemas.append(f"{onde}: produto '{nome}' repetido")
+            continue
+        vistos.add(nome)
+        tipo = (p.get('tipo') or 'unit').strip()
+        if tipo not in TIPOS_VALIDOS:
+            problemas.append(f"{onde}: tipo inválido '{tipo}' em '{nome}'")
+            continue
+        try:
+            registro = {
+                'nome': nome,
+                'tipo': tipo,
+                'largura': _num(p.get('largura')),
+                'altura': _num(p.get('altura')),
+                'preco_m2': _num(p.get('preco_m2')),
+                'preco_m': _num(p.get('preco_m')),
+                'preco_unit': _num(p.get('preco_unit')),
+            }
+        except ValueError:
+            problemas.append(f"{onde}: valor numérico inválido em '{nome}'")
+            continue
+        # a coluna legada não é mais gravada: `tiers` do arquivo vira faixas
+        registro['tiers'] = None
+        lista_faixas = p.get('faixas') or []
+        tiers = p.get('tiers')
+        if tiers and tipo == 'unit' and not lista_faixas:
+            try:
+                lista_faixas = [{'qtd_min': a, 'qtd_max': b, 'preco': c} for a, b, c in faixas_do_tiers(tiers)[0]]
+            except ValueError:
+                problemas.append(f"{onde}: tiers inválido em '{nome}'")
+                continue
+
+        faixas = []
+        for fx in lista_faixas:
+            onde_fx = f"linha {fx['_linha']}" if '_linha' in fx else onde
+            try:
+                qmin = _num(fx.get('qtd_min'), int)
+                qmax = _num(fx.get('qtd_max'), int)
+                preco = _num(fx.get('preco'))
+            except ValueError:
+                problemas.append(f"{onde_fx}: faixa com valor inválido em '{nome}'")
+                continue
+            if qmin is None or qmax is None or preco is None:
+                problemas.append(f"{onde_fx}: faixa incompleta em '{nome}'")
+                continue
+            if qmin <= 0 or qmin > qmax:
+                problemas.append(f"{onde_fx}: faixa inválida {qmin}-{qmax} em '{nome}'")
+                continue
+            faixas.append((qmin, qmax, preco))
+        # sobreposição: varredura ordenada (O(n log n)); faixas inválidas já foram descartadas
+        for pb in validar_faixas(faixas):
+            a, b = pb.faixa, pb.outra
+            problemas.append(f"{onde}: faixas {a[0]}-{a[1]} e {b[0]}-{b[1]} se sobrepõem em '{nome}'")
+        faixas.sort()
+        if faixas and tipo != 'unit':
+            problemas.append(f"{onde}: faixas informadas para produto '{nome}' do tipo '{tipo}'")
+        registro['faixas'] = faixas
+        validos.append(registro)
+    if problemas:
+        raise ErroImportacao(problemas)
+    return validos
+
+
+def importar_catalogo(conn, path, upsert=True):
+    """Importa o catálogo de `path` numa única transação.
+
+    Com `upsert=True` produtos já cadastrados (mesmo `nome`) são atualizados e
+    suas faixas substituídas pelas do arquivo; com `upsert=False` eles são
+    reportados como conflito e nada é gravado.
+    Retorna um dict com as contagens de produtos inseridos/atualizados e faixas.
+    """
+    produtos = validar_catalogo(ler_arquivo_catalogo(path))
+    cursor = conn.cursor()
+    cursor.execute("SELECT nome FROM produtos")
+    existentes = {r[0] for r in cursor.fetchall()}
+    conflitos = [p['nome'] for p in produtos if p['nome'] in existentes]
+    if conflitos and not upsert:
+        raise ErroImportacao([f"produto '{n}' já cadastrado" for n in conflitos])
+
+    unitarios = [p for p in produtos if p['tipo'] == 'unit']
+    # produtos que deixam de ser unitários perdem as faixas (como em `remover_produto`)
+    deixam_unit = [(p['nome'],) for p in produtos if p['tipo'] != 'unit' and p['nome'] in existentes]
+    repo = get_repositorio(conn)
+    with repo.transacao():
+        cursor.executemany(
+            "INSERT INTO produtos (nome, tipo, largura, altura, preco_m2, preco_m, preco_unit, tiers) "
+            "VALUES (:nome, :tipo, :largura, :altura, :preco_m2, :preco_m, :preco_unit, :tiers) "
+            "ON CONFLICT(nome) DO UPDATE SET tipo = excluded.tipo, largura = excluded.largura, "
+            "altura = excluded.altura, preco_m2 = excluded.preco_m2, preco_m = excluded.preco_m, "
+            "preco_unit = excluded.preco_unit, tiers = excluded.tiers",
+            produtos,
+        )
+        cursor.executemany(
+            "DELETE FROM faixas_unitarias WHERE produto_id IN (SELECT id FROM produtos_unitarios WHERE nome = ?)",
+            deixam_unit,
+        )
+        cursor.executemany("DELETE FROM produtos_unitarios WHERE nome = ?", deixam_unit)
+        cursor.executemany(
+            "INSERT OR IGNORE INTO produtos_unitarios (nome) VALUES (?)",
+            ((p['nome'],) for p in unitarios),
+        )
+        cursor.execute("SELECT nome, id FROM produtos_unitarios")
+        ids = dict(cursor.fetchall())
+        cursor.executemany(
+            "DELETE FROM faixas_unitarias WHERE produto_id = ?",
+            ((ids[p['nome']],) for p in unitarios),
+        )
+        cursor.executemany(
+            "INSERT INTO faixas_unitarias (produto_id, qtd_min, qtd_max, preco) VALUES (?, ?, ?, ?)",
+            ((ids[p['nome']], qmin, qmax, preco) for p in unitarios for qmin, qmax, preco in p['faixas']),
+        )
+        repo.catalogo_alterado()
+    return {
+        'inseridos': len(produtos) - len(conflitos),
+        'atualizados': len(conflitos),
+        'faixas': sum(len(p['faixas']) for p in unitarios),
+    }
@@ -0,0 +1,70 @@
+"""Consulta com debounce executada fora da thread do Tk.
+
+Cada chamada a `agendar` reinicia a janela de debounce; quando ela expira, a
+função roda numa thread de trabalho. O resultado volta para a thread do Tk
+por polling com `after()` (o Tk não é thread-safe) e só é aplicado se nenhuma
+chamada mais nova tiver sido agendada nesse meio tempo.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ConsultaAdiada:
+    def __init__(self, widget, funcao, aplicar, atraso_ms=150, intervalo_ms=10):
+        """
+        Args:
+            widget: qualquer widget Tk (usado para `after`/`after_cancel`)
+            funcao: executada na thread de trabalho com os args de `agendar`
+            aplicar: chamada na thread do Tk com o resultado da última consulta
+            atraso_ms: janela de debounce
+            intervalo_ms: intervalo do polling do resultado
+        """
+        self.widget = widget
+        self.funcao = funcao
+        self.aplicar = aplicar
+        self.atraso_ms = atraso_ms
+        self.intervalo_ms = intervalo_ms
+        self.geracao = 0
+        self.pendente = False  # há consulta agendada ou em andamento cujo resultado ainda vai ser aplicado
+        self._after_id = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='consulta')
+
+    def agendar(self, *args):
+        self.cancelar()
+        self.pendente = True
+        self._after_id = self.widget.after(self.atraso_ms, self._disparar, self.geracao, args)
+
+    def cancelar(self):
+        """Invalida a consulta pendente (se houver) e qualquer resultado em andamento."""
+        self.geracao += 1
+        self.pendente = False
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _disparar(self, geracao, args):
+        self._after_id = None
+        if geracao != self.geracao:
+            return
+        futuro = self._executor.submit(self.funcao, *args)
+        self._aguardar(geracao, futuro)
+
+    def _aguardar(self, geracao, futuro):
+        if geracao != self.geracao:
+            # resultado obsoleto: uma tecla mais nova já foi agendada
+            return
+        if not futuro.done():
+            self.widget.after(self.intervalo_ms, self._aguardar, geracao, futuro)
+            return
+        self.pendente = False
+        try:
+            resultado = futuro.result()
+        except Exception:
+            return
+        self.aplicar(resultado)
+
+    def encerrar(self):
+        self.cancelar()
+        self._executor.shutdown(wait=False, cancel_futures=True)
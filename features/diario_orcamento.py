@@ -0,0 +1,254 @@
+"""Orçamentos persistentes com diário (journal) de alterações.
+
+O estado salvo de um orçamento é o snapshot em `orcamento_itens` (+ o
+cabeçalho em `orcamentos`) seguido das entradas de `orcamento_diario`.
+Cada inclusão/edição/remoção de linha grava uma única entrada no diário,
+então o autosave custa O(1) em vez de reescrever o orçamento inteiro.
+Na abertura, o orçamento em andamento é reconstruído aplicando o diário
+sobre o snapshot. Entradas de linha são a tupla do item (preço e total em
+centavos); linhas com preço do catálogo levam também (produto, adicional),
+entradas antigas de seis campos continuam válidas. A compactação (aplicar o
+diário, reescrever o snapshot e apagar as entradas aplicadas) roda numa
+thread com conexão própria.
+"""
+import json
+import sqlite3
+import threading
+
+from features.migracoes import configurar_conexao
+from features.orcamento import ItemOrcamento, Orcamento
+
+OP_INSERIR = 'inserir'
+OP_ATUALIZAR = 'atualizar'
+OP_REMOVER = 'remover'
+OP_LIMPAR = 'limpar'
+OP_CABECALHO = 'cabecalho'
+
+STATUS_ABERTO = 'aberto'
+
+_COLUNAS_ITEM = 'descricao, largura, altura, quantidade, preco, total, produto, adicional'
+
+
+def _linha(item):
+    """(descricao, largura, altura, quantidade, preco, total[, produto, adicional]) de um item ou tupla."""
+    if isinstance(item, tuple):
+        return item
+    if not isinstance(item, ItemOrcamento):
+        item = ItemOrcamento.de_dict(item)
+    linha = (item.descricao, item.largura, item.altura, item.quantidade, item.preco, item.total)
+    if item.produto is None:
+        return linha
+    return linha + (item.produto, item.adicional)
+
+
+def _aplicar(orc, cabecalho, op, posicao, dados):
+    if op == OP_INSERIR:
+        orc.insert(posicao, ItemOrcamento(*json.loads(dados)))
+    elif op == OP_ATUALIZAR:
+        orc[posicao] = ItemOrcamento(*json.loads(dados))
+    elif op == OP_REMOVER:
+        orc.pop(posicao)
+    elif op == OP_LIMPAR:
+        orc.clear()
+    elif op == OP_CABECALHO:
+        cabecalho.update(json.loads(dados))
+
+
+def _snapshot(conn, orcamento_id):
+    row = conn.execute("SELECT cliente, numero, data FROM orcamentos WHERE id = ?", (orcamento_id,)).fetchone()
+    if row is None:
+        raise KeyError(orcamento_id)
+    cabecalho = {'cliente': row[0], 'numero': row[1], 'data': row[2]}
+    orc = Orcamento()
+    for linha in conn.execute(
+        f"SELECT {_COLUNAS_ITEM} FROM orcamento_itens WHERE orcamento_id = ? ORDER BY posicao",
+        (orcamento_id,),
+    ):
+        orc.append(ItemOrcamento(*linha))
+    return cabecalho, orc
+
+
+def carregar_orcamento(conn, orcamento_id):
+    """Snapshot + diário. Retorna (cabecalho, Orcamento, seq da última entrada, nº de entradas descartadas).
+
+    Uma entrada que não se aplica (diário fora de sincronia com as linhas)
+    é descartada junto com todas as seguintes: o orçamento fica como estava
+    antes dela, e a próxima compactação apaga as descartadas.
+    """
+    cabecalho, orc = _snapshot(conn, orcamento_id)
+    entradas = conn.execute(
+        "SELECT seq, op, posicao, dados FROM orcamento_diario WHERE orcamento_id = ? ORDER BY seq",
+        (orcamento_id,),
+    ).fetchall()
+    ultimo = entradas[-1][0] if entradas else 0
+    for i, (_, op, posicao, dados) in enumerate(entradas):
+        try:
+            _aplicar(orc, cabecalho, op, posicao, dados)
+        except (IndexError, TypeError, ValueError):
+            # a falha pode ter deixado `orc` pela metade: refaz só até a entrada anterior
+            cabecalho, orc = _snapshot(conn, orcamento_id)
+            for _, op, posicao, dados in entradas[:i]:
+                _aplicar(orc, cabecalho, op, posicao, dados)
+            return cabecalho, orc, ultimo, len(entradas) - i
+    return cabecalho, orc, ultimo, 0
+
+
+def compactar(conn, orcamento_id):
+    """Aplica o diário ao snapshot e apaga as entradas aplicadas, numa transação.
+
+    Retorna o número de entradas compactadas.
+    """
+    cursor = conn.cursor()
+    # IMMEDIATE: ninguém grava no diário entre a leitura e a limpeza
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cabecalho, orc, ultimo, _ = carregar_orcamento(conn, orcamento_id)
+        if not ultimo:
+            conn.rollback()
+            return 0
+        cursor.execute(
+            "UPDATE orcamentos SET cliente = ?, numero = ?, data = ?, atualizado_em = CURRENT_TIMESTAMP WHERE id = ?",
+            (cabecalho['cliente'], cabecalho['numero'], cabecalho['data'], orcamento_id),
+        )
+        cursor.execute("DELETE FROM orcamento_itens WHERE orcamento_id = ?", (orcamento_id,))
+        cursor.executemany(
+            f"INSERT INTO orcamento_itens (orcamento_id, posicao, {_COLUNAS_ITEM}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((orcamento_id, i) + linha for i, linha in enumerate(orc.linhas_completas())),
+        )
+        cursor.execute(
+            "DELETE FROM orcamento_diario WHERE orcamento_id = ? AND seq <= ?",
+            (orcamento_id, ultimo),
+        )
+        n = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return n
+
+
+class DiarioOrcamento:
+    """Autosave de um orçamento: cada alteração vira uma entrada no diário.
+
+    Usa uma conexão própria (separada da do catálogo), para que o commit de
+    cada entrada nunca encerre uma transação do repositório do catálogo.
+    """
+
+    def __init__(self, path, orcamento_id, conn=None):
+        self.path = path
+        self.orcamento_id = orcamento_id
+        self.conn = conn if conn is not None else _conectar(path)
+        self.pendentes = 0  # entradas gravadas desde a última compactação
+        self.descartadas = 0  # entradas que não puderam ser reaplicadas na recuperação
+        self._thread = None
+
+    @classmethod
+    def recuperar_ou_criar(cls, path):
+        """Reabre o último orçamento em andamento (ou cria um novo).
+
+        Retorna (diario, cabecalho, Orcamento) já com o diário aplicado;
+        `diario.descartadas` conta as entradas que não puderam ser reaplicadas.
+        """
+        conn = _conectar(path)
+        row = conn.execute(
+            "SELECT id FROM orcamentos WHERE status = ? ORDER BY id DESC LIMIT 1", (STATUS_ABERTO,)
+        ).fetchone()
+        if row is None:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO orcamentos (status) VALUES (?)", (STATUS_ABERTO,))
+            conn.commit()
+            orcamento_id = cursor.lastrowid
+        else:
+            orcamento_id = row[0]
+        cabecalho, orc, _, descartadas = carregar_orcamento(conn, orcamento_id)
+        diario = cls(path, orcamento_id, conn)
+        diario.descartadas = descartadas
+        diario.pendentes = conn.execute(
+            "SELECT COUNT(*) FROM orcamento_diario WHERE orcamento_id = ?", (orcamento_id,)
+        ).fetchone()[0]
+        return diario, cabecalho, orc
+
+    # ---------------- entradas ----------------
+    def _registrar(self, op, posicao=None, dados=None):
+        try:
+            self.conn.execute(
+                "INSERT INTO orcamento_diario (orcamento_id, op, posicao, dados) VALUES (?, ?, ?, ?)",
+                (self.orcamento_id, op, posicao, dados),
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.pendentes += 1
+
+    def inserir(self, posicao, item):
+        self._registrar(OP_INSERIR, posicao, json.dumps(_linha(item), ensure_ascii=False))
+
+    def atualizar(self, posicao, item):
+        self._registrar(OP_ATUALIZAR, posicao, json.dumps(_linha(item), ensure_ascii=False))
+
+    def atualizar_varios(self, alteracoes):
+        """Várias entradas de atualização [(posicao, item)] numa única transação."""
+        dados = [
+            (self.orcamento_id, OP_ATUALIZAR, posicao, json.dumps(_linha(item), ensure_ascii=False))
+            for posicao, item in alteracoes
+        ]
+        if not dados:
+            return
+        try:
+            self.conn.executemany(
+                "INSERT INTO orcamento_diario (orcamento_id, op, posicao, dados) VALUES (?, ?, ?, ?)", dados)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.pendentes += len(dados)
+
+    def remover(self, posicao):
+        self._registrar(OP_REMOVER, posicao)
+
+    def limpar(self):
+        self._registrar(OP_LIMPAR)
+
+    def cabecalho(self, cliente, numero, data):
+        self._registrar(OP_CABECALHO, None, json.dumps(
+            {'cliente': cliente, 'numero': numero, 'data': data}, ensure_ascii=False))
+
+    # ---------------- compactação ----------------
+    @property
+    def compactando(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def compactar_em_segundo_plano(self, minimo=1):
+        """Dispara a compactação numa thread se houver ao menos `minimo` entradas."""
+        if self.compactando or self.pendentes < minimo:
+            return False
+        self.pendentes = 0
+        self._thread = threading.Thread(target=self._compactar, name='compactar-orcamento', daemon=True)
+        self._thread.start()
+        return True
+
+    def _compactar(self):
+        conn = _conectar(self.path)
+        try:
+            compactar(conn, self.orcamento_id)
+        except sqlite3.Error:
+            # fica para a próxima rodada; o diário continua íntegro
+            self.pendentes += 1
+        finally:
+            conn.close()
+
+    def fechar(self):
+        """Espera a compactação em andamento, compacta o restante e fecha a conexão."""
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            compactar(self.conn, self.orcamento_id)
+        finally:
+            self.conn.close()
+
+
+def _conectar(path):
+    conn = sqlite3.connect(path)
+    configurar_conexao(conn)
+    return conn
@@ -0,0 +1,84 @@
+"""Valores em dinheiro como centavos inteiros (ponto fixo).
+
+Preços e totais do orçamento circulam como `int` de centavos: somas e
+diferenças são exatas e o total geral é a soma de um `array('q')`. A
+conversão acontece só nas bordas: `centavos` na entrada (campos da tela,
+resultado de um cálculo em float, texto "R$ 1.234,56", dicts no formato
+antigo) e `formatar` na saída (tela, .docx, histórico). As taxas do
+catálogo (preço por m², por metro, por unidade e das faixas) continuam
+`float`, e REAL no banco (`produtos`, `faixas_unitarias`), porque podem ter
+fração de centavo (R$ 0,045 o panfleto). O arredondamento acontece uma vez
+só, no total da linha: 1000 panfletos a R$ 0,045 custam R$ 45,00, não
+1000 x R$ 0,05. O preço unitário guardado na linha é a taxa arredondada,
+só para exibição.
+"""
+import math
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+CENTAVOS_POR_REAL = 100
+_UM = Decimal(1)
+# abaixo disso (R$ 10 milhões) o erro de `valor * 100` fica bem abaixo de _FOLGA
+_LIMITE_RAPIDO = 1e9
+_FOLGA = 1e-6
+
+
+def _decimal_de_texto(texto):
+    t = texto.replace('R$', '').replace('\xa0', '').replace(' ', '')
+    if not t:
+        return Decimal(0)
+    if ',' in t and '.' in t:
+        # o último separador é o decimal: '1.234,56' ou '1,234.56'
+        if t.rfind(',') > t.rfind('.'):
+            t = t.replace('.', '').replace(',', '.')
+        else:
+            t = t.replace(',', '')
+    else:
+        t = t.replace(',', '.')
+    return Decimal(t)
+
+
+def centavos(valor):
+    """Centavos (int) de um valor em reais: número, `Decimal` ou texto ('12.30', '12,30', 'R$ 1.234,56').
+
+    Meio centavo arredonda para longe do zero. Floats valem pelo que
+    mostram (`repr`): 1.005 vira 101, não 100. None e texto vazio viram 0.
+    Levanta ValueError para texto ilegível, NaN ou infinito.
+    """
+    if valor is None:
+        return 0
+    if isinstance(valor, int):
+        return valor * CENTAVOS_POR_REAL
+    if isinstance(valor, float):
+        # caminho rápido: longe de meio centavo o arredondamento de `valor * 100` já é o certo
+        c = valor * CENTAVOS_POR_REAL
+        if abs(c) < _LIMITE_RAPIDO:
+            base = math.floor(c)
+            resto = c - base
+            if abs(resto - 0.5) > _FOLGA:
+                return int(base) + (resto > 0.5)
+    try:
+        if isinstance(valor, float):
+            d = Decimal(repr(valor))
+        elif isinstance(valor, Decimal):
+            d = valor
+        else:
+            d = _decimal_de_texto(str(valor).strip())
+        if not d.is_finite():
+            raise InvalidOperation
+        return int((d * CENTAVOS_POR_REAL).quantize(_UM, rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        raise ValueError(f"valor em dinheiro inválido: {valor!r}") from None
+
+
+def reais(valor_centavos):
+    """Float em reais (para interfaces que ainda esperam reais, como os dicts antigos)."""
+    return valor_centavos / CENTAVOS_POR_REAL
+
+
+def formatar(valor_centavos, milhar=False):
+    """'1234.56' (ou '1,234.56' com `milhar`): o mesmo texto de f'{reais:.2f}' / f'{reais:,.2f}'."""
+    sinal = '-' if valor_centavos < 0 else ''
+    inteiro, resto = divmod(abs(valor_centavos), CENTAVOS_POR_REAL)
+    if milhar:
+        return f"{sinal}{inteiro:,}.{resto:02d}"
+    return f"{sinal}{inteiro}.{resto:02d}"
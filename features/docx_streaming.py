@@ -0,0 +1,155 @@
+"""Gravação em streaming do .docx para orçamentos grandes.
+
+O python-docx monta a tabela inteira em memória (um `w:tr` por serviço) e
+serializa `word/document.xml` de uma vez no `save`. Aqui o documento do
+modelo é preparado normalmente (campos e linha de TOTAL preenchidos pelo
+python-docx), mas a tabela recebe uma única linha-protótipo com marcadores
+no lugar dos textos. O XML serializado é cortado nessa linha em prefixo,
+pedaços da linha e sufixo; no `save` as linhas dos serviços são geradas
+uma a uma entre o prefixo e o sufixo e escritas direto no zip de saída.
+As demais partes do modelo são copiadas como estão, em blocos. A memória
+usada não cresce com o número de linhas, e o `word/document.xml` gerado é
+idêntico ao do caminho python-docx para a mesma entrada.
+"""
+import re
+import secrets
+import shutil
+import zipfile
+from io import BytesIO
+
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml.ns import qn
+
+from features.orcamento import linhas_servicos
+from features.tabela_docx import COLUNAS, prototipo_linha, textos_linha
+
+# caracteres que o lxml recusa em texto (os mesmos que levantariam ValueError no python-docx)
+XML_INVALIDO = re.compile('[^\t\n\r\u0020-\uD7FF\uE000-\uFFFD\U00010000-\U0010FFFF]')
+BLOCO_BYTES = 256 * 1024
+LINHAS_POR_BLOCO = 500
+
+
+def escapar(texto):
+    """Escapa `texto` exatamente como o lxml faz no conteúdo de um elemento."""
+    if '&' in texto:
+        texto = texto.replace('&', '&amp;')
+    if '<' in texto:
+        texto = texto.replace('<', '&lt;')
+    if '>' in texto:
+        texto = texto.replace('>', '&gt;')
+    if '\r' in texto:
+        texto = texto.replace('\r', '&#13;')
+    return texto
+
+
+def _textos_validos(servicos):
+    """False se algum serviço tiver texto que o python-docx trataria diferente (ou recusaria)."""
+    for desc, larg, alt, qtd, _preco, _total in linhas_servicos(servicos):
+        if not isinstance(desc, str):
+            return False
+        for v in (desc, larg, alt, qtd):
+            if isinstance(v, str) and XML_INVALIDO.search(v):
+                return False
+    return True
+
+
+class DocumentoStreaming:
+    """Documento pronto para `save(path)`, com as linhas da tabela geradas durante a gravação.
+
+    Use `preparar`; `save` pode ser chamado uma vez por instância ou mais
+    (as linhas são geradas de novo a cada chamada).
+    """
+
+    streaming = True
+
+    def __init__(self, dados_modelo, parte, prefixo, pedacos, sufixo, servicos, progresso=None, passo=200):
+        self.dados_modelo = dados_modelo
+        self.parte = parte
+        self.prefixo = prefixo
+        self.pedacos = pedacos
+        self.sufixo = sufixo
+        self.servicos = servicos
+        self.progresso = progresso
+        self.passo = passo
+
+    @classmethod
+    def preparar(cls, dados_modelo, doc, tabela, servicos, preencher_total, progresso=None):
+        """Prepara `doc` (aberto de `dados_modelo`) para gravar `servicos` em streaming.
+
+        `preencher_total(tabela)` preenche a linha de TOTAL como no caminho
+        python-docx. Retorna None, sem alterar `doc`, quando a tabela ou os
+        dados pedem o caminho python-docx (mais colunas do que textos, linha
+        sem células, textos que o lxml não aceita).
+        """
+        tbl = tabela._tbl
+        trs = tbl.tr_lst
+        total_tr = trs[-1]
+        linhas_modelo = trs[1:-1]
+        prototipo = prototipo_linha(tabela, linhas_modelo)
+        n_cols = len(prototipo.findall(qn('w:tc')))
+        if not n_cols or n_cols > COLUNAS or not _textos_validos(servicos):
+            return None
+
+        semente = secrets.token_hex(8)
+        marcadores = [f'@{semente}{k}@' for k in range(n_cols)]
+        for t, marcador in zip(prototipo.iter(qn('w:t')), marcadores):
+            t.text = marcador
+        for tr in linhas_modelo:
+            tbl.remove(tr)
+        tbl.insert(tbl.index(total_tr), prototipo)
+        preencher_total(tabela)
+
+        xml = serialize_part_xml(doc.part.element)
+        posicoes = [xml.index(m.encode('ascii')) for m in marcadores]
+        ini = max(xml.rfind(b'<w:tr>', 0, posicoes[0]), xml.rfind(b'<w:tr ', 0, posicoes[0]))
+        fim = xml.index(b'</w:tr>', posicoes[-1]) + len(b'</w:tr>')
+        pedacos = []
+        anterior = ini
+        for pos, marcador in zip(posicoes, marcadores):
+            pedacos.append(xml[anterior:pos].decode('utf-8'))
+            anterior = pos + len(marcador)
+        pedacos.append(xml[anterior:fim].decode('utf-8'))
+        return cls(dados_modelo, doc.part.partname.lstrip('/'), xml[:ini], pedacos, xml[fim:],
+                   servicos, progresso)
+
+    def _linhas_xml(self):
+        """Linhas `w:tr` dos serviços em blocos de bytes, avisando o progresso a cada `passo` linhas."""
+        pedacos = self.pedacos
+        n = len(pedacos) - 1
+        total = len(self.servicos)
+        progresso = self.progresso
+        partes = []
+        for i, linha in enumerate(linhas_servicos(self.servicos), start=1):
+            if progresso is not None and i % self.passo == 0:
+                progresso('tabela', i / total)
+            textos = textos_linha(i, *linha)
+            for k in range(n):
+                partes.append(pedacos[k])
+                partes.append(escapar(textos[k]))
+            partes.append(pedacos[n])
+            if i % LINHAS_POR_BLOCO == 0:
+                yield ''.join(partes).encode('utf-8')
+                partes = []
+        if partes:
+            yield ''.join(partes).encode('utf-8')
+        if progresso is not None:
+            progresso('tabela', 1.0)
+
+    def save(self, path):
+        with zipfile.ZipFile(BytesIO(self.dados_modelo)) as zin, \
+                zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zout:
+            for info in zin.infolist():
+                novo = zipfile.ZipInfo(info.filename, info.date_time)
+                novo.compress_type = zipfile.ZIP_DEFLATED
+                novo.external_attr = info.external_attr
+                if info.filename == self.parte:
+                    with zout.open(novo, 'w', force_zip64=True) as destino:
+                        destino.write(self.prefixo)
+                        for bloco in self._linhas_xml():
+                            destino.write(bloco)
+                        destino.write(self.sufixo)
+                    if self.progresso is not None:
+                        self.progresso('salvar', 0.0)
+                else:
+                    with zin.open(info) as origem, zout.open(novo, 'w') as destino:
+                        shutil.copyfileobj(origem, destino, BLOCO_BYTES)
@@ -0,0 +1,203 @@
+"""Índice em memória das faixas unitárias.
+
+Mantém, por nome de produto, as faixas ordenadas por `qtd_min`. Na primeira
+consulta de preço de um produto, as faixas são compiladas
+(`features.faixas_validacao.segmentos`) numa tabela densa `array('d')`
+indexada pela quantidade (até `LIMITE_DENSO`) e, para a cauda, em arrays
+de limites para busca binária; o caso comum é O(1), sem tocar no SQLite.
+O índice é carregado uma vez por conexão e mantido atualizado
+(write-through) pelas funções de CRUD das faixas.
+"""
+from array import array
+from bisect import bisect_right
+
+from features.faixas_validacao import segmentos
+
+# quantidades até aqui são resolvidas por índice direto (8 bytes por quantidade)
+LIMITE_DENSO = 1024
+_SEM_FAIXA = float('nan')
+
+
+class _FaixasProduto:
+    """Faixas de um produto: lista de tuplas + tabela de busca compilada sob demanda.
+
+    A tabela pode ser compilada na thread de trabalho (`ConsultaAdiada`)
+    enquanto a thread do Tk altera as faixas. Por isso `reconstruir` troca a
+    lista inteira (nunca a altera no lugar) e incrementa `versao`, e a tabela
+    compilada leva a versão das faixas de onde saiu: tabela antiga não é usada.
+    """
+
+    __slots__ = ('faixas', 'versao', 'compilado')
+
+    def __init__(self):
+        self.faixas = []  # (qtd_min, qtd_max, preco, id)
+        self.versao = 0
+        # (versao, denso, inicios, fins, precos); denso: preço por quantidade (NaN = sem faixa)
+        self.compilado = None
+
+    def reconstruir(self, faixas):
+        # a lista nova entra antes da versão: quem lê a versão nova já vê as faixas novas
+        self.faixas = sorted(faixas)
+        self.versao += 1
+
+    def compilar(self):
+        """Segmentos disjuntos -> tabela densa para quantidades pequenas + limites para a cauda."""
+        versao = self.versao
+        segs = segmentos(self.faixas)
+        tamanho = max(0, min(LIMITE_DENSO, segs[-1][1]) + 1) if segs else 0
+        denso = array('d', [_SEM_FAIXA]) * tamanho
+        for ini, fim, preco in segs:
+            if ini >= tamanho:
+                break
+            if fim < 0:
+                continue
+            ini, fim = max(ini, 0), min(fim, tamanho - 1)
+            denso[ini:fim + 1] = array('d', [preco]) * (fim - ini + 1)
+        compilado = (
+            versao,
+            denso,
+            array('q', [s[0] for s in segs]),
+            array('q', [s[1] for s in segs]),
+            array('d', [s[2] for s in segs]),
+        )
+        # publicada numa única atribuição; se as faixas mudaram no meio, a versão não confere
+        self.compilado = compilado
+        return compilado
+
+    def preco(self, qtd):
+        compilado = self.compilado
+        if compilado is None or compilado[0] != self.versao:
+            compilado = self.compilar()
+        _, denso, inicios, fins, precos = compilado
+        if 0 <= qtd < len(denso):
+            p = denso[qtd]
+            return None if p != p else p
+        i = bisect_right(inicios, qtd) - 1
+        if i >= 0 and qtd <= fins[i]:
+            return precos[i]
+        return None
+
+
+class FaixasIndex:
+    """Índice nome do produto -> faixas ordenadas, com tipo dos produtos em cache."""
+
+    def __init__(self):
+        self.produtos = {}   # nome -> _FaixasProduto
+        self.faixa_nome = {}  # id da faixa -> nome do produto
+        self.tipos = {}      # nome -> tipo (tabela produtos)
+
+    # ---------------- carga ----------------
+    def carregar(self, conn):
+        self.produtos.clear()
+        self.faixa_nome.clear()
+        self.tipos.clear()
+        cursor = conn.cursor()
+        cursor.execute("SELECT nome, tipo FROM produtos")
+        for nome, tipo in cursor.fetchall():
+            self.tipos[nome] = tipo
+        cursor.execute(
+            "SELECT pu.nome, f.id, f.qtd_min, f.qtd_max, f.preco "
+            "FROM faixas_unitarias f JOIN produtos_unitarios pu ON pu.id = f.produto_id"
+        )
+        for nome, fid, qmin, qmax, preco in cursor.fetchall():
+            prod = self.produtos.get(nome)
+            if prod is None:
+                prod = self.produtos[nome] = _FaixasProduto()
+            prod.faixas.append((int(qmin), int(qmax), float(preco), fid))
+            self.faixa_nome[fid] = nome
+        for prod in self.produtos.values():
+            prod.reconstruir(prod.faixas)
+        return self
+
+    # ---------------- consultas ----------------
+    def tipo(self, nome):
+        return self.tipos.get(nome)
+
+    def preco(self, nome, quantidade):
+        """Preço unitário da faixa que contém `quantidade`, ou None."""
+        try:
+            qtd = int(quantidade)
+        except Exception:
+            return None
+        prod = self.produtos.get(nome)
+        if prod is None:
+            return None
+        return prod.preco(qtd)
+
+    def faixas(self, nome):
+        prod = self.produtos.get(nome)
+        if prod is None:
+            return []
+        return [
+            {'id': fid, 'qtd_min': qmin, 'qtd_max': qmax, 'preco': preco}
+            for qmin, qmax, preco, fid in prod.faixas
+        ]
+
+    # ---------------- write-through ----------------
+    def set_tipo(self, nome, tipo):
+        self.tipos[nome] = tipo
+
+    def remover_tipo(self, nome):
+        self.tipos.pop(nome, None)
+
+    def add_faixa(self, nome, faixa_id, qtd_min, qtd_max, preco):
+        prod = self.produtos.get(nome)
+        if prod is None:
+            prod = self.produtos[nome] = _FaixasProduto()
+        prod.reconstruir(prod.faixas + [(int(qtd_min), int(qtd_max), float(preco), faixa_id)])
+        self.faixa_nome[faixa_id] = nome
+
+    def update_faixa(self, faixa_id, qtd_min, qtd_max, preco):
+        nome = self.faixa_nome.get(faixa_id)
+        if nome is None:
+            return
+        prod = self.produtos[nome]
+        faixas = [f for f in prod.faixas if f[3] != faixa_id]
+        faixas.append((int(qtd_min), int(qtd_max), float(preco), faixa_id))
+        prod.reconstruir(faixas)
+
+    def delete_faixa(self, faixa_id):
+        nome = self.faixa_nome.pop(faixa_id, None)
+        if nome is None:
+            return
+        prod = self.produtos[nome]
+        prod.reconstruir([f for f in prod.faixas if f[3] != faixa_id])
+
+    def delete_produto(self, nome):
+        prod = self.produtos.pop(nome, None)
+        if prod is None:
+            return
+        for f in prod.faixas:
+            self.faixa_nome.pop(f[3], None)
+
+    def limpar(self):
+        self.produtos.clear()
+        self.faixa_nome.clear()
+        self.tipos.clear()
+
+
+# Um índice por conexão (sqlite3.Connection não aceita weakref, então
+# guardamos a própria conexão junto para que o id não seja reutilizado).
+_INDICES = {}
+
+
+def get_indice(conn):
+    """Retorna o índice da conexão, carregando-o na primeira chamada."""
+    entry = _INDICES.get(id(conn))
+    if entry is None or entry[0] is not conn:
+        entry = (conn, FaixasIndex().carregar(conn))
+        _INDICES[id(conn)] = entry
+    return entry[1]
+
+
+def indice_carregado(conn):
+    """Retorna o índice da conexão apenas se já estiver carregado (para write-through)."""
+    entry = _INDICES.get(id(conn))
+    if entry is None or entry[0] is not conn:
+        return None
+    return entry[1]
+
+
+def descartar_indice(conn):
+    """Descarta o índice da conexão (ex.: ao fechar a conexão)."""
+    _INDICES.pop(id(conn), None)
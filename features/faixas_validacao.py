@@ -0,0 +1,226 @@
+"""Validação, normalização e verificação de consistência das faixas unitárias.
+
+Faixas são tuplas `(qtd_min, qtd_max, preco, ...)` (campos extras, como o
+id, são preservados nos relatórios). Tudo aqui ordena uma vez e varre as
+faixas comparando com a que vai mais longe até ali, em O(n log n):
+
+- `validar_faixas`: faixas inválidas/invertidas, sobreposições e, se
+  pedido, lacunas de um produto;
+- `segmentos`: as faixas resolvidas em intervalos disjuntos com a mesma
+  regra de `features.faixas_index` (numa sobreposição vale a última faixa
+  na ordem (qtd_min, qtd_max, preço)); base da tabela de busca compilada;
+- `normalizar_faixas`: une faixas vizinhas de mesmo preço, resolve
+  sobreposições e reporta (ou preenche) lacunas;
+- `verificar_catalogo`: uma passada por `faixas_unitarias` inteira com
+  relatório de sobreposições, lacunas, faixas invertidas e órfãs.
+"""
+import heapq
+from collections import Counter, namedtuple
+
+INVERTIDA = 'invertida'
+SOBREPOSICAO = 'sobreposicao'
+LACUNA = 'lacuna'
+ORFA = 'orfa'
+SEM_PRODUTO = 'sem_produto'
+TIPO_ERRADO = 'tipo_errado'
+
+ROTULOS = {
+    INVERTIDA: 'faixas inválidas/invertidas',
+    SOBREPOSICAO: 'sobreposições',
+    LACUNA: 'lacunas',
+    ORFA: 'faixas órfãs',
+    SEM_PRODUTO: 'produtos unitários sem cadastro',
+    TIPO_ERRADO: 'faixas em produto que não é unitário',
+}
+
+# `faixa`/`outra` são tuplas de faixa; numa lacuna `faixa` é o intervalo (ini, fim) descoberto
+Problema = namedtuple('Problema', 'tipo produto faixa outra')
+
+
+def faixa_valida(qmin, qmax):
+    return qmin > 0 and qmin <= qmax
+
+
+def descrever(problema):
+    """Texto de um `Problema` para mensagens e relatórios."""
+    tipo, produto, f, g = problema
+    if tipo == INVERTIDA:
+        texto = f"faixa inválida {f[0]}-{f[1]}"
+    elif tipo == SOBREPOSICAO:
+        texto = f"faixas {f[0]}-{f[1]} e {g[0]}-{g[1]} se sobrepõem"
+    elif tipo == LACUNA:
+        texto = f"sem faixa para {f[0]}-{f[1]}"
+    elif tipo == ORFA:
+        texto = f"faixa {f[0]}-{f[1]} (id {f[3]}) aponta para produto unitário inexistente"
+    elif tipo == SEM_PRODUTO:
+        texto = "produto unitário sem cadastro em produtos"
+    else:
+        texto = f"tem faixas mas o tipo do produto é '{f}'"
+    return f"'{produto}': {texto}" if produto is not None else texto
+
+
+def validar_faixas(faixas, produto=None, lacunas=False):
+    """Problemas de um conjunto de faixas, em O(n log n).
+
+    Reporta faixas inválidas (qtd_min <= 0 ou qtd_min > qtd_max), cada faixa
+    que começa antes do fim da que vai mais longe até ela (sobreposição) e,
+    com `lacunas=True`, as quantidades sem faixa (inclusive antes da primeira).
+    """
+    problemas = []
+    validas = []
+    for f in faixas:
+        if faixa_valida(f[0], f[1]):
+            validas.append(f)
+        else:
+            problemas.append(Problema(INVERTIDA, produto, f, None))
+    validas.sort(key=lambda f: (f[0], f[1]))
+    maior = None
+    for f in validas:
+        if maior is None:
+            if lacunas and f[0] > 1:
+                problemas.append(Problema(LACUNA, produto, (1, f[0] - 1), None))
+        elif f[0] <= maior[1]:
+            problemas.append(Problema(SOBREPOSICAO, produto, maior, f))
+        elif lacunas and f[0] > maior[1] + 1:
+            problemas.append(Problema(LACUNA, produto, (maior[1] + 1, f[0] - 1), None))
+        if maior is None or f[1] > maior[1]:
+            maior = f
+    return problemas
+
+
+def segmentos(faixas):
+    """Faixas resolvidas em segmentos disjuntos [(ini, fim, preco)], ordenados.
+
+    Numa sobreposição vale a última faixa na ordem (qtd_min, qtd_max, preço),
+    a mesma que `features.faixas_index` escolhe. Faixas invertidas nunca
+    casam com nenhuma quantidade e ficam de fora. Segmentos vizinhos de
+    mesmo preço são unidos.
+    """
+    validas = sorted(tuple(f[:3]) for f in faixas if f[0] <= f[1])
+    pontos = sorted({f[0] for f in validas} | {f[1] + 1 for f in validas})
+    ativas = []  # heap de (-ordem, qtd_max, preco)
+    j = 0
+    resultado = []
+    for k, ponto in enumerate(pontos[:-1]):
+        while j < len(validas) and validas[j][0] <= ponto:
+            heapq.heappush(ativas, (-j, validas[j][1], validas[j][2]))
+            j += 1
+        while ativas and ativas[0][1] < ponto:
+            heapq.heappop(ativas)
+        if not ativas:
+            continue
+        fim = pontos[k + 1] - 1
+        preco = ativas[0][2]
+        if resultado and resultado[-1][1] + 1 == ponto and resultado[-1][2] == preco:
+            resultado[-1] = (resultado[-1][0], fim, preco)
+        else:
+            resultado.append((ponto, fim, preco))
+    return resultado
+
+
+def normalizar_faixas(faixas, preencher_lacunas=False):
+    """Faixas equivalentes e mínimas. Retorna (novas faixas, relatório).
+
+    Une faixas vizinhas de mesmo preço, resolve sobreposições (regra de
+    `segmentos`) e descarta faixas inválidas. Com `preencher_lacunas`, cada
+    lacuna entre duas faixas passa a ser coberta pela faixa anterior (a
+    lacuna antes da primeira faixa é só reportada). O relatório traz as
+    contagens e as lacunas encontradas.
+    """
+    faixas = list(faixas)
+    problemas = validar_faixas(faixas, lacunas=True)
+    lacunas = [p.faixa for p in problemas if p.tipo == LACUNA]
+    # quantidades < 1 não existem: corta o que sobrar abaixo de 1
+    novas = [(max(ini, 1), fim, preco) for ini, fim, preco in segmentos(faixas) if fim >= 1]
+    if preencher_lacunas:
+        preenchidas = []
+        for ini, fim, preco in novas:
+            if preenchidas and ini > preenchidas[-1][1] + 1:
+                anterior = preenchidas[-1]
+                preenchidas[-1] = (anterior[0], ini - 1, anterior[2])
+            if preenchidas and preenchidas[-1][2] == preco:
+                preenchidas[-1] = (preenchidas[-1][0], fim, preco)
+            else:
+                preenchidas.append((ini, fim, preco))
+        novas = preenchidas
+    relatorio = {
+        'antes': len(faixas),
+        'depois': len(novas),
+        'invalidas': sum(1 for p in problemas if p.tipo == INVERTIDA),
+        'sobreposicoes': sum(1 for p in problemas if p.tipo == SOBREPOSICAO),
+        'lacunas': lacunas,
+        'lacunas_preenchidas': preencher_lacunas,
+    }
+    return novas, relatorio
+
+
+# ----------------------- catálogo inteiro -----------------------
+class RelatorioFaixas:
+    """Resultado de `verificar_catalogo`."""
+
+    def __init__(self):
+        self.problemas = []
+        self.produtos = 0
+        self.faixas = 0
+
+    @property
+    def ok(self):
+        return not any(p.tipo != LACUNA for p in self.problemas)
+
+    def contagem(self):
+        return Counter(p.tipo for p in self.problemas)
+
+    def texto(self, limite=50):
+        linhas = [f"{self.faixas} faixa(s) de {self.produtos} produto(s) verificadas."]
+        contagem = self.contagem()
+        if not contagem:
+            linhas.append('Nenhum problema encontrado.')
+            return '\n'.join(linhas)
+        for tipo, rotulo in ROTULOS.items():
+            if contagem[tipo]:
+                linhas.append(f"{rotulo}: {contagem[tipo]}")
+        linhas.append('')
+        linhas.extend(descrever(p) for p in self.problemas[:limite])
+        if len(self.problemas) > limite:
+            linhas.append(f"... e mais {len(self.problemas) - limite} problema(s)")
+        return '\n'.join(linhas)
+
+
+def verificar_catalogo(conn, lacunas=True):
+    """Verifica todas as faixas do banco numa única consulta/passada. Retorna `RelatorioFaixas`."""
+    rel = RelatorioFaixas()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT f.produto_id, pu.nome, p.tipo, f.qtd_min, f.qtd_max, f.preco, f.id "
+        "FROM faixas_unitarias f "
+        "LEFT JOIN produtos_unitarios pu ON pu.id = f.produto_id "
+        "LEFT JOIN produtos p ON p.nome = pu.nome "
+        "ORDER BY f.produto_id, f.qtd_min, f.qtd_max"
+    )
+    atual = None
+    grupo = []
+
+    def _fechar():
+        if atual is None:
+            return
+        _pid, nome, tipo = atual
+        rel.produtos += 1
+        if nome is None:
+            rel.problemas.extend(Problema(ORFA, f'produto_id {_pid}', f, None) for f in grupo)
+            return
+        if tipo is None:
+            rel.problemas.append(Problema(SEM_PRODUTO, nome, None, None))
+        elif tipo != 'unit':
+            rel.problemas.append(Problema(TIPO_ERRADO, nome, tipo, None))
+        # grupo já vem ordenado pela consulta: a ordenação em validar_faixas é linear
+        rel.problemas.extend(validar_faixas(grupo, nome, lacunas))
+
+    for pid, nome, tipo, qmin, qmax, preco, fid in cursor:
+        rel.faixas += 1
+        if atual is None or atual[0] != pid:
+            _fechar()
+            atual = (pid, nome, tipo)
+            grupo = []
+        grupo.append((qmin, qmax, preco, fid))
+    _fechar()
+    return rel
@@ -0,0 +1,162 @@
+"""Geração do .docx numa thread de trabalho, com progresso e cancelamento.
+
+A thread só monta e salva o documento; tudo que toca o Tk fica na thread
+principal. O progresso volta por uma fila lida com `after()` e o
+cancelamento é um `threading.Event` conferido a cada aviso de progresso
+(entre as fases e a cada bloco de linhas da tabela). O arquivo é gravado
+num temporário na mesma pasta e só então renomeado, para que um erro no
+meio do salvamento não deixe um .docx pela metade.
+"""
+import os
+import queue
+import tempfile
+import threading
+import tkinter as tk
+from tkinter import messagebox
+
+from ttkbootstrap import ttk
+
+FASES = {
+    'modelo': 'Carregando modelo...',
+    'campos': 'Preenchendo campos...',
+    'tabela': 'Montando tabela...',
+    'salvar': 'Salvando arquivo...',
+}
+# trecho da barra (0-100) ocupado por cada fase
+_FAIXA_FASE = {
+    'modelo': (0, 15),
+    'campos': (15, 25),
+    'tabela': (25, 85),
+    'salvar': (85, 100),
+}
+
+
+class GeracaoCancelada(Exception):
+    """Levantada na thread de trabalho quando o usuário cancela a geração."""
+
+
+def salvar_atomico(doc, path):
+    """Salva `doc` num temporário ao lado de `path` e renomeia por cima."""
+    pasta = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(suffix='.docx', dir=pasta)
+    os.close(fd)
+    try:
+        doc.save(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class GeracaoEmSegundoPlano:
+    """Roda `gerador.renderizar(save_path)` numa thread e mostra o progresso.
+
+    Args:
+        parent: janela principal (dona da janela de progresso e do `after`)
+        gerador: `docxGenerator` já validado
+        save_path: destino do .docx
+        ao_concluir: chamada na thread principal como `ao_concluir(gerador, save_path)`
+            depois que o arquivo foi salvo
+        intervalo_ms: intervalo da leitura da fila de progresso
+    """
+
+    def __init__(self, parent, gerador, save_path, ao_concluir=None, intervalo_ms=50):
+        self.parent = parent
+        self.gerador = gerador
+        self.save_path = save_path
+        self.ao_concluir = ao_concluir
+        self.intervalo_ms = intervalo_ms
+        self.ativa = True
+        self._fila = queue.Queue()
+        self._cancelar = threading.Event()
+
+        # a thread não pode ler StringVars nem a lista que a tela continua editando
+        for attr in ('template_path', 'cliente', 'numero_proposta', 'proposta_completa', 'data_label'):
+            setattr(gerador, attr, gerador._valor(getattr(gerador, attr)))
+        copia = getattr(gerador.servicos, 'copia', None)
+        gerador.servicos = copia() if copia else [dict(s) for s in gerador.servicos]
+
+        self._criar_janela()
+        self._thread = threading.Thread(target=self._trabalho, name='gerar-docx', daemon=True)
+        self._thread.start()
+        self.parent.after(self.intervalo_ms, self._acompanhar)
+
+    # ---------------- thread principal ----------------
+    def _criar_janela(self):
+        self.janela = tk.Toplevel(self.parent)
+        self.janela.title('Gerando DOCX')
+        self.janela.resizable(False, False)
+        self.janela.transient(self.parent)
+        self.janela.protocol('WM_DELETE_WINDOW', self.cancelar)
+
+        self.var_fase = tk.StringVar(value=FASES['modelo'])
+        ttk.Label(self.janela, textvariable=self.var_fase).pack(fill='x', padx=12, pady=(12, 4))
+        self.barra = ttk.Progressbar(self.janela, mode='determinate', maximum=100, length=320)
+        self.barra.pack(fill='x', padx=12, pady=4)
+        self.btn_cancelar = ttk.Button(self.janela, text='Cancelar', bootstyle='secondary', command=self.cancelar)
+        self.btn_cancelar.pack(pady=(4, 12))
+
+    def cancelar(self):
+        if not self.ativa:
+            return
+        self._cancelar.set()
+        self.var_fase.set('Cancelando...')
+        self.btn_cancelar.configure(state='disabled')
+
+    def _acompanhar(self):
+        ultimo = None
+        fim = None
+        while True:
+            try:
+                msg = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if msg[0] == 'progresso':
+                ultimo = msg
+            else:
+                fim = msg
+        if ultimo is not None and not self._cancelar.is_set():
+            _, fase, fracao = ultimo
+            ini, fim_fase = _FAIXA_FASE[fase]
+            self.var_fase.set(FASES[fase])
+            self.barra['value'] = ini + (fim_fase - ini) * min(max(fracao, 0.0), 1.0)
+        if fim is None:
+            self.parent.after(self.intervalo_ms, self._acompanhar)
+            return
+        self._concluir(fim)
+
+    def _concluir(self, fim):
+        self.ativa = False
+        try:
+            self.janela.destroy()
+        except tk.TclError:
+            pass
+        status = fim[0]
+        if status == 'ok':
+            if self.ao_concluir is not None:
+                self.ao_concluir(self.gerador, self.save_path)
+            for aviso in fim[1]:
+                messagebox.showwarning('Aviso', aviso)
+            messagebox.showinfo('Sucesso', f'Orçamento gerado: {self.save_path}')
+        elif status == 'erro':
+            messagebox.showerror('Erro', f'Não foi possível gerar o documento: {fim[1]}')
+        # cancelado: nada foi gravado, só fecha a janela
+
+    # ---------------- thread de trabalho ----------------
+    def _progresso(self, fase, fracao):
+        if self._cancelar.is_set():
+            raise GeracaoCancelada()
+        self._fila.put(('progresso', fase, fracao))
+
+    def _trabalho(self):
+        try:
+            self.gerador.renderizar(self.save_path, self._progresso)
+        except GeracaoCancelada:
+            self._fila.put(('cancelado',))
+        except Exception as e:
+            self._fila.put(('erro', e))
+        else:
+            self._fila.put(('ok', list(self.gerador.avisos)))
@@ -1,8 +1,19 @@
 from tkinter import messagebox, filedialog
 import os
-from docx import Document
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-import pandas as pd
+
+from features.dinheiro import formatar
+from features.geracao_docx import GeracaoCancelada, GeracaoEmSegundoPlano, salvar_atomico
+from features.orcamento import linhas_servicos, total_servicos
+from features.rastreamento import span
+# python-docx (e lxml) só carregam na primeira geração: ver montar_documento
+
+# a partir daqui `renderizar` grava a tabela em streaming (features.docx_streaming)
+LINHAS_STREAMING = 500
+
+
+def _sem_progresso(fase, fracao):
+    pass
+
 
 class docxGenerator:
     def __init__(self, template_path, cliente, numero_proposta, proposta_completa, data_label, servicos):
@@ -12,106 +23,207 @@ class docxGenerator:
         self.proposta_completa = proposta_completa
         self.data_label = data_label
         self.servicos = servicos
+        self.avisos = []
 
     # ==================== DOCX ====================
-    def replace_text_keep_formatting(self, paragraph, placeholder, new_text):
-        for run in paragraph.runs:
-            if placeholder in run.text:
-                run.text = run.text.replace(placeholder, new_text)
-
-    def replace_placeholder_formatted(self, document, placeholder, new_text):
-        for p in document.paragraphs:
-            if placeholder in p.text:
-                self.replace_text_keep_formatting(p, placeholder, new_text)
-        for table in document.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for p in cell.paragraphs:
-                        if placeholder in p.text:
-                            self.replace_text_keep_formatting(p, placeholder, new_text)
-
-    def gerar_docx(self):
-        tpl = self.template_path.get()
+    @staticmethod
+    def _valor(v):
+        """Aceita tanto `tk.StringVar` quanto o valor já extraído (str)."""
+        return v.get() if hasattr(v, 'get') else (v if v is not None else '')
+
+    def validar(self):
+        """Retorna a mensagem do primeiro problema encontrado, ou None."""
+        tpl = self._valor(self.template_path)
         if not tpl or not os.path.isfile(tpl):
-            messagebox.showwarning('Aviso', 'Selecione um modelo .docx válido')
-            return
-        if not self.cliente.get().strip():
-            messagebox.showwarning('Aviso', 'Informe o nome do cliente')
-            return
-        if not self.numero_proposta.get().strip():
-            messagebox.showwarning('Aviso', 'Informe o número da proposta')
-            return
+            return 'Selecione um modelo .docx válido'
+        if not self._valor(self.cliente).strip():
+            return 'Informe o nome do cliente'
+        if not str(self._valor(self.numero_proposta)).strip():
+            return 'Informe o número da proposta'
+        if not self.servicos:
+            return 'Adicione pelo menos um serviço'
+        return None
 
-        try:
-            doc = Document(tpl)
-        except Exception as e:
-            messagebox.showerror('Erro', f'Não foi possível abrir o modelo: {e}')
-            return
+    def nome_padrao(self):
+        cliente_txt = self._valor(self.cliente).upper()
+        proposta_txt = self._valor(self.proposta_completa)
+        return f"orcamento_{cliente_txt.replace(' ', '_')}_{proposta_txt}.docx"
 
-        cliente_txt = self.cliente.get().upper()
-        proposta_txt = self.proposta_completa.get()
-        data_txt = self.data_label.get()
-        self.replace_placeholder_formatted(doc, '{{NOME}}', cliente_txt)
-        self.replace_placeholder_formatted(doc, '{{PROPOSTA}}', proposta_txt)
-        self.replace_placeholder_formatted(doc, '{{DATA}}', data_txt)
+    def montar_documento(self, progresso=None):
+        """Abre o modelo e preenche placeholders e tabela, sem nenhum diálogo.
 
-        df = pd.DataFrame(self.servicos)
-        if df.empty:
-            messagebox.showwarning('Aviso', 'Adicione pelo menos um serviço')
-            return
-        valor_total = df['Total (R$)'].sum()
+        Levanta ValueError se os dados forem inválidos. Problemas não fatais
+        (ex.: tabela não pôde ser preenchida) ficam em `self.avisos`.
+        `progresso(fase, fracao)` é avisado no início de cada fase ('modelo',
+        'campos', 'tabela') e durante a tabela; pode levantar exceção para
+        cancelar a geração.
+        """
+        if progresso is None:
+            progresso = _sem_progresso
+        _modelo, doc = self._abrir_modelo(progresso)
+        valor_total = total_servicos(self.servicos)
+
+        progresso('tabela', 0.0)
+        with span('docx.tabela', 'docx', linhas=len(self.servicos)):
+            self._preencher_servicos(doc, valor_total, progresso)
+
+        return doc
+
+    def montar_streaming(self, progresso=None):
+        """Como `montar_documento`, mas as linhas da tabela só são geradas no `save`.
+
+        Retorna um `DocumentoStreaming` (o `save` avisa 'tabela' durante as
+        linhas e depois 'salvar'), ou o documento python-docx já preenchido
+        quando o modelo não tem tabela de serviços ou ela não pode ser
+        gravada em streaming. O `word/document.xml` é o mesmo nos dois casos.
+        """
+        from features.docx_streaming import DocumentoStreaming
+
+        if progresso is None:
+            progresso = _sem_progresso
+        modelo, doc = self._abrir_modelo(progresso)
+        valor_total = total_servicos(self.servicos)
+
+        progresso('tabela', 0.0)
+        tabela = self._tabela_servicos(doc)
+        if tabela is not None:
+            try:
+                with span('docx.tabela', 'docx', linhas=len(self.servicos), streaming=True):
+                    streaming = DocumentoStreaming.preparar(
+                        modelo.dados, doc, tabela, self.servicos,
+                        lambda t: self._preencher_total(t, valor_total), progresso)
+            except GeracaoCancelada:
+                raise
+            except Exception:
+                # documento pode ter ficado pela metade: refaz pelo caminho python-docx
+                return self.montar_documento(progresso)
+            if streaming is not None:
+                return streaming
+
+        with span('docx.tabela', 'docx', linhas=len(self.servicos)):
+            self._preencher_servicos(doc, valor_total, progresso)
+        return doc
+
+    def _abrir_modelo(self, progresso):
+        """Valida, abre o modelo e preenche os campos. Retorna (modelo compilado, documento)."""
+        from features.modelo_docx import compilar_modelo
+
+        self.avisos = []
+        erro = self.validar()
+        if erro:
+            raise ValueError(erro)
 
-        tabela = None
+        # modelo compilado (em cache por caminho + mtime): uma única passada
+        # pelos parágrafos que têm placeholders, inclusive quebrados entre runs
+        progresso('modelo', 0.0)
+        with span('docx.modelo', 'docx'):
+            modelo = compilar_modelo(self._valor(self.template_path))
+            doc = modelo.novo_documento()
+        progresso('campos', 0.0)
+        with span('docx.campos', 'docx'):
+            modelo.preencher(doc, {
+                'NOME': self._valor(self.cliente).upper(),
+                'PROPOSTA': self._valor(self.proposta_completa),
+                'DATA': self._valor(self.data_label),
+            })
+        return modelo, doc
+
+    @staticmethod
+    def _tabela_servicos(doc):
+        """Primeira tabela do documento com pelo menos 5 colunas, ou None."""
         for table in doc.tables:
             try:
                 if len(table.columns) >= 5:
-                    tabela = table
-                    break
+                    return table
             except Exception:
                 continue
+        return None
+
+    @staticmethod
+    def _preencher_total(tabela, valor_total):
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+        total_row = tabela.rows[-1].cells
+        total_row[-2].text = 'TOTAL'
+        total_row[-1].text = f'R$ {formatar(valor_total, milhar=True)}'
+        for c in total_row:
+            for p in c.paragraphs:
+                p.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
+    def _preencher_servicos(self, doc, valor_total, progresso):
+        from features.tabela_docx import preencher_tabela
+
+        tabela = self._tabela_servicos(doc)
         if tabela:
             try:
-                while len(tabela.rows) > 2:
-                    tabela._tbl.remove(tabela.rows[-2]._tr)
-                for i, row_data in enumerate(self.servicos, start=1):
-                    last_row = tabela.rows[-1]._tr
-                    new_row = tabela.add_row()._tr
-                    tabela._tbl.remove(new_row)
-                    last_row.addprevious(new_row)
-                    row_cells = tabela.rows[-2].cells
-                    larg = row_data['Largura'] if row_data['Largura'] not in [None, '', '0', 0] else 'X'
-                    alt = row_data['Altura'] if row_data['Altura'] not in [None, '', '0', 0] else 'X'
-                    dados = [str(i), row_data['Descrição'], str(larg), str(alt),
-                            str(row_data['Quantidade']), f'R$ {row_data["Preço"]:.2f}', f'R$ {row_data["Total (R$)"]:.2f}']
-
-                    for idx_col, cell in enumerate(row_cells):
-                        cell.text = ''
-                        p = cell.paragraphs[0]
-                        p.text = dados[idx_col]
-                        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                total_row = tabela.rows[-1].cells
-                total_row[-2].text = 'TOTAL'
-                total_row[-1].text = f'R$ {valor_total:,.2f}'
-                for c in total_row:
-                    for p in c.paragraphs:
-                        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                # linhas clonadas de um protótipo e inseridas de uma vez (linear)
+                preencher_tabela(tabela, self.servicos,
+                                 progresso=lambda feitas, total: progresso('tabela', feitas / total))
+                self._preencher_total(tabela, valor_total)
+            except GeracaoCancelada:
+                raise
             except Exception as e:
-                messagebox.showwarning('Aviso', f'Erro ao preencher tabela: {e}')
+                self.avisos.append(f'Erro ao preencher tabela: {e}')
                 tabela = None
 
         if not tabela:
             doc.add_paragraph('SERVIÇOS:')
-            for i, row_data in enumerate(self.servicos, start=1):
-                doc.add_paragraph(f"{i} - {row_data['Descrição']} | LxA: {row_data['Largura']}x{row_data['Altura']} | Qtd: {row_data['Quantidade']} | R$ {row_data['Total (R$)']:,.2f}")
-            doc.add_paragraph(f"TOTAL: R$ {valor_total:,.2f}")
+            for i, (desc, larg, alt, qtd, _preco, total) in enumerate(linhas_servicos(self.servicos), start=1):
+                doc.add_paragraph(f"{i} - {desc} | LxA: {larg}x{alt} | Qtd: {qtd} | R$ {formatar(total, milhar=True)}")
+            doc.add_paragraph(f"TOTAL: R$ {formatar(valor_total, milhar=True)}")
+
+    def renderizar(self, save_path, progresso=None):
+        """Gera o .docx em `save_path` sem diálogos (uso em lote/CLI/segundo plano).
+
+        A partir de `LINHAS_STREAMING` serviços a tabela é gravada em
+        streaming, sem montar todas as linhas em memória.
+        """
+        if len(self.servicos) >= LINHAS_STREAMING:
+            doc = self.montar_streaming(progresso)
+        else:
+            doc = self.montar_documento(progresso)
+        streaming = getattr(doc, 'streaming', False)
+        if progresso is not None and not streaming:
+            progresso('salvar', 0.0)
+        with span('docx.salvar', 'docx', streaming=streaming):
+            salvar_atomico(doc, save_path)
+        return save_path
+
+    def gerar_docx(self, parent=None, ao_concluir=None):
+        """Pergunta onde salvar e gera o documento.
+
+        Com `parent` (a janela principal) a geração roda numa thread de
+        trabalho, com janela de progresso e cancelamento; sem ele, roda
+        direto na thread atual. `ao_concluir(gerador, save_path)` é chamada
+        depois que o arquivo foi salvo.
+        """
+        erro = self.validar()
+        if erro:
+            messagebox.showwarning('Aviso', erro)
+            return
+
+        if parent is not None:
+            save_path = filedialog.asksaveasfilename(defaultextension=".docx", initialfile=self.nome_padrao(), filetypes=[('Word Document', '*.docx')])
+            if not save_path:
+                return
+            return GeracaoEmSegundoPlano(parent, self, save_path, ao_concluir)
+
+        try:
+            doc = self.montar_documento()
+        except Exception as e:
+            messagebox.showerror('Erro', f'Não foi possível abrir o modelo: {e}')
+            return
+        for aviso in self.avisos:
+            messagebox.showwarning('Aviso', aviso)
 
-        default_name = f"orcamento_{cliente_txt.replace(' ', '_')}_{proposta_txt}.docx"
-        save_path = filedialog.asksaveasfilename(defaultextension=".docx", initialfile=default_name, filetypes=[('Word Document', '*.docx')])
+        save_path = filedialog.asksaveasfilename(defaultextension=".docx", initialfile=self.nome_padrao(), filetypes=[('Word Document', '*.docx')])
         if not save_path:
             return
         try:
-            doc.save(save_path)
+            with span('docx.salvar', 'docx'):
+                doc.save(save_path)
+            if ao_concluir is not None:
+                ao_concluir(self, save_path)
             messagebox.showinfo('Sucesso', f'Orçamento gerado: {save_path}')
         except Exception as e:
-            messagebox.showerror('Erro', f'Não foi possível salvar o arquivo: {e}')
\ No newline at end of file
+            messagebox.showerror('Erro', f'Não foi possível salvar o arquivo: {e}')
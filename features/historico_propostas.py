@@ -0,0 +1,155 @@
+"""Histórico pesquisável das propostas emitidas (SQLite FTS5).
+
+Cada proposta gerada vira uma linha em `propostas` (cliente, número, data,
+descrições das linhas, totais, arquivo). Triggers mantêm o índice FTS5
+`propostas_fts` a cada INSERT, então a indexação é incremental e nunca há
+reconstrução completa. A busca usa prefixos (`banner*`), ignora acentos e
+ordena por relevância (bm25, com peso maior para o cliente), desempatando
+pelas mais recentes. Termos muito comuns ("banner") casam com boa parte do
+histórico; para a busca continuar em milissegundos, o bm25 só é calculado
+sobre as `JANELA_RANKING` ocorrências mais recentes.
+"""
+import re
+from datetime import datetime
+
+from features.busca_produtos import normalizar
+from features.dinheiro import formatar
+from features.orcamento import Orcamento
+
+MESES = ('janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho', 'julho',
+         'agosto', 'setembro', 'outubro', 'novembro', 'dezembro')
+
+# pesos do bm25 por coluna: cliente, proposta, data, descricoes, valores
+_PESOS = (10.0, 5.0, 2.0, 1.0, 1.0)
+JANELA_RANKING = 5000
+
+_SQL_INSERIR = (
+    "INSERT INTO propostas (cliente, proposta, data, descricoes, valores, total, arquivo, orcamento_id) "
+    "VALUES (:cliente, :proposta, :data, :descricoes, :valores, :total, :arquivo, :orcamento_id)"
+)
+
+
+def _data_indexada(data):
+    """'15/03/2025' -> '15/03/2025 março 2025' (permite buscar pelo nome do mês)."""
+    try:
+        d = datetime.strptime(data.strip(), '%d/%m/%Y')
+    except (ValueError, AttributeError):
+        return data or ''
+    return f"{data.strip()} {MESES[d.month - 1]} {d.year}"
+
+
+def registro_proposta(cliente, proposta, data, servicos, arquivo=None, orcamento_id=None):
+    """Linha de `propostas` a partir dos dados da proposta e dos serviços (total em centavos).
+
+    `servicos` é um `Orcamento`; listas no formato antigo passam por
+    `ItemOrcamento.de_dict` (ValueError para valor ilegível).
+    """
+    if not isinstance(servicos, Orcamento):
+        servicos = Orcamento(servicos)
+    # só descrição e total de cada linha entram no histórico
+    descricoes, totais = servicos.descricoes, servicos.totais
+    total = servicos.total
+    return {
+        'cliente': cliente or '',
+        'proposta': proposta or '',
+        'data': _data_indexada(data),
+        'descricoes': '\n'.join(str(d) for d in descricoes),
+        'valores': ' '.join([formatar(total)] + [formatar(t) for t in totais]),
+        'total': total,
+        'arquivo': arquivo,
+        'orcamento_id': orcamento_id,
+    }
+
+
+def indexar_propostas(conn, registros):
+    """Grava vários registros (de `registro_proposta`) numa transação."""
+    try:
+        conn.executemany(_SQL_INSERIR, registros)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def indexar_proposta(conn, cliente, proposta, data, servicos, arquivo=None, orcamento_id=None):
+    """Registra uma proposta emitida no histórico. Retorna o id."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_SQL_INSERIR, registro_proposta(cliente, proposta, data, servicos, arquivo, orcamento_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return cursor.lastrowid
+
+
+def fts_disponivel(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'propostas_fts'"
+    ).fetchone() is not None
+
+
+def _termos(texto):
+    return re.findall(r'\w+', normalizar(texto or ''))
+
+
+def _trecho(descricoes, termos, max_linhas=3):
+    """Linhas de `descricoes` que têm alguma palavra começando por um dos termos."""
+    achadas = []
+    for linha in descricoes.splitlines():
+        palavras = _termos(linha)
+        if any(p.startswith(t) for t in termos for p in palavras):
+            if linha not in achadas:
+                achadas.append(linha)
+            if len(achadas) >= max_linhas:
+                break
+    return ' | '.join(achadas)
+
+
+def buscar_propostas(conn, texto, limite=50):
+    """Propostas que contêm todos os termos (por prefixo), das mais relevantes às menos.
+
+    Retorna dicts com id, cliente, proposta, data, total (centavos), arquivo, gerada_em e
+    `trecho` (linhas de serviço que contêm os termos).
+    """
+    termos = _termos(texto)
+    colunas = "p.id, p.cliente, p.proposta, p.data, p.total, p.arquivo, p.gerada_em, p.descricoes"
+    if not termos:
+        sql = f"SELECT {colunas} FROM propostas p ORDER BY p.id DESC LIMIT ?"
+        rows = conn.execute(sql, (limite,)).fetchall()
+    elif fts_disponivel(conn):
+        consulta = ' '.join(f'"{t}"*' for t in termos)
+        # rowid da JANELA_RANKING-ésima ocorrência mais recente (percorre só o doclist)
+        corte = conn.execute(
+            "SELECT rowid FROM propostas_fts WHERE propostas_fts MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+            (consulta, JANELA_RANKING - 1),
+        ).fetchone()
+        pesos = ', '.join(str(p) for p in _PESOS)
+        # ordena só os rowids (o sorter não carrega as colunas de texto)...
+        ids = [r[0] for r in conn.execute(
+            "SELECT rowid FROM propostas_fts WHERE propostas_fts MATCH ? AND rowid >= ? "
+            f"ORDER BY bm25(propostas_fts, {pesos}), rowid DESC LIMIT ?",
+            (consulta, corte[0] if corte else 0, limite),
+        )]
+        # ...e busca os dados apenas dos `limite` primeiros
+        por_id = {r[0]: r for r in conn.execute(
+            f"SELECT {colunas} FROM propostas p WHERE p.id IN ({', '.join('?' * len(ids))})", ids,
+        )} if ids else {}
+        rows = [por_id[i] for i in ids if i in por_id]
+    else:
+        # sem FTS5: varredura com LIKE (mesma semântica de "todos os termos"); os termos
+        # vêm sem acento, então o texto gravado é normalizado do mesmo jeito antes de comparar
+        conn.create_function('normalizar', 1, normalizar, deterministic=True)
+        alvo = "normalizar(p.cliente || ' ' || p.proposta || ' ' || p.data || ' ' || p.descricoes || ' ' || p.valores)"
+        sql = (f"SELECT {colunas} FROM propostas p WHERE "
+               + ' AND '.join(f"{alvo} LIKE ?" for _ in termos)
+               + " ORDER BY p.id DESC LIMIT ?")
+        params = tuple(f'%{t}%' for t in termos) + (limite,)
+        rows = conn.execute(sql, params).fetchall()
+    chaves = ('id', 'cliente', 'proposta', 'data', 'total', 'arquivo', 'gerada_em')
+    resultados = []
+    for row in rows:
+        r = dict(zip(chaves, row))
+        r['trecho'] = _trecho(row[-1], termos) if termos else ''
+        resultados.append(r)
+    return resultados
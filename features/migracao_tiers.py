@@ -0,0 +1,138 @@
+"""Conversão das faixas legadas em JSON (`produtos.tiers`) para `faixas_unitarias`.
+
+Bancos antigos guardam as faixas de preço dos produtos unitários como JSON
+em `produtos.tiers` ([{"min", "max", "price"}]); o app hoje só usa
+`produtos_unitarios`/`faixas_unitarias` (as que os popups editam e o índice
+em memória resolve). `converter_tiers` converte o catálogo inteiro de uma
+vez, com `executemany`, preservando a regra antiga: vale a primeira faixa
+do JSON que contém a quantidade (sobreposições são resolvidas a favor da
+anterior) e nada depois da primeira faixa ilegível.
+
+Produtos convertidos ficam com `tiers` NULL. Ficam como estão, e são
+reportados como conflito: JSON ilegível, `tiers` em produto que não é
+unitário, produto que já tem faixas cadastradas diferentes das do JSON
+(as cadastradas valem) e JSON que só converte com ajustes (faixa
+sobreposta, invertida ou ilegível) — este último só é convertido, com os
+ajustes listados no relatório, quando `ajustar=True`. Faixas já
+cadastradas iguais às do JSON só limpam o `tiers`.
+"""
+import json
+from collections import namedtuple
+
+from features.faixas_validacao import segmentos
+# a leitura do JSON legado é a mesma da migração v7 (congelada lá)
+from features.migracoes import faixas_do_tiers
+from features.repositorio import get_repositorio
+
+JSON_INVALIDO = 'json_invalido'
+TIPO_ERRADO = 'tipo_errado'
+FAIXAS_DIFERENTES = 'faixas_diferentes'
+FAIXAS_AJUSTADAS = 'faixas_ajustadas'
+
+ROTULOS = {
+    JSON_INVALIDO: 'JSON ilegível',
+    TIPO_ERRADO: 'faixas em produto que não é unitário',
+    FAIXAS_DIFERENTES: 'faixas já cadastradas diferentes das do JSON',
+    FAIXAS_AJUSTADAS: 'faixas do JSON que precisariam de ajuste',
+}
+
+Conflito = namedtuple('Conflito', 'tipo produto detalhe')
+
+
+class RelatorioTiers:
+    """Resultado de `converter_tiers`."""
+
+    def __init__(self):
+        self.produtos = 0       # produtos com `tiers` preenchido
+        self.convertidos = 0    # `tiers` limpo (faixas gravadas ou já iguais)
+        self.faixas = 0         # faixas inseridas
+        self.conflitos = []
+        self.avisos = []        # (produto, texto)
+
+    def texto(self, limite=50):
+        linhas = [
+            f"{self.produtos} produto(s) com faixas em JSON: {self.convertidos} convertido(s), "
+            f"{self.faixas} faixa(s) gravada(s), {len(self.conflitos)} conflito(s)."
+        ]
+        itens = [f"'{c.produto}': {ROTULOS[c.tipo]}" + (f" ({c.detalhe})" if c.detalhe else '')
+                 for c in self.conflitos]
+        itens.extend(f"'{produto}': {texto}" for produto, texto in self.avisos)
+        if itens:
+            linhas.append('')
+            linhas.extend(itens[:limite])
+            if len(itens) > limite:
+                linhas.append(f"... e mais {len(itens) - limite}")
+        return '\n'.join(linhas)
+
+
+def converter_tiers(cursor, ajustar=False):
+    """Converte todos os `produtos.tiers` em faixas pelo `cursor`, sem commit. Retorna `RelatorioTiers`.
+
+    Com `ajustar=False`, JSON que só converte com ajustes fica intacto e vira
+    conflito `FAIXAS_AJUSTADAS`. Quem chama controla a transação (`migrar_tiers`).
+    """
+    rel = RelatorioTiers()
+    cursor.execute("SELECT nome, tipo, tiers FROM produtos WHERE tiers IS NOT NULL AND tiers != ''")
+    legados = cursor.fetchall()
+    rel.produtos = len(legados)
+    if not legados:
+        return rel
+
+    cursor.execute(
+        "SELECT pu.nome, f.qtd_min, f.qtd_max, f.preco FROM faixas_unitarias f "
+        "JOIN produtos_unitarios pu ON pu.id = f.produto_id"
+    )
+    cadastradas = {}
+    for nome, qmin, qmax, preco in cursor.fetchall():
+        cadastradas.setdefault(nome, []).append((qmin, qmax, preco))
+
+    limpar = []
+    novas = {}
+    for nome, tipo, tiers in legados:
+        try:
+            faixas, avisos = faixas_do_tiers(tiers)
+        except ValueError as e:
+            rel.conflitos.append(Conflito(JSON_INVALIDO, nome, str(e)))
+            continue
+        if tipo != 'unit':
+            rel.conflitos.append(Conflito(TIPO_ERRADO, nome, f"tipo '{tipo}'"))
+            continue
+        existentes = cadastradas.get(nome)
+        if existentes:
+            if segmentos(existentes) != segmentos(faixas):
+                rel.conflitos.append(Conflito(
+                    FAIXAS_DIFERENTES, nome, f"{len(existentes)} cadastrada(s), {len(faixas)} no JSON"))
+                continue
+        elif avisos and not ajustar:
+            rel.conflitos.append(Conflito(FAIXAS_AJUSTADAS, nome, '; '.join(avisos)))
+            continue
+        elif faixas:
+            novas[nome] = faixas
+        rel.avisos.extend((nome, a) for a in avisos)
+        limpar.append((nome,))
+
+    if novas:
+        cursor.executemany("INSERT OR IGNORE INTO produtos_unitarios (nome) VALUES (?)", ((n,) for n in novas))
+        cursor.execute(
+            "SELECT nome, id FROM produtos_unitarios WHERE nome IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(novas), ensure_ascii=False),),
+        )
+        ids = dict(cursor.fetchall())
+        cursor.executemany(
+            "INSERT INTO faixas_unitarias (produto_id, qtd_min, qtd_max, preco) VALUES (?, ?, ?, ?)",
+            ((ids[nome], qmin, qmax, preco) for nome, faixas in novas.items() for qmin, qmax, preco in faixas),
+        )
+        rel.faixas = sum(len(f) for f in novas.values())
+    cursor.executemany("UPDATE produtos SET tiers = NULL WHERE nome = ?", limpar)
+    rel.convertidos = len(limpar)
+    return rel
+
+
+def migrar_tiers(conn, ajustar=False):
+    """Converte os `tiers` legados numa transação do repositório; índice e regras de preço são atualizados após o commit."""
+    repo = get_repositorio(conn)
+    with repo.transacao():
+        rel = converter_tiers(conn.cursor(), ajustar)
+        if rel.faixas:
+            repo.catalogo_alterado()
+    return rel
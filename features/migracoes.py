@@ -0,0 +1,451 @@
+"""Migrações versionadas do banco (`PRAGMA user_version`).
+
+Cada passo roda uma única vez, dentro de uma transação que também grava a
+nova versão. Com o esquema em dia, `migrar` só lê `user_version` e confere
+se o índice FTS5 do histórico existe — nenhum DDL é executado na
+inicialização. O índice é o único passo que pode faltar numa versão em
+dia (SQLite sem FTS5): `garantir_indice_propostas` tenta criá-lo de novo a
+cada abertura, então ele aparece assim que o SQLite passar a ter FTS5.
+"""
+import json
+import logging
+import sqlite3
+from decimal import ROUND_HALF_UP, Decimal
+
+log = logging.getLogger(__name__)
+
+# colunas da tabela produtos (bancos antigos podem não ter todas)
+COLUNAS_PRODUTOS = {
+    "tipo": "tipo TEXT",
+    "largura": "largura REAL",
+    "altura": "altura REAL",
+    "preco_m2": "preco_m2 REAL",
+    "preco_m": "preco_m REAL",
+    "preco_unit": "preco_unit REAL",
+    "tiers": "tiers TEXT",
+}
+
+
+def configurar_conexao(conn):
+    """PRAGMAs por conexão: WAL, synchronous ajustado e chaves estrangeiras."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    # em WAL, NORMAL é seguro contra corrupção e evita um fsync por commit
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+
+
+def _v1_esquema_base(cursor):
+    """Tabelas produtos (compatível), produtos_unitarios e faixas_unitarias."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS produtos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL UNIQUE,
+            tipo TEXT,
+            largura REAL,
+            altura REAL,
+            preco_m2 REAL,
+            preco_m REAL,
+            preco_unit REAL,
+            tiers TEXT
+        )
+    """)
+    # bancos antigos: adiciona as colunas que faltarem
+    cursor.execute("PRAGMA table_info(produtos)")
+    existentes = {r[1] for r in cursor.fetchall()}
+    for nome, definicao in COLUNAS_PRODUTOS.items():
+        if nome not in existentes:
+            cursor.execute(f"ALTER TABLE produtos ADD COLUMN {definicao}")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS produtos_unitarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL UNIQUE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS faixas_unitarias (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            produto_id INTEGER NOT NULL,
+            qtd_min INTEGER NOT NULL,
+            qtd_max INTEGER NOT NULL,
+            preco REAL NOT NULL,
+            FOREIGN KEY(produto_id) REFERENCES produtos_unitarios(id)
+        )
+    """)
+
+
+def _v2_faixas_on_delete_cascade(cursor):
+    """Recria faixas_unitarias com ON DELETE CASCADE, descartando faixas órfãs."""
+    cursor.execute(
+        "DELETE FROM faixas_unitarias WHERE produto_id NOT IN (SELECT id FROM produtos_unitarios)"
+    )
+    cursor.execute("""
+        CREATE TABLE faixas_unitarias_nova (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            produto_id INTEGER NOT NULL,
+            qtd_min INTEGER NOT NULL,
+            qtd_max INTEGER NOT NULL,
+            preco REAL NOT NULL,
+            FOREIGN KEY(produto_id) REFERENCES produtos_unitarios(id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO faixas_unitarias_nova (id, produto_id, qtd_min, qtd_max, preco)
+        SELECT id, produto_id, qtd_min, qtd_max, preco FROM faixas_unitarias
+    """)
+    cursor.execute("DROP TABLE faixas_unitarias")
+    cursor.execute("ALTER TABLE faixas_unitarias_nova RENAME TO faixas_unitarias")
+
+
+def _v3_indices(cursor):
+    """Índices de cobertura para a busca de faixas e de produtos por nome."""
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_faixas_produto_qtd "
+        "ON faixas_unitarias(produto_id, qtd_min, qtd_max, preco)"
+    )
+    # nome já é UNIQUE (índice automático); estes cobrem as colunas lidas junto
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_produtos_nome_tipo ON produtos(nome, tipo)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_produtos_unitarios_nome ON produtos_unitarios(nome, id)")
+
+
+def _v4_orcamentos(cursor):
+    """Orçamentos persistentes: cabeçalho, linhas (snapshot) e diário de alterações."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS orcamentos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cliente TEXT NOT NULL DEFAULT '',
+            numero TEXT NOT NULL DEFAULT '',
+            data TEXT NOT NULL DEFAULT '',
+            status TEXT NOT NULL DEFAULT 'aberto',
+            criado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            atualizado_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orcamentos_status ON orcamentos(status, id)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS orcamento_itens (
+            orcamento_id INTEGER NOT NULL,
+            posicao INTEGER NOT NULL,
+            descricao TEXT NOT NULL,
+            largura TEXT,
+            altura TEXT,
+            quantidade INTEGER NOT NULL,
+            preco REAL NOT NULL,
+            total REAL NOT NULL,
+            PRIMARY KEY (orcamento_id, posicao),
+            FOREIGN KEY(orcamento_id) REFERENCES orcamentos(id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS orcamento_diario (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            orcamento_id INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            posicao INTEGER,
+            dados TEXT,
+            FOREIGN KEY(orcamento_id) REFERENCES orcamentos(id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orcamento_diario ON orcamento_diario(orcamento_id, seq)")
+
+
+def _v5_historico_propostas(cursor):
+    """Propostas emitidas. O índice FTS5 não é versionado: ver `garantir_indice_propostas`."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS propostas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cliente TEXT NOT NULL,
+            proposta TEXT NOT NULL,
+            data TEXT NOT NULL,
+            descricoes TEXT NOT NULL,
+            valores TEXT NOT NULL,
+            total REAL NOT NULL,
+            arquivo TEXT,
+            orcamento_id INTEGER,
+            gerada_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _tem_tabela(cursor, nome):
+    return cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (nome,)
+    ).fetchone() is not None
+
+
+def _indice_propostas(cursor):
+    """Cria propostas_fts (com as propostas já gravadas) e seus triggers. False se o SQLite não tem FTS5."""
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS propostas_fts USING fts5(
+                cliente, proposta, data, descricoes, valores,
+                content='propostas', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        # SQLite sem FTS5: a busca cai para LIKE (features.historico_propostas)
+        log.warning("índice do histórico de propostas indisponível (%s); busca por LIKE", e)
+        return False
+    # propostas gravadas enquanto não havia índice
+    cursor.execute("INSERT INTO propostas_fts(propostas_fts) VALUES ('rebuild')")
+    _gatilhos_propostas(cursor)
+    return True
+
+
+def garantir_indice_propostas(conn):
+    """Cria o índice FTS5 do histórico se ele ainda não existe. Retorna True se o índice existe.
+
+    Idempotente: com o índice criado é só uma leitura de `sqlite_master`.
+    """
+    cursor = conn.cursor()
+    if _tem_tabela(cursor, 'propostas_fts'):
+        return True
+    if not _tem_tabela(cursor, 'propostas'):
+        return False
+    cursor.execute("BEGIN")
+    try:
+        criado = _indice_propostas(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return criado
+
+
+def _gatilhos_propostas(cursor):
+    """Triggers que mantêm propostas_fts (conteúdo externo) a cada INSERT/DELETE em propostas."""
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS propostas_ai AFTER INSERT ON propostas BEGIN
+            INSERT INTO propostas_fts(rowid, cliente, proposta, data, descricoes, valores)
+            VALUES (new.id, new.cliente, new.proposta, new.data, new.descricoes, new.valores);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS propostas_ad AFTER DELETE ON propostas BEGIN
+            INSERT INTO propostas_fts(propostas_fts, rowid, cliente, proposta, data, descricoes, valores)
+            VALUES ('delete', old.id, old.cliente, old.proposta, old.data, old.descricoes, old.valores);
+        END
+    """)
+
+
+def _v6_origem_itens(cursor):
+    """Origem do preço de cada linha do orçamento (produto do catálogo e adicional), para reprecificar."""
+    cursor.execute("ALTER TABLE orcamento_itens ADD COLUMN produto TEXT")
+    cursor.execute("ALTER TABLE orcamento_itens ADD COLUMN adicional REAL NOT NULL DEFAULT 0")
+
+
+# sem `max` na faixa legada vale "sem limite"
+MAX_PADRAO = 10**9
+
+
+def faixas_do_tiers(tiers):
+    """Faixas disjuntas [(qtd_min, qtd_max, preço)] de uma lista `tiers` legada (ou do JSON dela).
+
+    Regra congelada com a v7: é a mesma leitura usada por
+    `features.migracao_tiers` e pela importação de catálogo, então o mesmo
+    JSON vira as mesmas faixas em qualquer caminho.
+
+    Retorna (faixas, avisos): os avisos descrevem o que foi ajustado
+    (sobreposição resolvida, faixa inválida ou ilegível descartada).
+    Levanta ValueError se `tiers` não for uma lista.
+    """
+    if isinstance(tiers, str):
+        tiers = json.loads(tiers)
+    if not isinstance(tiers, list):
+        raise ValueError('tiers não é uma lista')
+    faixas = []
+    avisos = []
+    cobertos = []  # intervalos das faixas anteriores (têm prioridade)
+    for pos, t in enumerate(tiers, start=1):
+        try:
+            qmin = int(t.get('min', 0))
+            qmax = int(t.get('max', MAX_PADRAO))
+            preco = float(t.get('price', 0))
+        except Exception:
+            if pos < len(tiers):
+                avisos.append(f"faixa #{pos} ilegível: ela e as {len(tiers) - pos} seguinte(s) foram descartadas")
+            else:
+                avisos.append(f"faixa #{pos} ilegível foi descartada")
+            break
+        # quantidades < 1 não existem
+        qmin = max(qmin, 1)
+        if qmin > qmax:
+            avisos.append(f"faixa #{pos} inválida {qmin}-{qmax} foi descartada")
+            continue
+        partes = [(qmin, qmax)]
+        for ini, fim in cobertos:
+            restantes = []
+            for a, b in partes:
+                if b < ini or a > fim:
+                    restantes.append((a, b))
+                    continue
+                if a < ini:
+                    restantes.append((a, ini - 1))
+                if b > fim:
+                    restantes.append((fim + 1, b))
+            partes = restantes
+        if partes != [(qmin, qmax)]:
+            avisos.append(f"faixa #{pos} {qmin}-{qmax} se sobrepõe a uma anterior (vale a anterior)")
+        faixas.extend((a, b, preco) for a, b in partes)
+        cobertos.append((qmin, qmax))
+    faixas.sort()
+    return faixas, avisos
+
+
+def _v7_tiers_para_faixas(cursor):
+    """Faixas legadas em JSON (`produtos.tiers`) viram linhas de faixas_unitarias.
+
+    Só converte (e limpa o `tiers` de) produtos unitários sem faixas
+    cadastradas cujo JSON vale como está (`faixas_do_tiers` sem nenhum
+    aviso: nada ilegível, invertido ou sobreposto). Os demais ficam intactos
+    para Diagnóstico > Migrar faixas legadas, que mostra o relatório.
+    """
+    cursor.execute("""
+        SELECT p.nome, p.tiers FROM produtos p
+        WHERE p.tipo = 'unit' AND p.tiers IS NOT NULL AND p.tiers != ''
+          AND NOT EXISTS (
+              SELECT 1 FROM faixas_unitarias f JOIN produtos_unitarios pu ON pu.id = f.produto_id
+              WHERE pu.nome = p.nome)
+    """)
+    convertidos = []
+    for nome, tiers in cursor.fetchall():
+        try:
+            faixas, avisos = faixas_do_tiers(tiers)
+        except ValueError:
+            continue
+        if not avisos:
+            convertidos.append((nome, faixas))
+    cursor.executemany("INSERT OR IGNORE INTO produtos_unitarios (nome) VALUES (?)", ((n,) for n, _ in convertidos))
+    for nome, faixas in convertidos:
+        cursor.executemany(
+            "INSERT INTO faixas_unitarias (produto_id, qtd_min, qtd_max, preco) "
+            "SELECT id, ?, ?, ? FROM produtos_unitarios WHERE nome = ?",
+            ((qmin, qmax, preco, nome) for qmin, qmax, preco in faixas),
+        )
+    cursor.executemany("UPDATE produtos SET tiers = NULL WHERE nome = ?", ((n,) for n, _ in convertidos))
+
+
+def _centavos_v8(valor):
+    """Reais gravados antes da v8 -> centavos (meio centavo para longe do zero). Regra congelada desta migração."""
+    d = Decimal(repr(valor)) if isinstance(valor, float) else Decimal(str(valor).strip().replace(',', '.'))
+    return int((d * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _v8_dinheiro_em_centavos(cursor):
+    """Preço/total das linhas do orçamento e total das propostas em centavos (INTEGER).
+
+    As tabelas são recriadas: numa coluna REAL a afinidade converteria os
+    centavos de volta em float. As entradas de linha do diário também passam
+    a guardar centavos.
+    """
+    itens = cursor.execute(
+        "SELECT orcamento_id, posicao, descricao, largura, altura, quantidade, preco, total, produto, adicional "
+        "FROM orcamento_itens"
+    ).fetchall()
+    cursor.execute("""
+        CREATE TABLE orcamento_itens_nova (
+            orcamento_id INTEGER NOT NULL,
+            posicao INTEGER NOT NULL,
+            descricao TEXT NOT NULL,
+            largura TEXT,
+            altura TEXT,
+            quantidade INTEGER NOT NULL,
+            preco INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            produto TEXT,
+            adicional REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (orcamento_id, posicao),
+            FOREIGN KEY(orcamento_id) REFERENCES orcamentos(id) ON DELETE CASCADE
+        )
+    """)
+    cursor.executemany(
+        "INSERT INTO orcamento_itens_nova VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (r[:6] + (_centavos_v8(r[6]), _centavos_v8(r[7])) + r[8:] for r in itens),
+    )
+    cursor.execute("DROP TABLE orcamento_itens")
+    cursor.execute("ALTER TABLE orcamento_itens_nova RENAME TO orcamento_itens")
+
+    entradas = cursor.execute(
+        "SELECT seq, dados FROM orcamento_diario WHERE op IN ('inserir', 'atualizar')"
+    ).fetchall()
+    novas = []
+    for seq, dados in entradas:
+        linha = json.loads(dados)
+        linha[4], linha[5] = _centavos_v8(linha[4]), _centavos_v8(linha[5])
+        novas.append((json.dumps(linha, ensure_ascii=False), seq))
+    cursor.executemany("UPDATE orcamento_diario SET dados = ? WHERE seq = ?", novas)
+
+    propostas = cursor.execute(
+        "SELECT id, cliente, proposta, data, descricoes, valores, total, arquivo, orcamento_id, gerada_em FROM propostas"
+    ).fetchall()
+    cursor.execute("""
+        CREATE TABLE propostas_nova (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cliente TEXT NOT NULL,
+            proposta TEXT NOT NULL,
+            data TEXT NOT NULL,
+            descricoes TEXT NOT NULL,
+            valores TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            arquivo TEXT,
+            orcamento_id INTEGER,
+            gerada_em TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.executemany(
+        "INSERT INTO propostas_nova VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (r[:6] + (_centavos_v8(r[6]),) + r[7:] for r in propostas),
+    )
+    # os triggers do FTS caem junto com a tabela antiga; o índice (mesmos ids) continua válido
+    cursor.execute("DROP TABLE propostas")
+    cursor.execute("ALTER TABLE propostas_nova RENAME TO propostas")
+    if _tem_tabela(cursor, 'propostas_fts'):
+        _gatilhos_propostas(cursor)
+
+
+MIGRACOES = [
+    (1, _v1_esquema_base),
+    (2, _v2_faixas_on_delete_cascade),
+    (3, _v3_indices),
+    (4, _v4_orcamentos),
+    (5, _v5_historico_propostas),
+    (6, _v6_origem_itens),
+    (7, _v7_tiers_para_faixas),
+    (8, _v8_dinheiro_em_centavos),
+]
+
+VERSAO_ATUAL = MIGRACOES[-1][0]
+
+
+def versao(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrar(conn):
+    """Aplica as migrações pendentes e garante o índice do histórico. Retorna a lista de versões aplicadas."""
+    atual = versao(conn)
+    pendentes = [(v, passo) for v, passo in MIGRACOES if v > atual]
+    if not pendentes:
+        garantir_indice_propostas(conn)
+        return []
+
+    # recriar tabelas com FK exige foreign_keys desligado (fora de transação)
+    conn.execute("PRAGMA foreign_keys=OFF")
+    aplicadas = []
+    try:
+        for v, passo in pendentes:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                passo(cursor)
+                cursor.execute(f"PRAGMA user_version = {int(v)}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            aplicadas.append(v)
+    finally:
+        conn.execute("PRAGMA foreign_keys=ON")
+    garantir_indice_propostas(conn)
+    return aplicadas
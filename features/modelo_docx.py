@@ -0,0 +1,127 @@
+"""Compilador de modelos .docx.
+
+Abre o modelo uma única vez e registra onde está cada `{{...}}` (inclusive
+placeholders quebrados em vários runs). Cada proposta recebe uma cópia
+(`copy.deepcopy`) do documento já analisado, sem reabrir o .docx, e é
+preenchida indo direto a esses parágrafos, numa única passada, sem
+percorrer o documento inteiro por placeholder. O resultado fica em cache
+por caminho + mtime do modelo.
+"""
+import copy
+import os
+import re
+from functools import lru_cache
+from io import BytesIO
+
+from docx import Document
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+PLACEHOLDER_RE = re.compile(r'\{\{\s*([A-Za-z0-9_]+)\s*\}\}')
+
+
+def _localizar_run(limites, pos):
+    """Índice do run que contém o caractere `pos` (limites = fim acumulado de cada run)."""
+    for i, fim in enumerate(limites):
+        if pos < fim:
+            return i
+    return len(limites) - 1
+
+
+class ModeloCompilado:
+    """Modelo .docx já analisado: bytes do arquivo, documento aberto + posições dos placeholders.
+
+    `locais` é uma lista de (caminho, tokens), onde `caminho` são os índices
+    dos filhos desde `w:document` até o `w:p`, e cada token é
+    (nome, run_ini, off_ini, run_fim, off_fim) com `off_fim` exclusivo.
+    O documento aberto nunca é alterado: só serve de origem das cópias.
+    """
+
+    def __init__(self, dados, documento, locais):
+        self.dados = dados
+        self._documento = documento
+        self.locais = locais
+
+    @property
+    def placeholders(self):
+        return {tok[0] for _, tokens in self.locais for tok in tokens}
+
+    def novo_documento(self):
+        """Cópia independente do modelo (pacote inteiro), pronta para `preencher`."""
+        return copy.deepcopy(self._documento)
+
+    def preencher(self, doc, valores):
+        """Substitui os placeholders de `doc` (criado por `novo_documento`) pelos `valores`."""
+        raiz = doc.element
+        for caminho, tokens in self.locais:
+            el = raiz
+            for i in caminho:
+                el = el[i]
+            runs = Paragraph(el, None).runs
+            textos = [r.text for r in runs]
+            alterados = set()
+            # de trás para frente para que os offsets anteriores continuem válidos
+            for nome, ri, oi, rf, of in reversed(tokens):
+                if nome not in valores:
+                    continue
+                valor = str(valores[nome])
+                if ri == rf:
+                    textos[ri] = textos[ri][:oi] + valor + textos[ri][of:]
+                else:
+                    textos[ri] = textos[ri][:oi] + valor
+                    for k in range(ri + 1, rf):
+                        textos[k] = ''
+                    textos[rf] = textos[rf][of:]
+                alterados.update(range(ri, rf + 1))
+            for k in alterados:
+                runs[k].text = textos[k]
+        return doc
+
+
+def _caminho(raiz, el):
+    caminho = []
+    while el is not raiz:
+        pai = el.getparent()
+        caminho.append(pai.index(el))
+        el = pai
+    caminho.reverse()
+    return tuple(caminho)
+
+
+def _compilar(dados):
+    doc = Document(BytesIO(dados))
+    raiz = doc.element
+    locais = []
+    for el in raiz.body.iter(qn('w:p')):
+        runs = Paragraph(el, None).runs
+        textos = [r.text for r in runs]
+        texto = ''.join(textos)
+        if '{{' not in texto:
+            continue
+        limites = []
+        acumulado = 0
+        for t in textos:
+            acumulado += len(t)
+            limites.append(acumulado)
+        tokens = []
+        for m in PLACEHOLDER_RE.finditer(texto):
+            ri = _localizar_run(limites, m.start())
+            rf = _localizar_run(limites, m.end() - 1)
+            oi = m.start() - (limites[ri] - len(textos[ri]))
+            of = m.end() - (limites[rf] - len(textos[rf]))
+            tokens.append((m.group(1), ri, oi, rf, of))
+        if tokens:
+            locais.append((_caminho(raiz, el), tokens))
+    return ModeloCompilado(dados, doc, locais)
+
+
+@lru_cache(maxsize=16)
+def _compilar_cache(path, mtime):
+    with open(path, 'rb') as f:
+        return _compilar(f.read())
+
+
+def compilar_modelo(path):
+    """Retorna o `ModeloCompilado` de `path`, reaproveitando o cache se o arquivo não mudou."""
+    path = os.path.abspath(path)
+    return _compilar_cache(path, os.path.getmtime(path))
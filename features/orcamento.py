@@ -0,0 +1,243 @@
+"""Itens do orçamento em formato compacto.
+
+`ItemOrcamento` é uma linha com `__slots__` (sem o dict por instância).
+Preço e total são centavos inteiros (`features.dinheiro`). O total é
+calculado com a taxa do catálogo sem arredondar (ela continua REAL no
+banco) e arredondado uma única vez; o preço é a taxa arredondada, só para
+exibição, e não é multiplicado de novo. `Orcamento`
+guarda as linhas em colunas: textos em listas e os campos numéricos em
+`array` ('q' para quantidade, preço e total; 'd' para o adicional), com o
+total geral (soma exata de inteiros) mantido a cada alteração. Para o
+código que ainda espera o formato antigo (dicts com 'Descrição',
+'Total (R$)', ..., valores em reais), `ItemOrcamento` aceita
+`item['Chave']` e `Orcamento.como_dicts()` devolve a lista de dicts.
+Cada linha guarda também a origem do preço (produto do catálogo e adicional
+de instalação/estrutura), usada para reprecificar o orçamento
+(`features.reprecificacao`).
+"""
+from array import array
+
+from features.dinheiro import centavos, reais
+
+# chave do dict antigo -> atributo
+CHAVES = {
+    'Descrição': 'descricao',
+    'Largura': 'largura',
+    'Altura': 'altura',
+    'Quantidade': 'quantidade',
+    'Preço': 'preco',
+    'Total (R$)': 'total',
+}
+# atributos em centavos que o formato antigo expõe em reais
+_EM_REAIS = frozenset(('preco', 'total'))
+
+
+class ItemOrcamento:
+    """Uma linha de serviço. Largura/altura são o texto digitado ('X' = sem medida).
+
+    `preco` e `total` são centavos (int).
+    `produto` é o nome no catálogo de onde veio o preço (None = preço manual)
+    e `adicional` o valor de instalação/estrutura por item somado ao total.
+    """
+
+    __slots__ = ('descricao', 'largura', 'altura', 'quantidade', 'preco', 'total', 'produto', 'adicional')
+
+    def __init__(self, descricao, largura='X', altura='X', quantidade=1, preco=0, total=0,
+                 produto=None, adicional=0.0):
+        self.descricao = descricao
+        self.largura = largura
+        self.altura = altura
+        self.quantidade = quantidade
+        self.preco = preco
+        self.total = total
+        self.produto = produto
+        self.adicional = adicional
+
+    @classmethod
+    def de_dict(cls, d):
+        return cls(d['Descrição'], d.get('Largura', 'X'), d.get('Altura', 'X'),
+                   int(d.get('Quantidade', 1)), centavos(d.get('Preço', 0)), centavos(d['Total (R$)']))
+
+    def como_dict(self):
+        return {chave: self[chave] for chave in CHAVES}
+
+    # adaptador para o formato antigo: item['Total (R$)'] (em reais)
+    def __getitem__(self, chave):
+        try:
+            attr = CHAVES[chave]
+        except KeyError:
+            raise KeyError(chave) from None
+        valor = getattr(self, attr)
+        return reais(valor) if attr in _EM_REAIS else valor
+
+    def get(self, chave, padrao=None):
+        return self[chave] if chave in CHAVES else padrao
+
+    def keys(self):
+        return CHAVES.keys()
+
+    def __eq__(self, outro):
+        if not isinstance(outro, ItemOrcamento):
+            return NotImplemented
+        return all(getattr(self, a) == getattr(outro, a) for a in self.__slots__)
+
+    def __repr__(self):
+        return (f"ItemOrcamento({self.descricao!r}, {self.largura!r}, {self.altura!r}, "
+                f"{self.quantidade!r}, {self.preco!r}, {self.total!r}, {self.produto!r}, {self.adicional!r})")
+
+
+def _como_item(item):
+    return item if isinstance(item, ItemOrcamento) else ItemOrcamento.de_dict(item)
+
+
+class Orcamento:
+    """Lista de serviços em colunas, com total geral em O(1).
+
+    Comporta-se como uma sequência de `ItemOrcamento` (len, índice, iteração,
+    insert/pop/clear); os itens são montados sob demanda a partir das colunas.
+    Para percorrer muitas linhas sem criar objetos, use `linhas()` (tuplas) ou
+    as colunas `quantidades`, `precos` e `totais` (centavos) diretamente. A origem do
+    preço fica nas colunas `produtos` e `adicionais` (`linhas_completas()`).
+    """
+
+    __slots__ = ('descricoes', 'larguras', 'alturas', 'quantidades', 'precos', 'totais',
+                 'produtos', 'adicionais', '_soma')
+
+    def __init__(self, itens=()):
+        self.descricoes = []
+        self.larguras = []
+        self.alturas = []
+        self.quantidades = array('q')
+        self.precos = array('q')
+        self.totais = array('q')
+        self.produtos = []
+        self.adicionais = array('d')
+        self._soma = 0
+        for item in itens:
+            self.append(item)
+
+    # ---------------- sequência ----------------
+    def __len__(self):
+        return len(self.totais)
+
+    def __bool__(self):
+        return len(self.totais) > 0
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        return ItemOrcamento(self.descricoes[idx], self.larguras[idx], self.alturas[idx],
+                             self.quantidades[idx], self.precos[idx], self.totais[idx],
+                             self.produtos[idx], self.adicionais[idx])
+
+    def __setitem__(self, idx, item):
+        item = _como_item(item)
+        self._soma += item.total - self.totais[idx]
+        self.descricoes[idx] = item.descricao
+        self.larguras[idx] = item.largura
+        self.alturas[idx] = item.altura
+        self.quantidades[idx] = int(item.quantidade)
+        self.precos[idx] = item.preco
+        self.totais[idx] = item.total
+        self.produtos[idx] = item.produto
+        self.adicionais[idx] = item.adicional or 0.0
+
+    def __iter__(self):
+        for linha in self.linhas_completas():
+            yield ItemOrcamento(*linha)
+
+    def insert(self, idx, item):
+        item = _como_item(item)
+        self.descricoes.insert(idx, item.descricao)
+        self.larguras.insert(idx, item.largura)
+        self.alturas.insert(idx, item.altura)
+        self.quantidades.insert(idx, int(item.quantidade))
+        self.precos.insert(idx, item.preco)
+        self.totais.insert(idx, item.total)
+        self.produtos.insert(idx, item.produto)
+        self.adicionais.insert(idx, item.adicional or 0.0)
+        self._soma += item.total
+
+    def append(self, item):
+        self.insert(len(self), item)
+
+    def pop(self, idx=-1):
+        item = self[idx]
+        del self.descricoes[idx], self.larguras[idx], self.alturas[idx]
+        del self.quantidades[idx], self.precos[idx], self.totais[idx]
+        del self.produtos[idx], self.adicionais[idx]
+        self._soma -= item.total
+        return item
+
+    def clear(self):
+        del self.descricoes[:], self.larguras[:], self.alturas[:]
+        del self.quantidades[:], self.precos[:], self.totais[:]
+        del self.produtos[:], self.adicionais[:]
+        self._soma = 0
+
+    def copia(self):
+        novo = Orcamento()
+        novo.descricoes = list(self.descricoes)
+        novo.larguras = list(self.larguras)
+        novo.alturas = list(self.alturas)
+        novo.quantidades = array('q', self.quantidades)
+        novo.precos = array('q', self.precos)
+        novo.totais = array('q', self.totais)
+        novo.produtos = list(self.produtos)
+        novo.adicionais = array('d', self.adicionais)
+        novo._soma = self._soma
+        return novo
+
+    # ---------------- agregados ----------------
+    @property
+    def total(self):
+        """Total geral em centavos, atualizado a cada inserção/remoção (exato)."""
+        return self._soma
+
+    def recalcular_total(self):
+        """Soma das linhas refeita do zero (a soma incremental de inteiros já é exata)."""
+        self._soma = sum(self.totais)
+        return self._soma
+
+    @property
+    def quantidade_total(self):
+        return sum(self.quantidades)
+
+    # ---------------- acesso em massa ----------------
+    def linhas(self):
+        """Tuplas (descricao, largura, altura, quantidade, preco, total), sem criar itens (valores em centavos)."""
+        return zip(self.descricoes, self.larguras, self.alturas, self.quantidades, self.precos, self.totais)
+
+    def linhas_completas(self):
+        """Como `linhas()`, acrescido de (produto, adicional): o formato salvo no banco."""
+        return zip(self.descricoes, self.larguras, self.alturas, self.quantidades, self.precos, self.totais,
+                   self.produtos, self.adicionais)
+
+    def linha(self, idx):
+        return (self.descricoes[idx], self.larguras[idx], self.alturas[idx],
+                self.quantidades[idx], self.precos[idx], self.totais[idx])
+
+    def como_dicts(self):
+        """Formato antigo: lista de dicts com 'Descrição', ..., 'Total (R$)' (valores em reais)."""
+        chaves = tuple(CHAVES)
+        return [dict(zip(chaves, (desc, larg, alt, qtd, reais(preco), reais(total))))
+                for desc, larg, alt, qtd, preco, total in self.linhas()]
+
+
+def linhas_servicos(servicos):
+    """(descricao, largura, altura, quantidade, preco, total) em centavos de cada serviço.
+
+    Aceita um `Orcamento` (sem criar objetos por linha) ou uma lista de dicts
+    no formato antigo (valores em reais).
+    """
+    if isinstance(servicos, Orcamento):
+        return servicos.linhas()
+    return ((s['Descrição'], s['Largura'], s['Altura'], s['Quantidade'], centavos(s['Preço']), centavos(s['Total (R$)']))
+            for s in servicos)
+
+
+def total_servicos(servicos):
+    """Total em centavos de um `Orcamento` (O(1)) ou de uma lista de dicts no formato antigo."""
+    if isinstance(servicos, Orcamento):
+        return servicos.total
+    return sum(centavos(s['Total (R$)']) for s in servicos)
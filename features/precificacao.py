@@ -0,0 +1,209 @@
+"""Núcleo de precificação sem dependência de widgets.
+
+Recebe linhas simples (`LinhaPreco`) e devolve totais. Os `TotalCalculator`
+(Tk) apenas leem os widgets, montam uma `LinhaPreco` e escrevem o resultado
+de volta. `price_many` precifica muitas linhas de uma vez com NumPy,
+agrupando por tipo; sem NumPy cai para o laço em Python.
+"""
+_np = None
+
+
+def _numpy():
+    """Importa o NumPy no primeiro `price_many` (fora do caminho de abertura do app)."""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except Exception:
+            numpy = False
+        _np = numpy
+    return _np or None
+
+
+# tipos canônicos (iguais aos da coluna produtos.tipo)
+TIPO_UNIT = 'unit'
+TIPO_M2 = 'm2'
+TIPO_M = 'm'
+
+# rótulos do combobox `tipo_calculo` -> tipo canônico
+TIPO_POR_ROTULO = {
+    'Por unidade': TIPO_UNIT,
+    'Por m²': TIPO_M2,
+    'Por m': TIPO_M,
+}
+
+
+class LinhaPreco:
+    """Uma linha a precificar. Medidas em metros (0/None = não informada).
+
+    `instalacao`/`estrutura` são valores por item; com `adicional_por_area`
+    são tratados como valor por m² (área total da linha, já multiplicada pela qtd).
+    """
+
+    __slots__ = ('produto', 'tipo', 'largura', 'altura', 'qtd', 'preco',
+                 'instalacao', 'estrutura', 'adicional_por_area')
+
+    def __init__(self, produto=None, tipo=TIPO_UNIT, largura=None, altura=None, qtd=1, preco=0.0,
+                 instalacao=0.0, estrutura=0.0, adicional_por_area=False):
+        self.produto = produto
+        self.tipo = TIPO_POR_ROTULO.get(tipo, tipo)
+        self.largura = largura
+        self.altura = altura
+        self.qtd = qtd
+        self.preco = preco
+        self.instalacao = instalacao
+        self.estrutura = estrutura
+        self.adicional_por_area = adicional_por_area
+
+
+# ----------------------- parsing de entradas (texto) -----------------------
+def medida_para_metros(s):
+    """Converte uma string numérica para metros.
+    Aceita decimais com '.' ou ','; se o número for maior que 10 assume-se centímetros e divide por 100.
+    Retorna None se inválido ou vazio.
+    """
+    if not s:
+        return None
+    s = str(s).strip().replace(',', '.')
+    if s.upper() == 'X':
+        return None
+    try:
+        v = float(s)
+    except Exception:
+        return None
+    # se valor aparentemente em centímetros (ex: 80, 120) converte para metros
+    if v > 10:
+        return v / 100.0
+    # senão trata como metros (ex: 1.2, 0.8)
+    return v
+
+
+def separar_par(field):
+    """Se o campo contém 'x' como '80x120', retorna tuple (a, b) como strings (sem espaços).
+    Caso contrário retorna None.
+    """
+    if not field:
+        return None
+    if 'x' in field.lower():
+        parts = [p.strip() for p in field.lower().split('x') if p.strip()]
+        if len(parts) >= 2:
+            return parts[0], parts[1]
+    return None
+
+
+def medidas_em_metros(larg_raw, alt_raw):
+    """(largura, altura) em metros a partir do texto digitado, como na calculadora.
+
+    Aceita o par '80x120' num só campo; campos vazios ou 'X' viram None.
+    """
+    larg_raw = str(larg_raw or '').strip()
+    alt_raw = str(alt_raw or '').strip()
+    pair = separar_par(larg_raw) or separar_par(alt_raw)
+    if pair and (not larg_raw or not alt_raw or 'x' in larg_raw.lower() or 'x' in alt_raw.lower()):
+        larg_raw, alt_raw = pair[0], pair[1]
+    return medida_para_metros(larg_raw), medida_para_metros(alt_raw)
+
+
+# ----------------------- cálculo -----------------------
+def calcular_linha(linha):
+    """Total de uma linha (float)."""
+    preco = float(linha.preco or 0.0)
+    qtd = 1 if linha.qtd is None else linha.qtd
+    larg = linha.largura or 0.0
+    alt = linha.altura or 0.0
+
+    if linha.tipo == TIPO_M2:
+        if larg and alt:
+            total = larg * alt * preco * qtd
+        else:
+            # se não foi possível calcular área, cai para preço * qtd
+            total = preco * qtd
+    elif linha.tipo == TIPO_M:
+        total = larg * preco * qtd if larg else preco * qtd
+    else:  # unit
+        total = preco * qtd
+
+    adicional = float(linha.instalacao or 0.0) + float(linha.estrutura or 0.0)
+    if adicional:
+        if linha.adicional_por_area:
+            total += larg * alt * qtd * adicional
+        else:
+            total += adicional
+    return total
+
+
+_CODIGO_TIPO = {TIPO_UNIT: 0, TIPO_M2: 1, TIPO_M: 2}
+
+
+def _colunas(linhas):
+    """Converte uma sequência de `LinhaPreco` em colunas (listas)."""
+    cols = {k: [] for k in ('tipo', 'largura', 'altura', 'qtd', 'preco', 'instalacao', 'estrutura', 'adicional_por_area')}
+    for ln in linhas:
+        cols['tipo'].append(ln.tipo)
+        cols['largura'].append(ln.largura or 0.0)
+        cols['altura'].append(ln.altura or 0.0)
+        cols['qtd'].append(1 if ln.qtd is None else ln.qtd)
+        cols['preco'].append(ln.preco or 0.0)
+        cols['instalacao'].append(ln.instalacao or 0.0)
+        cols['estrutura'].append(ln.estrutura or 0.0)
+        cols['adicional_por_area'].append(bool(ln.adicional_por_area))
+    return cols
+
+
+def price_many(linhas):
+    """Precifica várias linhas numa única passada vetorizada.
+
+    `linhas` pode ser uma sequência de `LinhaPreco` ou um dict de colunas
+    (`tipo`, `largura`, `altura`, `qtd`, `preco` e, opcionais, `instalacao`,
+    `estrutura`, `adicional_por_area`) — o formato colunar evita criar um
+    objeto por linha. Retorna um `numpy.ndarray` de totais (lista sem NumPy).
+    """
+    np = _numpy()
+    if np is None:
+        if isinstance(linhas, dict):
+            n = len(linhas['tipo'])
+            linhas = [
+                LinhaPreco(**{k: v[i] for k, v in linhas.items()})
+                for i in range(n)
+            ]
+        return [calcular_linha(ln) for ln in linhas]
+
+    cols = linhas if isinstance(linhas, dict) else _colunas(linhas)
+    tipos = cols['tipo']
+    n = len(tipos)
+    if isinstance(tipos, np.ndarray) and tipos.dtype.kind in 'iu':
+        codigos = tipos
+    else:
+        codigos = np.fromiter(
+            (_CODIGO_TIPO.get(TIPO_POR_ROTULO.get(t, t), 0) for t in tipos), dtype=np.int8, count=n
+        )
+
+    def _col(nome, padrao=0.0, dtype=np.float64):
+        v = cols.get(nome)
+        if v is None:
+            return np.full(n, padrao, dtype=dtype)
+        return np.nan_to_num(np.asarray(v, dtype=dtype))
+
+    larg = _col('largura')
+    alt = _col('altura')
+    qtd = _col('qtd', 1.0)
+    preco = _col('preco')
+    adicional = _col('instalacao') + _col('estrutura')
+    por_area = _col('adicional_por_area', False, np.bool_)
+
+    # mesma ordem das operações de `calcular_linha`: resultados idênticos bit a bit
+    base = preco.copy()
+
+    # grupo m²: área * preço quando largura e altura existem
+    m2 = (codigos == 1) & (larg > 0) & (alt > 0)
+    base[m2] = larg[m2] * alt[m2] * preco[m2]
+
+    # grupo m: comprimento * preço quando informado
+    m = (codigos == 2) & (larg > 0)
+    base[m] = larg[m] * preco[m]
+
+    # unit e fallback quando faltam medidas: preço * qtd
+    totais = base * qtd
+
+    totais += np.where(por_area, larg * alt * qtd * adicional, adicional)
+    return totais
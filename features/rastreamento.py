@@ -0,0 +1,241 @@
+"""Rastreamento leve de desempenho (spans cronometrados).
+
+Desligado por padrão; liga com a variável de ambiente `ORCAMENTO_RASTREAR`
+(`1` grava em `rastreamento.json`; outro valor é o caminho do arquivo) ou
+pelo menu Diagnóstico do app. Cada span vira um evento "X" do formato
+Chrome trace-event (abre em chrome://tracing ou ui.perfetto.dev). O arquivo
+é uma lista JSON sem o `]` final (opcional no formato), então os eventos
+são só acrescentados; ao passar de `TAMANHO_MAXIMO` ele é rotacionado
+(`rastreamento.json.1`, `.2`, ...). As durações recentes de cada nome ficam
+em memória para o resumo (p50/p95), gravado em `<arquivo>.resumo.json`.
+
+Desligado, o custo é uma checagem de `rastreador.ativo` por chamada.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+
+VARIAVEL_AMBIENTE = 'ORCAMENTO_RASTREAR'
+ARQUIVO_PADRAO = 'rastreamento.json'
+TAMANHO_MAXIMO = 5 * 1024 * 1024
+ARQUIVOS_ANTIGOS = 3
+# eventos acumulados antes de gravar e durações guardadas por nome (resumo)
+LOTE_GRAVACAO = 256
+AMOSTRAS_POR_NOME = 2000
+
+
+def _percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+@lru_cache(maxsize=512)
+def _nome_sql(sql):
+    """Nome do span de um comando SQL: o texto com espaços normalizados (até 100 caracteres)."""
+    texto = ' '.join(sql.split())
+    return texto if len(texto) <= 100 else texto[:97] + '...'
+
+
+class Rastreador:
+    """Coleta spans e os grava em lotes no arquivo de trace (thread-safe)."""
+
+    def __init__(self, caminho=ARQUIVO_PADRAO, tamanho_maximo=TAMANHO_MAXIMO, antigos=ARQUIVOS_ANTIGOS):
+        self.caminho = caminho
+        self.tamanho_maximo = tamanho_maximo
+        self.antigos = antigos
+        self.ativo = False
+        self._lock = threading.Lock()
+        self._pendentes = []
+        self._duracoes = {}     # nome -> deque de durações (us)
+        self._threads = set()   # tids que já têm o evento de nome gravado
+        self._pid = os.getpid()
+
+    # ---------------- liga/desliga ----------------
+    def ativar(self, caminho=None):
+        if caminho:
+            self.caminho = caminho
+        self.ativo = True
+
+    def desativar(self):
+        """Desliga e grava o que estiver pendente (inclusive o resumo)."""
+        self.ativo = False
+        self.gravar()
+
+    def configurar_pelo_ambiente(self, ambiente=None):
+        valor = (ambiente if ambiente is not None else os.environ).get(VARIAVEL_AMBIENTE, '').strip()
+        if valor and valor.lower() not in ('0', 'false', 'nao', 'não'):
+            self.ativar(None if valor.lower() in ('1', 'true', 'sim') else valor)
+        return self.ativo
+
+    # ---------------- coleta ----------------
+    def registrar(self, nome, categoria, inicio_ns, fim_ns, args=None):
+        """Registra um span já medido (tempos de `time.perf_counter_ns`)."""
+        thread = threading.current_thread()
+        evento = {
+            'name': nome, 'cat': categoria, 'ph': 'X',
+            'ts': inicio_ns // 1000, 'dur': (fim_ns - inicio_ns) // 1000,
+            'pid': self._pid, 'tid': thread.ident,
+        }
+        if args:
+            evento['args'] = args
+        with self._lock:
+            if thread.ident not in self._threads:
+                self._threads.add(thread.ident)
+                self._pendentes.append({
+                    'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': thread.ident,
+                    'args': {'name': thread.name},
+                })
+            self._pendentes.append(evento)
+            duracoes = self._duracoes.get(nome)
+            if duracoes is None:
+                duracoes = self._duracoes[nome] = deque(maxlen=AMOSTRAS_POR_NOME)
+            duracoes.append(evento['dur'])
+            cheio = len(self._pendentes) >= LOTE_GRAVACAO
+        if cheio:
+            self.gravar(com_resumo=False)
+
+    @contextmanager
+    def span(self, nome, categoria='app', **args):
+        if not self.ativo:
+            yield
+            return
+        inicio = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.registrar(nome, categoria, inicio, time.perf_counter_ns(), args or None)
+
+    # ---------------- arquivo ----------------
+    def _rotacionar(self):
+        for i in range(self.antigos, 0, -1):
+            origem = self.caminho if i == 1 else f'{self.caminho}.{i - 1}'
+            if os.path.exists(origem):
+                os.replace(origem, f'{self.caminho}.{i}')
+
+    def gravar(self, com_resumo=True):
+        """Acrescenta os eventos pendentes ao arquivo (e reescreve o resumo)."""
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, []
+            if pendentes:
+                try:
+                    tamanho = os.path.getsize(self.caminho)
+                except OSError:
+                    tamanho = 0
+                if tamanho >= self.tamanho_maximo:
+                    self._rotacionar()
+                    tamanho = 0
+                    # o novo arquivo precisa dos nomes das threads de novo
+                    self._threads.clear()
+                with open(self.caminho, 'a', encoding='utf-8') as f:
+                    partes = [] if tamanho else ['[\n']
+                    for i, evento in enumerate(pendentes):
+                        if tamanho or i:
+                            partes.append(',\n')
+                        partes.append(json.dumps(evento, ensure_ascii=False))
+                    f.write(''.join(partes))
+        if com_resumo and self._duracoes:
+            with open(self.caminho_resumo, 'w', encoding='utf-8') as f:
+                json.dump(self.resumo(), f, ensure_ascii=False, indent=1)
+
+    @property
+    def caminho_resumo(self):
+        return os.path.splitext(self.caminho)[0] + '.resumo.json'
+
+    # ---------------- resumo ----------------
+    def resumo(self):
+        """{nome: {n, p50_ms, p95_ms, max_ms, total_ms}} das durações recentes, do maior total ao menor."""
+        with self._lock:
+            copia = {nome: sorted(d) for nome, d in self._duracoes.items()}
+        res = {
+            nome: {
+                'n': len(d),
+                'p50_ms': _percentil(d, 0.50) / 1000,
+                'p95_ms': _percentil(d, 0.95) / 1000,
+                'max_ms': d[-1] / 1000,
+                'total_ms': sum(d) / 1000,
+            }
+            for nome, d in copia.items() if d
+        }
+        return dict(sorted(res.items(), key=lambda kv: -kv[1]['total_ms']))
+
+    def limpar_resumo(self):
+        with self._lock:
+            self._duracoes.clear()
+
+
+rastreador = Rastreador()
+
+
+def span(nome, categoria='app', **args):
+    """`with span('docx.tabela', 'docx', linhas=n): ...` no rastreador global."""
+    return rastreador.span(nome, categoria, **args)
+
+
+def rastreado(nome=None, categoria='ui'):
+    """Decorador: cada chamada da função vira um span (nome padrão: `Classe.metodo`)."""
+    def decorar(fn):
+        nome_span = nome or fn.__qualname__
+
+        @wraps(fn)
+        def envolvida(*args, **kwargs):
+            if not rastreador.ativo:
+                return fn(*args, **kwargs)
+            inicio = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                rastreador.registrar(nome_span, categoria, inicio, time.perf_counter_ns())
+        return envolvida
+    return decorar
+
+
+# ----------------------- SQL -----------------------
+class CursorRastreado(sqlite3.Cursor):
+    """Cursor que cronometra `execute`/`executemany` quando o rastreamento está ligado."""
+
+    def execute(self, sql, parametros=()):
+        if not rastreador.ativo:
+            return super().execute(sql, parametros)
+        inicio = time.perf_counter_ns()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            rastreador.registrar(_nome_sql(sql), 'sql', inicio, time.perf_counter_ns())
+
+    def executemany(self, sql, parametros):
+        if not rastreador.ativo:
+            return super().executemany(sql, parametros)
+        inicio = time.perf_counter_ns()
+        try:
+            return super().executemany(sql, parametros)
+        finally:
+            rastreador.registrar(_nome_sql(sql), 'sql', inicio, time.perf_counter_ns(), {'executemany': True})
+
+
+class ConexaoRastreada(sqlite3.Connection):
+    """Conexão cujos cursores (e atalhos `conn.execute`) são `CursorRastreado`.
+
+    Uso: `sqlite3.connect(path, factory=ConexaoRastreada)`.
+    """
+
+    def cursor(self, factory=CursorRastreado):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+
+    def commit(self):
+        if not rastreador.ativo:
+            return super().commit()
+        inicio = time.perf_counter_ns()
+        try:
+            return super().commit()
+        finally:
+            rastreador.registrar('COMMIT', 'sql', inicio, time.perf_counter_ns())
@@ -0,0 +1,154 @@
+"""Regras de preço compiladas por produto, em cache LRU por conexão.
+
+Cada linha de `produtos` é compilada uma única vez numa função
+`regra(qtd, largura, altura, preco_digitado, adicional)` que devolve o
+total da linha: o tipo (m², m, unidade), o preço cadastrado ou a tabela de
+faixas do produto (a compilada por `features.faixas_index`) e o adicional
+de instalação/estrutura por área ficam presos na closure. Recalcular é
+então uma busca no dicionário + aritmética, sem SQL. O repositório e a
+importação de catálogo invalidam as regras dos produtos que gravam; as
+faixas são lidas do índice, que já é mantido em dia pelo CRUD delas. Um
+produto unitário sem faixas compila para o preço unitário fixo; a primeira
+faixa cadastrada descarta essa regra.
+
+A conta em si é a de `precificacao.calcular_linha` (com
+`adicional_por_area=True`): a closure só fixa o tipo e o preço.
+"""
+from collections import OrderedDict
+from functools import partial
+
+from features.faixas_index import get_indice
+from features.precificacao import TIPO_M, TIPO_M2, TIPO_UNIT, LinhaPreco, calcular_linha
+
+TAMANHO_CACHE = 1024
+
+
+# ----------------------- conta -----------------------
+def _calcular(tipo, preco, qtd, larg, alt, adicional):
+    """Total da linha pelo núcleo (`precificacao.calcular_linha`), com adicional por área."""
+    return calcular_linha(LinhaPreco(tipo=tipo, largura=larg, altura=alt, qtd=qtd, preco=preco,
+                                     instalacao=adicional, adicional_por_area=True))
+
+
+# ----------------------- compilação -----------------------
+def regra_fixa(tipo, preco):
+    """Regra de preço cadastrado (não depende do que foi digitado)."""
+    preco = float(preco)
+
+    def regra(qtd, larg, alt, preco_digitado, adicional):
+        return _calcular(tipo, preco, qtd, larg, alt, adicional)
+    regra.tipo = tipo
+    return regra
+
+
+def regra_faixas(preco_faixa, preco_unit):
+    """Regra unitária: preço da faixa da quantidade (`preco_faixa(qtd)`); sem faixa, o unitário (ou o digitado)."""
+    def regra(qtd, larg, alt, preco_digitado, adicional):
+        preco = preco_faixa(qtd)
+        if preco is None:
+            preco = preco_unit if preco_unit is not None else preco_digitado
+        return _calcular(TIPO_UNIT, preco, qtd, larg, alt, adicional)
+    regra.tipo = TIPO_UNIT
+    return regra
+
+
+_MANUAIS = {}
+
+
+def regra_manual(tipo):
+    """Regra sem cadastro: tipo do combobox e o preço digitado."""
+    regra = _MANUAIS.get(tipo)
+    if regra is None:
+        def regra(qtd, larg, alt, preco_digitado, adicional):
+            return _calcular(tipo, preco_digitado, qtd, larg, alt, adicional)
+        regra.tipo = tipo
+        _MANUAIS[tipo] = regra
+    return regra
+
+
+def compilar_regra(tipo, preco_m2, preco_m, preco_unit, preco_faixa=None):
+    """Regra de uma linha de `produtos`, ou None quando o cadastro não define preço (vale o manual).
+
+    `preco_faixa(qtd)` dá o preço da faixa de um produto unitário (ou None);
+    sem ele (produto sem faixas) vale o `preco_unit` fixo.
+    """
+    if tipo == TIPO_M2 and preco_m2 is not None:
+        return regra_fixa(TIPO_M2, preco_m2)
+    if tipo == TIPO_M and preco_m is not None:
+        return regra_fixa(TIPO_M, preco_m)
+    if tipo == TIPO_UNIT and preco_faixa is not None:
+        return regra_faixas(preco_faixa, preco_unit)
+    if tipo == TIPO_UNIT and preco_unit is not None:
+        return regra_fixa(TIPO_UNIT, preco_unit)
+    return None
+
+
+# ----------------------- cache -----------------------
+class RegrasPreco:
+    """Cache LRU nome do produto -> regra compilada (None = produto sem preço/inexistente)."""
+
+    def __init__(self, conn, tamanho=TAMANHO_CACHE, indice=None):
+        self.conn = conn
+        self.tamanho = tamanho
+        self.indice = indice
+        self._regras = OrderedDict()
+
+    def regra(self, nome):
+        try:
+            regra = self._regras[nome]
+        except KeyError:
+            pass
+        else:
+            self._regras.move_to_end(nome)
+            return regra
+        row = self.conn.execute(
+            "SELECT tipo, preco_m2, preco_m, preco_unit FROM produtos WHERE nome = ?", (nome,)
+        ).fetchone()
+        if row is None:
+            regra = None
+        else:
+            preco_faixa = None
+            if row[0] == TIPO_UNIT:
+                if self.indice is None:
+                    self.indice = get_indice(self.conn)
+                if self.indice.faixas(nome):
+                    preco_faixa = partial(self.indice.preco, nome)
+            regra = compilar_regra(*row, preco_faixa)
+        self._regras[nome] = regra
+        if len(self._regras) > self.tamanho:
+            self._regras.popitem(last=False)
+        return regra
+
+    def invalidar(self, nome=None):
+        """Descarta a regra de `nome` (ou todas), para ser recompilada no próximo uso."""
+        if nome is None:
+            self._regras.clear()
+        else:
+            self._regras.pop(nome, None)
+
+    def __len__(self):
+        return len(self._regras)
+
+
+# Um cache por conexão (mesmo esquema de features.faixas_index).
+_REGRAS = {}
+
+
+def get_regras(conn):
+    entry = _REGRAS.get(id(conn))
+    if entry is None or entry[0] is not conn:
+        entry = (conn, RegrasPreco(conn))
+        _REGRAS[id(conn)] = entry
+    return entry[1]
+
+
+def regras_carregadas(conn):
+    """O cache da conexão, se já existir (para invalidação)."""
+    entry = _REGRAS.get(id(conn))
+    if entry is None or entry[0] is not conn:
+        return None
+    return entry[1]
+
+
+def descartar_regras(conn):
+    _REGRAS.pop(id(conn), None)
@@ -0,0 +1,201 @@
+"""Repositório do catálogo com unidade de trabalho (transações aninhadas).
+
+Todas as mutações do catálogo passam por `RepositorioCatalogo`. Fora de uma
+transação cada operação é gravada sozinha (um commit, como antes); dentro de
+`with repo.transacao():` as operações se somam e só há um commit no final.
+Transações aninhadas viram SAVEPOINTs: um erro dentro delas desfaz apenas a
+parte interna. O índice de faixas em memória e outros efeitos registrados
+com `apos_commit` só são aplicados depois do commit externo; as regras de
+preço compiladas (`features.regras_preco`) dos produtos gravados são
+descartadas na hora e de novo após o commit.
+"""
+from contextlib import contextmanager
+
+from features.faixas_index import indice_carregado
+from features.regras_preco import regras_carregadas
+
+
+class RepositorioCatalogo:
+    def __init__(self, conn):
+        self.conn = conn
+        self._nivel = 0
+        self._apos_commit = []
+
+    # ---------------- unidade de trabalho ----------------
+    @contextmanager
+    def transacao(self):
+        """Agrupa as operações em uma transação; aninhada usa SAVEPOINT."""
+        cursor = self.conn.cursor()
+        if self._nivel == 0:
+            # escritas soltas já pendentes na conexão entram no mesmo commit
+            if not self.conn.in_transaction:
+                cursor.execute("BEGIN")
+            savepoint = None
+        else:
+            savepoint = f"sp_{self._nivel}"
+            cursor.execute(f"SAVEPOINT {savepoint}")
+        marca = len(self._apos_commit)
+        self._nivel += 1
+        try:
+            yield self
+        except BaseException:
+            self._nivel -= 1
+            del self._apos_commit[marca:]
+            if savepoint is None:
+                self.conn.rollback()
+            else:
+                cursor.execute(f"ROLLBACK TO {savepoint}")
+                cursor.execute(f"RELEASE {savepoint}")
+            raise
+        self._nivel -= 1
+        if savepoint is not None:
+            cursor.execute(f"RELEASE {savepoint}")
+            return
+        self.conn.commit()
+        pendentes, self._apos_commit = self._apos_commit, []
+        for fn in pendentes:
+            fn()
+
+    @property
+    def em_transacao(self):
+        return self._nivel > 0
+
+    def apos_commit(self, fn):
+        """Executa `fn` após o commit da transação atual (ou já, se não houver)."""
+        if self._nivel:
+            self._apos_commit.append(fn)
+        else:
+            fn()
+
+    def _indice(self, acao):
+        """Agenda uma atualização do índice de faixas (se carregado) para após o commit."""
+        def _aplicar():
+            indice = indice_carregado(self.conn)
+            if indice is not None:
+                acao(indice)
+        self.apos_commit(_aplicar)
+
+    def _regras(self, nome=None):
+        """Descarta a regra de preço compilada de `nome` (ou todas), agora e após o commit."""
+        def _invalidar():
+            regras = regras_carregadas(self.conn)
+            if regras is not None:
+                regras.invalidar(nome)
+        # agora: uma consulta dentro da transação não pode reaproveitar a regra antiga
+        _invalidar()
+        self.apos_commit(_invalidar)
+
+    def catalogo_alterado(self):
+        """Gravação em lote feita direto na conexão: recarrega o índice de faixas após o commit e descarta as regras."""
+        self._indice(lambda ix: ix.carregar(self.conn))
+        self._regras()
+
+    # ---------------- produtos ----------------
+    def salvar_produto(self, nome, tipo, largura=None, altura=None, preco_m2=None, preco_m=None, preco_unit=None):
+        # faixas ficam só em faixas_unitarias; a coluna legada `tiers` não é mais gravada
+        with self.transacao():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO produtos (nome, tipo, largura, altura, preco_m2, preco_m, preco_unit) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (nome, tipo, largura, altura, preco_m2, preco_m, preco_unit),
+            )
+            # se for unit, garantimos que produtos_unitarios esteja consistente
+            if tipo == 'unit':
+                self.ensure_produto_unitario(nome)
+            self._indice(lambda ix: ix.set_tipo(nome, tipo))
+            self._regras(nome)
+
+    def remover_produto(self, nome):
+        with self.transacao():
+            self.conn.execute("DELETE FROM produtos WHERE nome = ?", (nome,))
+            # removemos também das tabelas unitárias para manter consistente
+            self.delete_produto_unitario(nome)
+            self._indice(lambda ix: ix.remover_tipo(nome))
+            self._regras(nome)
+
+    def limpar_catalogo(self):
+        with self.transacao():
+            self.conn.execute("DELETE FROM produtos")
+            self.conn.execute("DELETE FROM produtos_unitarios")
+            self.conn.execute("DELETE FROM faixas_unitarias")
+            self._indice(lambda ix: ix.limpar())
+            self._regras()
+
+    # ---------------- produtos unitários e faixas ----------------
+    def ensure_produto_unitario(self, nome):
+        """Garante que exista um registro em produtos_unitarios com esse nome. Retorna id."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id FROM produtos_unitarios WHERE nome = ?", (nome,))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+        with self.transacao():
+            cursor.execute("INSERT INTO produtos_unitarios (nome) VALUES (?)", (nome,))
+            return cursor.lastrowid
+
+    def delete_produto_unitario(self, nome):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id FROM produtos_unitarios WHERE nome = ?", (nome,))
+        row = cursor.fetchone()
+        if not row:
+            return False
+        pid = row[0]
+        with self.transacao():
+            cursor.execute("DELETE FROM faixas_unitarias WHERE produto_id = ?", (pid,))
+            cursor.execute("DELETE FROM produtos_unitarios WHERE id = ?", (pid,))
+            self._indice(lambda ix: ix.delete_produto(nome))
+        return True
+
+    def add_faixa(self, produto_nome, qtd_min, qtd_max, preco):
+        with self.transacao():
+            pid = self.ensure_produto_unitario(produto_nome)
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "INSERT INTO faixas_unitarias (produto_id, qtd_min, qtd_max, preco) VALUES (?, ?, ?, ?)",
+                (pid, int(qtd_min), int(qtd_max), float(preco)),
+            )
+            fid = cursor.lastrowid
+            self._indice(lambda ix: ix.add_faixa(produto_nome, fid, qtd_min, qtd_max, preco))
+            # a regra de um produto que ainda não tinha faixas é a de preço fixo
+            self._regras(produto_nome)
+        return fid
+
+    def update_faixa(self, faixa_id, qtd_min, qtd_max, preco):
+        with self.transacao():
+            self.conn.execute(
+                "UPDATE faixas_unitarias SET qtd_min = ?, qtd_max = ?, preco = ? WHERE id = ?",
+                (int(qtd_min), int(qtd_max), float(preco), int(faixa_id)),
+            )
+            self._indice(lambda ix: ix.update_faixa(int(faixa_id), qtd_min, qtd_max, preco))
+
+    def delete_faixa(self, faixa_id):
+        with self.transacao():
+            self.conn.execute("DELETE FROM faixas_unitarias WHERE id = ?", (int(faixa_id),))
+            self._indice(lambda ix: ix.delete_faixa(int(faixa_id)))
+
+    def get_faixas_por_produto(self, produto_nome):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id FROM produtos_unitarios WHERE nome = ?", (produto_nome,))
+        row = cursor.fetchone()
+        if not row:
+            return []
+        cursor.execute(
+            "SELECT id, qtd_min, qtd_max, preco FROM faixas_unitarias WHERE produto_id = ? ORDER BY qtd_min",
+            (row[0],)
+        )
+        return [{'id': r[0], 'qtd_min': r[1], 'qtd_max': r[2], 'preco': r[3]} for r in cursor.fetchall()]
+
+
+# Um repositório por conexão (o estado da transação é da conexão).
+_REPOSITORIOS = {}
+
+
+def get_repositorio(conn):
+    entry = _REPOSITORIOS.get(id(conn))
+    if entry is None or entry[0] is not conn:
+        entry = (conn, RepositorioCatalogo(conn))
+        _REPOSITORIOS[id(conn)] = entry
+    return entry[1]
+
+
+def descartar_repositorio(conn):
+    _REPOSITORIOS.pop(id(conn), None)
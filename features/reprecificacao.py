@@ -0,0 +1,148 @@
+"""Reprecificação do orçamento inteiro pelo catálogo atual.
+
+Cada linha lembra de que produto veio o preço (`Orcamento.produtos`) e o
+adicional de instalação/estrutura. `reprecificar` busca o cadastro de todos
+esses produtos numa única consulta, resolve o preço de cada linha (m², m,
+faixa da quantidade ou preço unitário, na mesma ordem de
+`CarregarProduto`) e recalcula todos os totais numa única chamada a
+`precificacao.price_many` (vetorizada com NumPy), arredondados a centavos
+inteiros como os do orçamento (`features.dinheiro`). Nada é alterado: o
+resultado traz só as linhas que mudariam, para mostrar a diferença antes de
+aplicá-la com `itens_reprecificados`.
+"""
+import json
+from collections import namedtuple
+from features.dinheiro import centavos, formatar
+from features.faixas_index import get_indice
+from features.precificacao import TIPO_M, TIPO_M2, TIPO_UNIT, medidas_em_metros, price_many
+
+# preços e totais em centavos
+Alteracao = namedtuple('Alteracao', 'indice descricao produto preco_antigo preco_novo total_antigo total_novo')
+
+
+def buscar_cadastros(conn, nomes):
+    """{nome: (tipo, preco_m2, preco_m, preco_unit)} dos produtos `nomes`, numa única consulta."""
+    if not nomes:
+        return {}
+    cursor = conn.execute(
+        "SELECT nome, tipo, preco_m2, preco_m, preco_unit FROM produtos "
+        "WHERE nome IN (SELECT value FROM json_each(?))",
+        (json.dumps(sorted(nomes), ensure_ascii=False),),
+    )
+    return {nome: (tipo, preco_m2, preco_m, preco_unit) for nome, tipo, preco_m2, preco_m, preco_unit in cursor}
+
+
+def preco_do_cadastro(cadastro, nome, quantidade, indice):
+    """(tipo, preço) de uma linha pelo cadastro atual; preço None se o produto não tem preço."""
+    tipo, preco_m2, preco_m, preco_unit = cadastro
+    if tipo == TIPO_M2:
+        return tipo, preco_m2
+    if tipo == TIPO_M:
+        return tipo, preco_m
+    if tipo == TIPO_UNIT:
+        preco = indice.preco(nome, quantidade) if quantidade else None
+        if preco is None:
+            preco = preco_unit
+        if preco is None:
+            faixas = indice.faixas(nome)
+            preco = faixas[0]['preco'] if faixas else None
+        return tipo, preco
+    return tipo, None
+
+
+class Reprecificacao:
+    """Resultado de `reprecificar`: as linhas que mudam e o que ficou de fora."""
+
+    def __init__(self, linhas, total_antigo):
+        self.linhas = linhas
+        self.total_antigo = total_antigo
+        self.alteracoes = []
+        self.sem_origem = 0       # linhas de preço manual
+        self.ausentes = set()     # produtos que saíram do catálogo
+        self.sem_preco = set()    # produtos sem preço para o tipo cadastrado
+
+    @property
+    def total_novo(self):
+        return self.total_antigo + sum(a.total_novo - a.total_antigo for a in self.alteracoes)
+
+    def resumo(self):
+        diferenca = self.total_novo - self.total_antigo
+        linhas = [
+            f"{len(self.alteracoes)} de {self.linhas} linha(s) mudam de preço.",
+            f"Total: R$ {formatar(self.total_antigo, milhar=True)} -> R$ {formatar(self.total_novo, milhar=True)} "
+            f"({'+' if diferenca >= 0 else ''}{formatar(diferenca, milhar=True)})",
+        ]
+        if self.sem_origem:
+            linhas.append(f"{self.sem_origem} linha(s) com preço manual ficam como estão.")
+        if self.ausentes:
+            linhas.append(f"Fora do catálogo: {', '.join(sorted(self.ausentes))}")
+        if self.sem_preco:
+            linhas.append(f"Sem preço cadastrado: {', '.join(sorted(self.sem_preco))}")
+        return '\n'.join(linhas)
+
+
+def reprecificar(conn, orc, indice=None):
+    """Recalcula preço e total de todas as linhas de `orc` com origem no catálogo.
+
+    Preços e totais em centavos, arredondados como o campo Total da tela.
+    Retorna uma `Reprecificacao`; `orc` não é alterado.
+    """
+    if indice is None:
+        indice = get_indice(conn)
+    cadastros = buscar_cadastros(conn, {p for p in orc.produtos if p})
+    resultado = Reprecificacao(len(orc), orc.total)
+
+    indices = []
+    cols = {'tipo': [], 'largura': [], 'altura': [], 'qtd': [], 'preco': [], 'instalacao': []}
+    for i, (produto, larg, alt, qtd, adicional) in enumerate(
+        zip(orc.produtos, orc.larguras, orc.alturas, orc.quantidades, orc.adicionais)
+    ):
+        if not produto:
+            resultado.sem_origem += 1
+            continue
+        cadastro = cadastros.get(produto)
+        if cadastro is None:
+            resultado.ausentes.add(produto)
+            continue
+        tipo, preco = preco_do_cadastro(cadastro, produto, qtd, indice)
+        if preco is None:
+            resultado.sem_preco.add(produto)
+            continue
+        largura, altura = medidas_em_metros(larg, alt)
+        indices.append(i)
+        cols['tipo'].append(tipo)
+        cols['largura'].append(largura)
+        cols['altura'].append(altura)
+        cols['qtd'].append(qtd)
+        cols['preco'].append(float(preco))
+        cols['instalacao'].append(adicional)
+    if not indices:
+        return resultado
+
+    totais = price_many(cols)
+    for i, preco, total in zip(indices, cols['preco'], totais):
+        preco, total = centavos(preco), centavos(float(total))
+        preco_antigo, total_antigo = orc.precos[i], orc.totais[i]
+        if preco != preco_antigo or total != total_antigo:
+            resultado.alteracoes.append(Alteracao(
+                i, orc.descricoes[i], orc.produtos[i], preco_antigo, preco, total_antigo, total))
+    return resultado
+
+
+def itens_reprecificados(orc, resultado):
+    """[(índice, item com preço/total novos)] das alterações que ainda valem para `orc`.
+
+    Linhas editadas depois da reprecificação (outro produto ou outro total)
+    ficam de fora.
+    """
+    itens = []
+    for a in resultado.alteracoes:
+        if a.indice >= len(orc):
+            continue
+        item = orc[a.indice]
+        if item.produto != a.produto or item.total != a.total_antigo:
+            continue
+        item.preco = a.preco_novo
+        item.total = a.total_novo
+        itens.append((a.indice, item))
+    return itens
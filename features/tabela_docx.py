@@ -0,0 +1,121 @@
+"""Preenchimento em lote da tabela de serviços do .docx.
+
+Em vez de `tabela.add_row()` + reinserção + `tabela.rows[-2]` a cada linha
+(quadrático: `tabela.rows` reconstrói a lista a cada acesso), monta uma
+linha-protótipo uma única vez, clona o XML dela para cada serviço e insere
+todas as linhas de uma vez antes da linha de TOTAL.
+"""
+from copy import deepcopy
+
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from features.dinheiro import centavos, formatar
+from features.orcamento import linhas_servicos
+
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+COLUNAS = 7  # textos gerados por `textos_linha`
+
+
+def textos_linha(i, descricao, largura, altura, quantidade, preco, total):
+    """Textos das colunas de uma linha de serviço (mesmo formato da tabela original); preço e total em centavos."""
+    larg = largura if largura not in [None, '', '0', 0] else 'X'
+    alt = altura if altura not in [None, '', '0', 0] else 'X'
+    return [str(i), descricao, str(larg), str(alt), str(quantidade), f'R$ {formatar(preco)}', f'R$ {formatar(total)}']
+
+
+def dados_linha(i, row_data):
+    """`textos_linha` a partir de um serviço (dict ou `ItemOrcamento`, no formato antigo em reais)."""
+    return textos_linha(i, row_data['Descrição'], row_data['Largura'], row_data['Altura'],
+                        row_data['Quantidade'], centavos(row_data['Preço']), centavos(row_data['Total (R$)']))
+
+
+def _normalizar_celula(tc):
+    """Deixa a célula com um único parágrafo centralizado contendo um run/`w:t` vazio.
+
+    Mantém `w:tcPr`, o `w:pPr` do primeiro parágrafo e o `w:rPr` do primeiro run.
+    """
+    paragrafos = tc.findall(qn('w:p'))
+    for filho in list(tc):
+        if filho.tag != qn('w:tcPr') and (not paragrafos or filho is not paragrafos[0]):
+            tc.remove(filho)
+    if paragrafos:
+        p = paragrafos[0]
+    else:
+        p = OxmlElement('w:p')
+        tc.append(p)
+
+    ppr = p.find(qn('w:pPr'))
+    primeiro_run = p.find(qn('w:r'))
+    rpr = primeiro_run.find(qn('w:rPr')) if primeiro_run is not None else None
+    for filho in list(p):
+        if filho is not ppr:
+            p.remove(filho)
+    if ppr is None:
+        ppr = OxmlElement('w:pPr')
+        p.insert(0, ppr)
+    # alinhamento centralizado (equivalente a p.alignment = CENTER)
+    jc = ppr.find(qn('w:jc'))
+    if jc is None:
+        jc = OxmlElement('w:jc')
+        ppr.append(jc)
+    jc.set(qn('w:val'), 'center')
+
+    r = OxmlElement('w:r')
+    if rpr is not None:
+        r.append(rpr)
+    t = OxmlElement('w:t')
+    t.set(XML_SPACE, 'preserve')
+    r.append(t)
+    p.append(r)
+
+
+def prototipo_linha(tabela, linhas_modelo):
+    """Linha-protótipo: a primeira linha de exemplo do modelo ou uma linha nova do python-docx."""
+    if linhas_modelo:
+        tr = deepcopy(linhas_modelo[0])
+    else:
+        tr = tabela.add_row()._tr
+        tabela._tbl.remove(tr)
+    for tc in tr.findall(qn('w:tc')):
+        _normalizar_celula(tc)
+    return tr
+
+
+def preencher_tabela(tabela, servicos, progresso=None, passo=200):
+    """Substitui as linhas entre o cabeçalho e o TOTAL pelas linhas de `servicos`.
+
+    `progresso(feitas, total)`, se informado, é chamado a cada `passo` linhas
+    (e no fim); pode levantar exceção para interromper o preenchimento antes
+    de a tabela ser alterada.
+    Retorna a linha de TOTAL (`w:tr`), para que o chamador a preencha.
+    Levanta ValueError se o modelo tiver mais colunas do que `COLUNAS`.
+    """
+    tbl = tabela._tbl
+    trs = tbl.tr_lst
+    total_tr = trs[-1]
+    linhas_modelo = trs[1:-1]
+    prototipo = prototipo_linha(tabela, linhas_modelo)
+
+    n_cols = len(prototipo.findall(qn('w:tc')))
+    if n_cols > COLUNAS:
+        raise ValueError(f'tabela do modelo tem {n_cols} colunas; esperado no máximo {COLUNAS}')
+    total = len(servicos)
+    novas = []
+    for i, linha in enumerate(linhas_servicos(servicos), start=1):
+        if progresso is not None and i % passo == 0:
+            progresso(i, total)
+        dados = textos_linha(i, *linha)
+        tr = deepcopy(prototipo)
+        for t, texto in zip(tr.iter(qn('w:t')), dados):
+            t.text = texto
+        novas.append(tr)
+    if progresso is not None:
+        progresso(total, total)
+
+    for tr in linhas_modelo:
+        tbl.remove(tr)
+    # uma única inserção antes da linha de TOTAL
+    pos = tbl.index(total_tr)
+    tbl[pos:pos] = novas
+    return total_tr
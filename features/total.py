@@ -1,6 +1,9 @@
-import json
 import tkinter as tk
 
+from features.dinheiro import centavos, formatar
+from features.precificacao import TIPO_POR_ROTULO, TIPO_UNIT
+from features.regras_preco import get_regras, regra_manual
+
 class TotalCalculator:
     def __init__(
         self,
@@ -29,6 +32,7 @@ class TotalCalculator:
         self.ent_install = ent_install
         self.struct_var = struct_var
         self.ent_struct = ent_struct
+        self.regras = get_regras(conn)
 
     def calcular_total(self):
         try:
@@ -65,80 +69,31 @@ class TotalCalculator:
             larg_m = larg / 100.0
             alt_m = alt / 100.0
 
-        area = larg_m * alt_m * qtd
-
-        total = 0.0
-
-        produto_nome = self.produto_selecionado.get().strip()
-        if produto_nome:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT tipo, preco_m2, preco_m, preco_unit, tiers FROM produtos WHERE nome = ?", (produto_nome,))
-            r = cursor.fetchone()
-            if r:
-                tipo_db, preco_m2, preco_unit, tiers_json = r
-                if tipo_db == 'm2' and preco_m2 is not None:
-                    total = area * float(preco_m2)
-                elif tipo_db == 'unit' and tiers_json:
-                    try:
-                        tiers = json.loads(tiers_json)
-                        unit_price = None
-                        for t in tiers:
-                            mn = int(t.get('min', 0))
-                            mx = int(t.get('max', 10**9))
-                            price = float(t.get('price', 0))
-                            if mn <= qtd <= mx:
-                                unit_price = price
-                                break
-                        if unit_price is None:
-                            unit_price = preco_unit if preco_unit is not None else preco_input
-                        total = qtd * unit_price
-                    except Exception:
-                        total = qtd * (preco_unit if preco_unit is not None else preco_input)
-                elif tipo_db == 'unit' and preco_unit is not None:
-                    total = qtd * float(preco_unit)
-                else:
-                    # fallback manual
-                    if self.tipo_calculo.get() == 'Por m²':
-                        total = area * preco_input
-                    elif self.tipo_calculo.get() == 'Por m':
-                        total = (larg_m * qtd) * preco_input
-                    else:
-                        total = qtd * preco_input
-            else:
-                # produto não encontrado
-                if self.tipo_calculo.get() == 'Por m²':
-                    total = area * preco_input
-                elif self.tipo_calculo.get() == 'Por m':
-                    total = (larg_m * qtd) * preco_input
-                else:
-                    total = qtd * preco_input
-        else:
-            # sem produto selecionado
-            if self.tipo_calculo.get() == 'Por m²':
-                total = area * preco_input
-            elif self.tipo_calculo.get() == 'Por m':
-                total = (larg_m * qtd) * preco_input
-            else:
-                total = qtd * preco_input
-
         # instalação/estrutura adicionam valor por área (somando ao total)
+        inst = struct = 0.0
         if self.install_var.get():
             try:
-                # Atenção: usa a área calculada acima (já em m²)
                 inst = float(self.ent_install.get().replace(',', '.') or 0)
-                total += area * inst
             except Exception:
                 pass
 
         if self.struct_var.get():
             try:
-                # Atenção: usa a área calculada acima (já em m²)
                 struct = float(self.ent_struct.get().replace(',', '.') or 0)
-                total += area * struct
             except Exception:
                 pass
 
+        total = self._regra()(qtd, larg_m, alt_m, preco_input, inst + struct)
+
         self.ent_total.config(state='normal')
         self.ent_total.delete(0, tk.END)
-        self.ent_total.insert(0, f"{total:.2f}")
-        self.ent_total.config(state='readonly')
\ No newline at end of file
+        self.ent_total.insert(0, formatar(centavos(total)))
+        self.ent_total.config(state='readonly')
+
+    def _regra(self):
+        """Regra compilada do produto (cache por conexão); sem cadastro usa o combobox e o preço digitado."""
+        produto_nome = self.produto_selecionado.get().strip()
+        regra = self.regras.regra(produto_nome) if produto_nome else None
+        if regra is None:
+            regra = regra_manual(TIPO_POR_ROTULO.get(self.tipo_calculo.get(), TIPO_UNIT))
+        return regra
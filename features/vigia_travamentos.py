@@ -0,0 +1,124 @@
+"""Detector de travamentos do laço de eventos do Tk.
+
+Uma batida (`after`) a cada `intervalo_ms` marca que o laço do Tk está
+respondendo. Uma thread vigia confere o atraso da batida; passando de
+`limite_ms`, amostra a pilha da thread principal (`sys._current_frames`) a
+cada `amostragem_ms` até o laço voltar. O relatório (duração e pilhas
+agrupadas, da mais frequente à menos) é gravado em `caminho` pela própria
+thread vigia, sem tocar no Tk. Travamentos que não terminam geram um
+relatório parcial depois de `relatorio_parcial_s`.
+"""
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+
+from features.rastreamento import rastreador
+
+ARQUIVO_PADRAO = 'travamentos.log'
+TAMANHO_MAXIMO = 1024 * 1024
+# pilhas guardadas por travamento (as mais antigas bastam para achar a causa)
+MAX_AMOSTRAS = 500
+
+
+class VigiaTravamentos:
+    """Batida no laço do Tk + thread que amostra a pilha principal durante os travamentos."""
+
+    def __init__(self, widget, limite_ms=300, intervalo_ms=100, amostragem_ms=20,
+                 caminho=ARQUIVO_PADRAO, relatorio_parcial_s=10.0):
+        self.widget = widget
+        self.limite = limite_ms / 1000
+        self.intervalo_ms = intervalo_ms
+        self.amostragem = amostragem_ms / 1000
+        self.caminho = caminho
+        self.relatorio_parcial = relatorio_parcial_s
+        self.travamentos = 0  # relatórios gravados nesta sessão
+        self._ultima_batida = time.monotonic()
+        self._after_id = None
+        self._parar = threading.Event()
+        self._thread = None
+        self._id_principal = threading.main_thread().ident
+
+    # ---------------- thread do Tk ----------------
+    def iniciar(self):
+        self._ultima_batida = time.monotonic()
+        self._after_id = self.widget.after(self.intervalo_ms, self._batida)
+        self._thread = threading.Thread(target=self._vigiar, name='vigia-travamentos', daemon=True)
+        self._thread.start()
+
+    def _batida(self):
+        self._ultima_batida = time.monotonic()
+        self._after_id = self.widget.after(self.intervalo_ms, self._batida)
+
+    def parar(self):
+        self._parar.set()
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    # ---------------- thread vigia ----------------
+    def _atraso(self):
+        """Quanto a batida está atrasada além do intervalo (s)."""
+        return time.monotonic() - self._ultima_batida - self.intervalo_ms / 1000
+
+    def _vigiar(self):
+        while not self._parar.wait(self.amostragem):
+            if self._atraso() > self.limite:
+                self._amostrar()
+
+    def _pilha(self):
+        frame = sys._current_frames().get(self._id_principal)
+        if frame is None:
+            return None
+        return tuple(traceback.format_list(traceback.extract_stack(frame)))
+
+    def _amostrar(self):
+        """Amostra a pilha principal até a batida voltar; grava o relatório."""
+        batida = self._ultima_batida
+        inicio = batida + self.intervalo_ms / 1000
+        inicio_ns = time.perf_counter_ns() - int((time.monotonic() - inicio) * 1e9)
+        amostras = Counter()
+        n = 0
+        parcial = False
+        while self._ultima_batida == batida and not self._parar.is_set():
+            pilha = self._pilha()
+            if pilha is not None and n < MAX_AMOSTRAS:
+                amostras[pilha] += 1
+                n += 1
+            if not parcial and time.monotonic() - inicio > self.relatorio_parcial:
+                parcial = True
+                self._gravar(time.monotonic() - inicio, amostras, n, em_andamento=True)
+            self._parar.wait(self.amostragem)
+        fim = self._ultima_batida if self._ultima_batida != batida else time.monotonic()
+        duracao = fim - inicio
+        self._gravar(duracao, amostras, n)
+        if rastreador.ativo:
+            rastreador.registrar('travamento do laço Tk', 'vigia', inicio_ns,
+                                 inicio_ns + int(duracao * 1e9), {'amostras': n})
+
+    def _gravar(self, duracao, amostras, n, em_andamento=False):
+        quando = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        estado = ' (ainda travado)' if em_andamento else ''
+        partes = [f'=== {quando}: laço do Tk parado por {duracao * 1000:.0f} ms{estado}; '
+                  f'{n} amostra(s) a cada {self.amostragem * 1000:.0f} ms ===\n']
+        for pilha, vezes in amostras.most_common():
+            partes.append(f'--- {vezes}/{n} amostra(s):\n')
+            partes.extend(pilha)
+        partes.append('\n')
+        try:
+            if os.path.exists(self.caminho) and os.path.getsize(self.caminho) >= TAMANHO_MAXIMO:
+                os.replace(self.caminho, self.caminho + '.1')
+            with open(self.caminho, 'a', encoding='utf-8') as f:
+                f.write(''.join(partes))
+        except OSError:
+            return  # diagnóstico não pode derrubar o app
+        if not em_andamento:
+            self.travamentos += 1
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Geração de propostas em lote (linha de comando, sem diálogos).
+
+Lê um manifesto JSON ou CSV de orçamentos e gera um `.docx` por orçamento
+num diretório de saída, distribuindo o trabalho num pool de processos.
+
+Manifesto JSON: lista de objetos
+    {"cliente": "...", "numero_proposta": "7", "data": "31/01/2025",
+     "modelo": "opcional.docx", "proposta_completa": "opcional",
+     "servicos": [{"Descrição": "...", "Largura": 80, "Altura": 120,
+                   "Quantidade": 2, "Preço": 10.0, "Total (R$)": 20.0}, ...]}
+
+Manifesto CSV: uma linha por serviço, agrupada por (cliente, numero_proposta),
+com as colunas cliente, numero_proposta, data e as chaves dos serviços
+(Descrição, Largura, Altura, Quantidade, Preço, Total (R$)).
+
+Preço e total aceitam número ou texto ('1234.5', '1.234,50', 'R$ 1.234,56').
+Um valor ilegível faz só aquele orçamento falhar, com o serviço na mensagem.
+
+Com `--indexar produtos.db` as propostas geradas também entram no histórico
+pesquisável do app (features.historico_propostas).
+
+Uso:
+    python gerar_propostas.py manifesto.json --modelo modelo.docx --saida propostas -j 4
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+
+def _quantidade(v):
+    if v is None or v == '':
+        return 1
+    try:
+        return int(float(str(v).replace(',', '.')))
+    except ValueError:
+        raise ValueError(f"quantidade inválida: {v!r}") from None
+
+
+def _normalizar_servico(s, n):
+    """`ItemOrcamento` (centavos) do serviço `n` (contado a partir de 1) do manifesto.
+
+    Valores aceitam o formato de `features.dinheiro.centavos` ('1234.5',
+    '1.234,50', 'R$ 1.234,56'). Levanta ValueError nomeando a linha se um
+    valor não puder ser lido.
+    """
+    from features.dinheiro import centavos
+    from features.orcamento import ItemOrcamento
+
+    descricao = str(s.get('Descrição', '')).upper()
+    try:
+        qtd = _quantidade(s.get('Quantidade'))
+        preco = centavos(s.get('Preço'))
+        total = s.get('Total (R$)')
+        total = centavos(total) if total not in (None, '') else preco * qtd
+    except ValueError as e:
+        raise ValueError(f"serviço {n} ({descricao or 'sem descrição'}): {e}") from None
+    return ItemOrcamento(descricao, s.get('Largura') or 'X', s.get('Altura') or 'X', qtd, preco, total)
+
+
+def proposta_completa(numero, data):
+    """Mesmo formato de `OrcamentoApp._refresh_proposta`: NN-AAAA."""
+    try:
+        ano = datetime.strptime(data, '%d/%m/%Y').year
+    except Exception:
+        ano = datetime.today().year
+    num = str(numero).strip()
+    try:
+        nro = str(int(num)).zfill(2)
+    except Exception:
+        nro = num.zfill(2)
+    return f"{nro}-{ano}"
+
+
+def ler_manifesto(path):
+    """Lê o manifesto (JSON ou CSV) e retorna a lista de orçamentos.
+
+    Os serviços de cada orçamento viram um `Orcamento` (valores em centavos).
+    Um orçamento com valor ilegível recebe 'erro' com a mensagem e não é gerado.
+    """
+    if path.lower().endswith('.csv'):
+        orcamentos = {}
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                chave = (row.get('cliente', ''), row.get('numero_proposta', ''))
+                orc = orcamentos.get(chave)
+                if orc is None:
+                    orc = orcamentos[chave] = {
+                        'cliente': chave[0],
+                        'numero_proposta': chave[1],
+                        'data': row.get('data', ''),
+                        'servicos': [],
+                    }
+                orc['servicos'].append(row)
+        orcamentos = list(orcamentos.values())
+    else:
+        with open(path, encoding='utf-8') as f:
+            orcamentos = json.load(f)
+
+    from features.orcamento import Orcamento
+
+    for orc in orcamentos:
+        orc['data'] = orc.get('data') or datetime.today().strftime('%d/%m/%Y')
+        try:
+            orc['servicos'] = Orcamento(_normalizar_servico(s, n)
+                                        for n, s in enumerate(orc.get('servicos', []), start=1))
+        except ValueError as e:
+            # só este orçamento falha (em `gerar_lote`); os demais seguem
+            orc['servicos'] = Orcamento()
+            orc['erro'] = str(e)
+        if not orc.get('proposta_completa'):
+            orc['proposta_completa'] = proposta_completa(orc.get('numero_proposta', ''), orc['data'])
+    return orcamentos
+
+
+def _renderizar(orc, modelo, saida):
+    """Executado no processo filho: gera um .docx e retorna (arquivo, segundos, erro)."""
+    from features.gerar_docx import docxGenerator
+
+    inicio = time.perf_counter()
+    generator = docxGenerator(
+        template_path=orc.get('modelo') or modelo,
+        cliente=orc.get('cliente', ''),
+        numero_proposta=orc.get('numero_proposta', ''),
+        proposta_completa=orc['proposta_completa'],
+        data_label=orc['data'],
+        servicos=orc['servicos'],
+    )
+    arquivo = os.path.join(saida, generator.nome_padrao())
+    try:
+        generator.renderizar(arquivo)
+    except Exception as e:
+        return arquivo, time.perf_counter() - inicio, str(e)
+    return arquivo, time.perf_counter() - inicio, None
+
+
+def _indexar(banco, gerados):
+    """Registra as propostas geradas ([(orc, arquivo)]) no histórico do banco, numa transação."""
+    import sqlite3
+    from features.historico_propostas import indexar_propostas, registro_proposta
+    from features.migracoes import configurar_conexao, migrar
+
+    conn = sqlite3.connect(banco)
+    try:
+        configurar_conexao(conn)
+        migrar(conn)
+        indexar_propostas(conn, [
+            registro_proposta(orc.get('cliente', ''), orc['proposta_completa'], orc['data'],
+                              orc['servicos'], arquivo=os.path.abspath(arquivo))
+            for orc, arquivo in gerados
+        ])
+    finally:
+        conn.close()
+
+
+def gerar_lote(orcamentos, modelo, saida, processos=None, out=sys.stdout, indexar=None):
+    """Gera todos os orçamentos no pool e imprime o tempo por arquivo e a vazão.
+
+    Com `indexar` (caminho do banco) as propostas geradas entram no histórico.
+    """
+    os.makedirs(saida, exist_ok=True)
+    inicio = time.perf_counter()
+    ok = falhas = 0
+    gerados = []
+    for orc in orcamentos:
+        if orc.get('erro'):
+            falhas += 1
+            print(f"ERRO  {'':>8}     proposta {orc['proposta_completa']} ({orc.get('cliente', '')}): "
+                  f"{orc['erro']}", file=out)
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        futuros = {pool.submit(_renderizar, orc, modelo, saida): orc
+                   for orc in orcamentos if not orc.get('erro')}
+        for fut in as_completed(futuros):
+            arquivo, segundos, erro = fut.result()
+            if erro:
+                falhas += 1
+                print(f"ERRO  {segundos * 1000:8.1f} ms  {arquivo}: {erro}", file=out)
+            else:
+                ok += 1
+                gerados.append((futuros[fut], arquivo))
+                print(f"OK    {segundos * 1000:8.1f} ms  {arquivo}", file=out)
+    if indexar and gerados:
+        _indexar(indexar, gerados)
+        print(f"{len(gerados)} proposta(s) registrada(s) no histórico de {indexar}", file=out)
+    decorrido = time.perf_counter() - inicio
+    vazao = ok / decorrido if decorrido > 0 else 0.0
+    print(f"\n{ok} gerado(s), {falhas} falha(s) em {decorrido:.2f} s ({vazao:.1f} docs/s)", file=out)
+    return ok, falhas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera propostas .docx em lote a partir de um manifesto JSON/CSV.')
+    parser.add_argument('manifesto', help='arquivo .json ou .csv com os orçamentos')
+    parser.add_argument('-m', '--modelo', help='modelo .docx padrão (pode ser sobrescrito por orçamento)')
+    parser.add_argument('-o', '--saida', default='propostas', help='diretório de saída (padrão: propostas)')
+    parser.add_argument('-j', '--processos', type=int, default=None,
+                        help='número de processos (padrão: número de CPUs)')
+    parser.add_argument('--indexar', metavar='BANCO',
+                        help='registra as propostas geradas no histórico deste banco (ex.: produtos.db)')
+    args = parser.parse_args(argv)
+
+    orcamentos = ler_manifesto(args.manifesto)
+    if not orcamentos:
+        print('Manifesto vazio.', file=sys.stderr)
+        return 1
+    _, falhas = gerar_lote(orcamentos, args.modelo, args.saida, args.processos, indexar=args.indexar)
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,70 +7,70 @@ import tkinter as tk
 from tkinter import messagebox
 from ttkbootstrap import ttk
 
+from features.faixas_validacao import descrever, normalizar_faixas, validar_faixas
+from features.repositorio import get_repositorio
+
 
 def get_faixas_por_produto(conn, nome_produto):
     """Retorna todas as faixas de um produto unitário."""
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id FROM produtos_unitarios WHERE nome = ?",
-        (nome_produto,)
-    )
-    row = cursor.fetchone()
-    if not row:
-        return []
-    
-    produto_id = row[0]
-    cursor.execute(
-        "SELECT id, qtd_min, qtd_max, preco FROM faixas_unitarias WHERE produto_id = ? ORDER BY qtd_min",
-        (produto_id,)
-    )
-    return [dict(r) for r in cursor.fetchall()]
+    return get_repositorio(conn).get_faixas_por_produto(nome_produto)
 
 
 def add_faixa(conn, nome_produto, qtd_min, qtd_max, preco):
     """Adiciona uma nova faixa de preço para um produto unitário."""
-    cursor = conn.cursor()
-    produto_id = ensure_produto_unitario(conn, nome_produto)
-    cursor.execute(
-        "INSERT INTO faixas_unitarias (produto_id, qtd_min, qtd_max, preco) VALUES (?, ?, ?, ?)",
-        (produto_id, qtd_min, qtd_max, preco)
-    )
-    conn.commit()
+    return get_repositorio(conn).add_faixa(nome_produto, qtd_min, qtd_max, preco)
 
 
 def update_faixa(conn, faixa_id, qtd_min, qtd_max, preco):
     """Atualiza uma faixa de preço existente."""
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE faixas_unitarias SET qtd_min = ?, qtd_max = ?, preco = ? WHERE id = ?",
-        (qtd_min, qtd_max, preco, faixa_id)
-    )
-    conn.commit()
+    get_repositorio(conn).update_faixa(faixa_id, qtd_min, qtd_max, preco)
 
 
 def delete_faixa(conn, faixa_id):
     """Deleta uma faixa de preço."""
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM faixas_unitarias WHERE id = ?", (faixa_id,))
-    conn.commit()
+    get_repositorio(conn).delete_faixa(faixa_id)
 
 
 def ensure_produto_unitario(conn, nome):
     """Garante que exista um registro em produtos_unitarios com esse nome. Retorna id."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM produtos_unitarios WHERE nome = ?", (nome,))
-    result = cursor.fetchone()
-    if result:
-        return result[0]
-    cursor.execute("INSERT INTO produtos_unitarios (nome) VALUES (?)", (nome,))
-    conn.commit()
-    return cursor.lastrowid
+    return get_repositorio(conn).ensure_produto_unitario(nome)
+
+
+def _sobrepoe(faixas, qmin, qmax, ignorar=None):
+    """True se [qmin, qmax] cruza alguma faixa de `faixas` ({iid: faixa}), exceto `ignorar`."""
+    for iid, faixa in faixas.items():
+        if iid == ignorar:
+            continue
+        if not (qmax < faixa['qtd_min'] or qmin > faixa['qtd_max']):
+            return True
+    return False
+
+
+def _confirmar_faixas(faixas, parent):
+    """Valida o conjunto inteiro ({iid: faixa}) antes de gravar.
+
+    Faixas sobrepostas/inválidas que já estavam no banco só passam se o
+    usuário confirmar. Retorna True para seguir com a gravação.
+    """
+    problemas = validar_faixas([(f['qtd_min'], f['qtd_max'], f['preco']) for f in faixas.values()])
+    if not problemas:
+        return True
+    texto = '\n'.join(descrever(p) for p in problemas[:10])
+    if len(problemas) > 10:
+        texto += f'\n... e mais {len(problemas) - 10}'
+    return messagebox.askyesno(
+        'Faixas inconsistentes',
+        f'{texto}\n\nUse "Normalizar" no gerenciador de faixas para corrigir. Salvar mesmo assim?',
+        parent=parent,
+    )
 
 
 class NovoProdutoPopup:
     """
     Popup para criar e editar produtos com suporte a faixas unitárias.
     Gerencia campos de nome, tipo, preço e tabela de faixas de preço.
+    As faixas são editadas só na tela e gravadas junto com o produto,
+    numa única transação, ao clicar em "Salvar Produto".
     """
     
     def __init__(self, parent, conn, callback_salvar):
@@ -104,6 +104,12 @@ class NovoProdutoPopup:
         self.ent_qmax = None
         self.ent_qpreco = None
         
+        # Faixas em edição: iid da tree -> {'id', 'qtd_min', 'qtd_max', 'preco'}
+        # (id None = faixa nova); ids removidos ficam em _removidas até salvar
+        self._faixas = {}
+        self._removidas = []
+        self._nome_carregado = None
+        
         self._criar_interface()
     
     def _criar_interface(self):
@@ -176,21 +182,29 @@ class NovoProdutoPopup:
     def _on_nome_change(self, event=None):
         """Carrega faixas existentes quando o nome mudar."""
         nome = self.ent_nome.get().strip()
-        if nome:
+        # só recarrega se o nome mudou, para não descartar faixas em edição
+        if nome and nome != self._nome_carregado:
             self._carregar_faixas_para_tree(nome)
     
     def _carregar_faixas_para_tree(self, nome_produto):
         """Carrega as faixas de um produto na treeview."""
         self.tree_faixas.delete(*self.tree_faixas.get_children())
+        self._faixas = {}
+        self._removidas = []
+        self._nome_carregado = nome_produto
         
         faixas = get_faixas_por_produto(self.conn, nome_produto)
         for faixa in faixas:
-            self.tree_faixas.insert('', 'end', values=(
-                faixa['id'], 
-                faixa['qtd_min'], 
-                faixa['qtd_max'], 
-                faixa['preco']
-            ))
+            self._inserir_na_tree(faixa)
+    
+    def _inserir_na_tree(self, faixa):
+        iid = self.tree_faixas.insert('', 'end', values=(
+            faixa['id'] if faixa['id'] is not None else 'novo',
+            faixa['qtd_min'], 
+            faixa['qtd_max'], 
+            faixa['preco']
+        ))
+        self._faixas[iid] = faixa
     
     def _adicionar_faixa(self):
         """Adiciona uma nova faixa à tabela."""
@@ -207,8 +221,17 @@ class NovoProdutoPopup:
             messagebox.showwarning("Erro", "Valores inválidos")
             return
         
-        add_faixa(self.conn, nome, qmin, qmax, preco)
-        self._carregar_faixas_para_tree(nome)
+        if qmin <= 0 or qmin > qmax:
+            messagebox.showwarning('Erro', 'Qtd Min deve ser ≤ Qtd Max e ambos positivos')
+            return
+        
+        if nome != self._nome_carregado:
+            self._carregar_faixas_para_tree(nome)
+        if _sobrepoe(self._faixas, qmin, qmax):
+            messagebox.showwarning('Erro', 'Faixa sobrepõe outra já existente')
+            return
+        
+        self._inserir_na_tree({'id': None, 'qtd_min': qmin, 'qtd_max': qmax, 'preco': preco})
         
         self.ent_qmin.delete(0, tk.END)
         self.ent_qmax.delete(0, tk.END)
@@ -221,9 +244,11 @@ class NovoProdutoPopup:
             messagebox.showinfo('Info', 'Selecione uma faixa para remover')
             return
         
-        faixa_id = self.tree_faixas.item(sel)['values'][0]
-        delete_faixa(self.conn, faixa_id)
-        self._carregar_faixas_para_tree(self.ent_nome.get().strip())
+        for iid in sel:
+            faixa = self._faixas.pop(iid, None)
+            if faixa is not None and faixa['id'] is not None:
+                self._removidas.append(faixa['id'])
+            self.tree_faixas.delete(iid)
     
     def _salvar_produto(self):
         """Salva o produto no banco de dados."""
@@ -247,8 +272,27 @@ class NovoProdutoPopup:
             messagebox.showwarning("Erro", "Preço inválido")
             return
         
-        # Chama callback para salvar no banco
-        self.callback_salvar(nome, tipo, preco_m2, preco_m, preco_unit)
+        if nome != self._nome_carregado:
+            # faixas digitadas com outro nome não se aplicam a este produto
+            self._carregar_faixas_para_tree(nome)
+        
+        if tipo == 'unit' and not _confirmar_faixas(self._faixas, self.popup):
+            return
+        
+        # Produto e faixas numa única transação (um commit só)
+        repo = get_repositorio(self.conn)
+        try:
+            with repo.transacao():
+                self.callback_salvar(nome, tipo, preco_m2, preco_m, preco_unit)
+                if tipo == 'unit':
+                    for faixa_id in self._removidas:
+                        repo.delete_faixa(faixa_id)
+                    for faixa in self._faixas.values():
+                        if faixa['id'] is None:
+                            repo.add_faixa(nome, faixa['qtd_min'], faixa['qtd_max'], faixa['preco'])
+        except Exception as e:
+            messagebox.showerror("Erro", f"Não foi possível salvar o produto:\n{e}")
+            return
         
         messagebox.showinfo("OK", f"Produto '{nome}' salvo.")
         self.popup.destroy()
@@ -258,6 +302,7 @@ class GerenciadorPopup:
     """
     Gerenciador interativo de faixas de preço para produtos unitários.
     Fornece interface com Treeview para listar, adicionar, editar e remover faixas.
+    As alterações ficam pendentes na tela e são gravadas juntas em "Salvar".
     """
     
     def __init__(self, parent, conn, nome_produto):
@@ -284,8 +329,15 @@ class GerenciadorPopup:
         self.ent_qmax = None
         self.ent_qpreco = None
         
+        # Faixas em edição (iid -> faixa; id None = nova), ids removidos e
+        # iids de faixas existentes alteradas
+        self._faixas = {}
+        self._removidas = []
+        self._alteradas = set()
+        
         self._criar_interface()
         self._carregar_faixas()
+        self.popup.protocol('WM_DELETE_WINDOW', self.fechar)
     
     def _criar_interface(self):
         """Constrói a interface do popup."""
@@ -334,13 +386,29 @@ class GerenciadorPopup:
         ttk.Button(btn_frame, text='Adicionar', command=self.adicionar_faixa).pack(side='left', padx=4)
         ttk.Button(btn_frame, text='Editar', command=self.editar_faixa).pack(side='left', padx=4)
         ttk.Button(btn_frame, text='Remover', command=self.remover_faixa).pack(side='left', padx=4)
+        ttk.Button(btn_frame, text='Normalizar', command=self.normalizar).pack(side='left', padx=4)
+        ttk.Button(btn_frame, text='Salvar', command=self.salvar).pack(side='right', padx=4)
+    
+    @property
+    def pendente(self):
+        """True se há alterações ainda não gravadas."""
+        return bool(self._removidas or self._alteradas or any(f['id'] is None for f in self._faixas.values()))
     
     def _carregar_faixas(self):
         """Carrega as faixas da base de dados e exibe na treeview."""
         self.tree.delete(*self.tree.get_children())
+        self._faixas = {}
+        self._removidas = []
+        self._alteradas = set()
         faixas = get_faixas_por_produto(self.conn, self.nome_produto)
         for faixa in faixas:
-            self.tree.insert('', 'end', values=(faixa['id'], faixa['qtd_min'], faixa['qtd_max'], faixa['preco']))
+            iid = self.tree.insert('', 'end', values=self._valores(faixa))
+            self._faixas[iid] = faixa
+    
+    @staticmethod
+    def _valores(faixa):
+        fid = faixa['id'] if faixa['id'] is not None else 'novo'
+        return (fid, faixa['qtd_min'], faixa['qtd_max'], faixa['preco'])
     
     def _limpar_inputs(self):
         """Limpa os campos de entrada."""
@@ -377,32 +445,19 @@ class GerenciadorPopup:
         
         return qmin, qmax, preco
     
-    def _verifica_sobreposicao(self, qmin, qmax, ignore_id=None):
+    def _verifica_sobreposicao(self, qmin, qmax, ignore_iid=None):
         """
-        Verifica se uma nova faixa se sobrepõe com faixas existentes.
+        Verifica se uma nova faixa se sobrepõe com as faixas em edição.
         
         Args:
             qmin: quantidade mínima
             qmax: quantidade máxima
-            ignore_id: ID de faixa a ignorar na verificação (útil para edição)
+            ignore_iid: item da treeview a ignorar na verificação (útil para edição)
         
         Returns:
             True se houver sobreposição, False caso contrário
         """
-        faixas = get_faixas_por_produto(self.conn, self.nome_produto)
-        
-        for faixa in faixas:
-            if ignore_id is not None and faixa['id'] == ignore_id:
-                continue
-            
-            fmin = faixa['qtd_min']
-            fmax = faixa['qtd_max']
-            
-            # Verifica se há interseção
-            if not (qmax < fmin or qmin > fmax):
-                return True
-        
-        return False
+        return _sobrepoe(self._faixas, qmin, qmax, ignorar=ignore_iid)
     
     def adicionar_faixa(self):
         """Adiciona uma nova faixa após validação."""
@@ -416,10 +471,10 @@ class GerenciadorPopup:
             messagebox.showwarning('Erro', 'Faixa sobrepõe outra já existente')
             return
         
-        add_faixa(self.conn, self.nome_produto, qmin, qmax, preco)
-        self._carregar_faixas()
+        faixa = {'id': None, 'qtd_min': qmin, 'qtd_max': qmax, 'preco': preco}
+        iid = self.tree.insert('', 'end', values=self._valores(faixa))
+        self._faixas[iid] = faixa
         self._limpar_inputs()
-        messagebox.showinfo('Sucesso', 'Faixa adicionada com sucesso')
     
     def editar_faixa(self):
         """Edita a faixa selecionada após validação."""
@@ -428,7 +483,7 @@ class GerenciadorPopup:
             messagebox.showinfo('Info', 'Selecione uma faixa para editar')
             return
         
-        fid = self.tree.item(sel)['values'][0]
+        iid = sel[0]
         
         valores = self._ler_inputs()
         if valores is None:
@@ -436,14 +491,16 @@ class GerenciadorPopup:
         
         qmin, qmax, preco = valores
         
-        if self._verifica_sobreposicao(qmin, qmax, ignore_id=fid):
+        if self._verifica_sobreposicao(qmin, qmax, ignore_iid=iid):
             messagebox.showwarning('Erro', 'Faixa sobrepõe outra já existente')
             return
         
-        update_faixa(self.conn, fid, qmin, qmax, preco)
-        self._carregar_faixas()
+        faixa = self._faixas[iid]
+        faixa.update(qtd_min=qmin, qtd_max=qmax, preco=preco)
+        if faixa['id'] is not None:
+            self._alteradas.add(iid)
+        self.tree.item(iid, values=self._valores(faixa))
         self._limpar_inputs()
-        messagebox.showinfo('Sucesso', 'Faixa atualizada com sucesso')
     
     def remover_faixa(self):
         """Remove a faixa selecionada após confirmação."""
@@ -453,7 +510,86 @@ class GerenciadorPopup:
             return
         
         if messagebox.askyesno('Confirmação', 'Deseja remover esta faixa?'):
-            fid = self.tree.item(sel)['values'][0]
-            delete_faixa(self.conn, fid)
-            self._carregar_faixas()
-            messagebox.showinfo('Sucesso', 'Faixa removida com sucesso')
+            for iid in sel:
+                faixa = self._faixas.pop(iid)
+                self._alteradas.discard(iid)
+                if faixa['id'] is not None:
+                    self._removidas.append(faixa['id'])
+                self.tree.delete(iid)
+    
+    def normalizar(self):
+        """Troca as faixas em edição pela versão normalizada (gravada só em "Salvar").
+
+        Une faixas vizinhas de mesmo preço e resolve sobreposições mantendo os
+        preços que o sistema já cobrava; opcionalmente preenche as lacunas com
+        o preço da faixa anterior.
+        """
+        atuais = [(f['qtd_min'], f['qtd_max'], f['preco']) for f in self._faixas.values()]
+        novas, rel = normalizar_faixas(atuais)
+        lacunas = rel['lacunas']
+        preencher = False
+        # lacunas entre faixas (a anterior à primeira faixa não é preenchida)
+        if any(ini > 1 for ini, _ in lacunas):
+            texto = ', '.join(f'{a}-{b}' for a, b in lacunas[:10])
+            preencher = messagebox.askyesnocancel(
+                'Normalizar', f'Quantidades sem faixa: {texto}.\n\nPreencher com o preço da faixa anterior?',
+                parent=self.popup,
+            )
+            if preencher is None:
+                return
+            if preencher:
+                novas, rel = normalizar_faixas(atuais, preencher_lacunas=True)
+        if sorted(atuais) == novas:
+            messagebox.showinfo('Normalizar', 'As faixas já estão normalizadas.', parent=self.popup)
+            return
+        for iid, faixa in self._faixas.items():
+            if faixa['id'] is not None:
+                self._removidas.append(faixa['id'])
+            self.tree.delete(iid)
+        self._faixas = {}
+        self._alteradas = set()
+        for qmin, qmax, preco in novas:
+            faixa = {'id': None, 'qtd_min': qmin, 'qtd_max': qmax, 'preco': preco}
+            iid = self.tree.insert('', 'end', values=self._valores(faixa))
+            self._faixas[iid] = faixa
+        messagebox.showinfo(
+            'Normalizar',
+            f"{rel['antes']} faixa(s) -> {rel['depois']} ({rel['sobreposicoes']} sobreposição(ões) resolvida(s), "
+            f"{rel['invalidas']} inválida(s) descartada(s)). Clique em Salvar para gravar.",
+            parent=self.popup,
+        )
+    
+    def salvar(self):
+        """Grava todas as alterações pendentes numa única transação."""
+        if not self.pendente:
+            return True
+        if not _confirmar_faixas(self._faixas, self.popup):
+            return False
+        repo = get_repositorio(self.conn)
+        try:
+            with repo.transacao():
+                # remoções primeiro: liberam intervalos reaproveitados pelas demais
+                for fid in self._removidas:
+                    repo.delete_faixa(fid)
+                for iid in self._alteradas:
+                    f = self._faixas[iid]
+                    repo.update_faixa(f['id'], f['qtd_min'], f['qtd_max'], f['preco'])
+                for f in self._faixas.values():
+                    if f['id'] is None:
+                        repo.add_faixa(self.nome_produto, f['qtd_min'], f['qtd_max'], f['preco'])
+        except Exception as e:
+            messagebox.showerror('Erro', f'Não foi possível salvar as faixas:\n{e}')
+            return False
+        self._carregar_faixas()
+        messagebox.showinfo('Sucesso', 'Faixas salvas com sucesso')
+        return True
+    
+    def fechar(self):
+        """Fecha o popup, oferecendo salvar as alterações pendentes."""
+        if self.pendente:
+            resposta = messagebox.askyesnocancel('Confirmação', 'Salvar as alterações nas faixas?')
+            if resposta is None:
+                return
+            if resposta and not self.salvar():
+                return
+        self.popup.destroy()
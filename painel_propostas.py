@@ -0,0 +1,115 @@
+"""
+Painel de busca no histórico de propostas emitidas.
+Busca enquanto se digita (cliente, número, data/mês, descrições e valores)
+sobre o índice FTS5 de `features.historico_propostas`.
+"""
+
+import os
+import subprocess
+import sys
+import tkinter as tk
+from tkinter import messagebox
+from ttkbootstrap import ttk
+
+from features.dinheiro import formatar
+from features.historico_propostas import buscar_propostas
+
+
+class PainelPropostas:
+    """
+    Janela de busca de propostas. Duplo clique (ou Enter) abre o .docx gerado.
+    """
+
+    ATRASO_BUSCA_MS = 120
+    LIMITE = 200
+
+    def __init__(self, parent, conn):
+        """
+        Args:
+            parent: janela pai (tk.Tk)
+            conn: conexão com o banco de dados SQLite
+        """
+        self.parent = parent
+        self.conn = conn
+        self._after_id = None
+        self._arquivos = {}  # iid -> caminho do .docx
+
+        self.popup = tk.Toplevel(parent)
+        self.popup.title('Buscar Propostas')
+        self.popup.geometry('900x480')
+
+        self.var_busca = tk.StringVar()
+        self.var_status = tk.StringVar()
+        self._criar_interface()
+        self.buscar()
+
+    def _criar_interface(self):
+        topo = ttk.Frame(self.popup, padding=8)
+        topo.pack(fill='x')
+        ttk.Label(topo, text='Buscar:').pack(side='left')
+        ent = ttk.Entry(topo, textvariable=self.var_busca)
+        ent.pack(side='left', fill='x', expand=True, padx=6)
+        ent.bind('<KeyRelease>', self._agendar_busca)
+        ent.bind('<Return>', lambda e: self.buscar())
+        ent.focus_set()
+        ttk.Label(topo, textvariable=self.var_status, bootstyle='secondary').pack(side='right')
+
+        frame = ttk.Frame(self.popup, padding=(8, 0, 8, 8))
+        frame.pack(fill='both', expand=True)
+        cols = ('Cliente', 'Proposta', 'Data', 'Total (R$)', 'Trecho')
+        self.tree = ttk.Treeview(frame, columns=cols, show='headings', selectmode='browse')
+        larguras = {'Cliente': 200, 'Proposta': 90, 'Data': 90, 'Total (R$)': 100, 'Trecho': 380}
+        for c in cols:
+            self.tree.heading(c, text=c)
+            self.tree.column(c, width=larguras[c], anchor='w' if c in ('Cliente', 'Trecho') else 'center')
+        self.tree.pack(side='left', fill='both', expand=True)
+        vsb = ttk.Scrollbar(frame, orient='vertical', command=self.tree.yview)
+        vsb.pack(side='right', fill='y')
+        self.tree.configure(yscrollcommand=vsb.set)
+        self.tree.bind('<Double-1>', self.abrir_selecionada)
+        self.tree.bind('<Return>', self.abrir_selecionada)
+
+    def _agendar_busca(self, event=None):
+        if self._after_id is not None:
+            self.popup.after_cancel(self._after_id)
+        self._after_id = self.popup.after(self.ATRASO_BUSCA_MS, self.buscar)
+
+    def buscar(self):
+        self._after_id = None
+        try:
+            resultados = buscar_propostas(self.conn, self.var_busca.get(), limite=self.LIMITE)
+        except Exception as e:
+            self.var_status.set('')
+            messagebox.showerror('Erro', f'Busca inválida: {e}', parent=self.popup)
+            return
+        self.tree.delete(*self.tree.get_children())
+        self._arquivos = {}
+        for r in resultados:
+            iid = self.tree.insert('', 'end', values=(
+                r['cliente'],
+                r['proposta'],
+                r['data'].split(' ')[0],
+                f"R$ {formatar(r['total'], milhar=True)}",
+                ' '.join(r['trecho'].split()),
+            ))
+            self._arquivos[iid] = r['arquivo']
+        n = len(resultados)
+        self.var_status.set(f'{n}+ resultado(s)' if n >= self.LIMITE else f'{n} resultado(s)')
+
+    def abrir_selecionada(self, event=None):
+        sel = self.tree.selection()
+        if not sel:
+            return
+        arquivo = self._arquivos.get(sel[0])
+        if not arquivo or not os.path.isfile(arquivo):
+            messagebox.showinfo('Info', f'Arquivo não encontrado:\n{arquivo or "(sem arquivo)"}', parent=self.popup)
+            return
+        try:
+            if sys.platform.startswith('win'):
+                os.startfile(arquivo)
+            elif sys.platform == 'darwin':
+                subprocess.Popen(['open', arquivo])
+            else:
+                subprocess.Popen(['xdg-open', arquivo])
+        except Exception as e:
+            messagebox.showerror('Erro', f'Não foi possível abrir o arquivo: {e}', parent=self.popup)
@@ -0,0 +1,81 @@
+"""
+Janela com a diferença entre os preços do orçamento e os do catálogo atual.
+Mostra as linhas que mudam (preço e total antigos x novos) e só altera o
+orçamento quando o usuário confirma em "Aplicar".
+"""
+
+import tkinter as tk
+from ttkbootstrap import ttk
+
+from features.dinheiro import formatar
+
+
+class PainelReprecificacao:
+    """
+    Diferença de uma `features.reprecificacao.Reprecificacao`, com Aplicar/Cancelar.
+    """
+
+    # linhas exibidas (todas as alterações são aplicadas)
+    LIMITE = 1000
+
+    def __init__(self, parent, resultado, ao_aplicar):
+        """
+        Args:
+            parent: janela pai (tk.Tk)
+            resultado: `Reprecificacao` com as alterações a mostrar
+            ao_aplicar: chamada como `ao_aplicar(resultado)` ao confirmar
+        """
+        self.parent = parent
+        self.resultado = resultado
+        self.ao_aplicar = ao_aplicar
+
+        self.popup = tk.Toplevel(parent)
+        self.popup.title('Reprecificar Orçamento')
+        self.popup.geometry('980x480')
+        self.popup.transient(parent)
+        self._criar_interface()
+        # modal: o orçamento não muda enquanto a diferença está aberta
+        self.popup.grab_set()
+
+    def _criar_interface(self):
+        r = self.resultado
+        ttk.Label(self.popup, text=r.resumo(), justify='left', padding=8).pack(fill='x')
+
+        frame = ttk.Frame(self.popup, padding=(8, 0, 8, 0))
+        frame.pack(fill='both', expand=True)
+        cols = ('#', 'Descrição', 'Produto', 'Preço antigo', 'Preço novo', 'Total antigo', 'Total novo', 'Diferença')
+        self.tree = ttk.Treeview(frame, columns=cols, show='headings', selectmode='browse')
+        for c in cols:
+            self.tree.heading(c, text=c)
+            largura = 220 if c == 'Descrição' else 160 if c == 'Produto' else 90
+            self.tree.column(c, width=largura, anchor='w' if c in ('Descrição', 'Produto') else 'center')
+        self.tree.pack(side='left', fill='both', expand=True)
+        vsb = ttk.Scrollbar(frame, orient='vertical', command=self.tree.yview)
+        vsb.pack(side='right', fill='y')
+        self.tree.configure(yscrollcommand=vsb.set)
+
+        for a in r.alteracoes[:self.LIMITE]:
+            self.tree.insert('', 'end', values=(
+                a.indice + 1,
+                a.descricao,
+                a.produto,
+                f"R$ {formatar(a.preco_antigo)}",
+                f"R$ {formatar(a.preco_novo)}",
+                f"R$ {formatar(a.total_antigo)}",
+                f"R$ {formatar(a.total_novo)}",
+                f"{'+' if a.total_novo >= a.total_antigo else ''}{formatar(a.total_novo - a.total_antigo)}",
+            ))
+
+        rodape = ttk.Frame(self.popup, padding=8)
+        rodape.pack(fill='x')
+        if len(r.alteracoes) > self.LIMITE:
+            ttk.Label(
+                rodape, text=f'Mostrando {self.LIMITE} de {len(r.alteracoes)} alterações.', bootstyle='secondary'
+            ).pack(side='left')
+        ttk.Button(rodape, text='Aplicar', bootstyle='success', command=self.aplicar).pack(side='right')
+        ttk.Button(rodape, text='Cancelar', bootstyle='secondary', command=self.popup.destroy).pack(side='right', padx=6)
+
+    def aplicar(self):
+        self.popup.grab_release()
+        self.popup.destroy()
+        self.ao_aplicar(self.resultado)
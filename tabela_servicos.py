@@ -0,0 +1,235 @@
+import sqlite3
+import tkinter as tk
+from tkinter import messagebox
+
+from features.dinheiro import formatar
+
+
+class TabelaServicos:
+    """Tabela de serviços incremental e virtualizada sobre o `Treeview` da app.
+
+    Mantém `app.servicos` (um `features.orcamento.Orcamento`, que guarda o
+    total acumulado, atualizado em O(1) a cada inserção/remoção). O `Treeview` só materializa a janela de linhas
+    visível: cada linha da janela é um iid fixo ("v0", "v1", ...) e só recebe
+    `tree.item(...)` quando o conteúdo exibido mudou. A barra de rolagem e a
+    roda do mouse movem a janela sobre a lista completa.
+
+    Se `diario` (um `features.diario_orcamento.DiarioOrcamento`) estiver
+    definido, cada alteração também é gravada nele (autosave), antes de
+    mudar a lista: as entradas são posicionais, então uma entrada que faltasse
+    desalinharia todas as seguintes. Se a gravação falhar, o autosave é
+    desligado (o diário fica com o orçamento até a última alteração gravada).
+    """
+
+    ROW_HEIGHT_PADRAO = 20
+
+    def __init__(self, app, tree=None, scrollbar=None):
+        self.app = app
+        self.tree = tree if tree is not None else getattr(app, 'tree', None)
+        self.scrollbar = scrollbar if scrollbar is not None else getattr(app, 'vsb_servicos', None)
+        self.servicos = app.servicos
+        self.diario = None
+
+        self.inicio = 0      # índice do primeiro serviço exibido
+        self.janela = 20     # nº de linhas que cabem no Treeview
+        self._exibidos = []  # valores atualmente exibidos em cada slot
+        self._sel_idx = None  # índice (em servicos) da linha selecionada
+
+        if self.tree is not None:
+            if self.scrollbar is not None:
+                self.scrollbar.configure(command=self._on_scrollbar)
+                self.tree.configure(yscrollcommand=lambda *a: None)
+            self.tree.bind('<Configure>', self._on_configure, add='+')
+            self.tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+            self.tree.bind('<MouseWheel>', self._on_wheel, add='+')
+            self.tree.bind('<Button-4>', self._on_wheel, add='+')
+            self.tree.bind('<Button-5>', self._on_wheel, add='+')
+            self.tree.bind('<Down>', self._on_key, add='+')
+            self.tree.bind('<Up>', self._on_key, add='+')
+            self._render()
+
+    # ---------------- operações sobre a lista ----------------
+    def inserir(self, item, idx=None):
+        if idx is None:
+            idx = len(self.servicos)
+        self._gravar('inserir', idx, item)
+        self.servicos.insert(idx, item)
+        if self._sel_idx is not None and idx <= self._sel_idx:
+            self._sel_idx += 1
+        # acompanha o fim da lista ao adicionar no final
+        if idx == len(self.servicos) - 1:
+            self.inicio = max(0, len(self.servicos) - self.janela)
+        elif idx < self.inicio:
+            self.inicio += 1
+        self._render()
+
+    def atualizar(self, idx, item):
+        self._checar_indice(idx)
+        self._gravar('atualizar', idx, item)
+        self.servicos[idx] = item
+        self._render()
+
+    def atualizar_varios(self, alteracoes):
+        """Aplica [(idx, item)] de uma vez: uma gravação no diário e uma renderização."""
+        alteracoes = list(alteracoes)
+        for idx, _ in alteracoes:
+            self._checar_indice(idx)
+        self._gravar('atualizar_varios', alteracoes)
+        for idx, item in alteracoes:
+            self.servicos[idx] = item
+        self.servicos.recalcular_total()
+        self._render()
+
+    def remover(self, idx):
+        self._checar_indice(idx)
+        self._gravar('remover', idx)
+        item = self.servicos.pop(idx)
+        if self._sel_idx is not None:
+            if idx == self._sel_idx:
+                self._sel_idx = None
+            elif idx < self._sel_idx:
+                self._sel_idx -= 1
+        if idx < self.inicio:
+            self.inicio -= 1
+        self._render()
+        return item
+
+    def limpar(self):
+        self._gravar('limpar')
+        self.servicos.clear()
+        self.inicio = 0
+        self._sel_idx = None
+        self._render()
+
+    def _checar_indice(self, idx):
+        """IndexError antes de gravar no diário uma alteração que a lista recusaria."""
+        if not -len(self.servicos) <= idx < len(self.servicos):
+            raise IndexError(idx)
+
+    def _gravar(self, operacao, *args):
+        """Grava a alteração no diário; se falhar, desliga o autosave em vez de deixá-lo fora de sincronia."""
+        if self.diario is None:
+            return
+        try:
+            getattr(self.diario, operacao)(*args)
+        except sqlite3.Error as e:
+            self.diario = None
+            messagebox.showwarning(
+                "Aviso",
+                f"Não foi possível salvar o orçamento automaticamente; o autosave foi desligado:\n{e}",
+            )
+
+    def recarregar(self):
+        """Recalcula o total e reexibe a janela (após mudanças externas em `servicos`)."""
+        self.servicos.recalcular_total()
+        self._render()
+
+    @property
+    def total(self):
+        return self.servicos.total
+
+    # ---------------- renderização da janela ----------------
+    def _valores(self, idx):
+        desc, larg, alt, qtd, preco, total = self.servicos.linha(idx)
+        return (idx + 1, desc, larg, alt, qtd, f"R$ {formatar(preco)}", f"R$ {formatar(total)}")
+
+    def _render(self):
+        if self.tree is None:
+            return
+        n = len(self.servicos)
+        self.inicio = max(0, min(self.inicio, n - self.janela))
+        fim = min(n, self.inicio + self.janela)
+        qtd = fim - self.inicio
+
+        for slot in range(qtd):
+            idx = self.inicio + slot
+            valores = self._valores(idx)
+            if slot < len(self._exibidos):
+                if self._exibidos[slot] != valores:
+                    self.tree.item(f"v{slot}", values=valores)
+                    self._exibidos[slot] = valores
+            else:
+                self.tree.insert('', 'end', iid=f"v{slot}", values=valores)
+                self._exibidos.append(valores)
+        while len(self._exibidos) > qtd:
+            self._exibidos.pop()
+            self.tree.delete(f"v{len(self._exibidos)}")
+
+        # seleção acompanha o serviço, não o slot
+        if self._sel_idx is not None and self.inicio <= self._sel_idx < fim:
+            iid = f"v{self._sel_idx - self.inicio}"
+            if self.tree.selection() != (iid,):
+                self.tree.selection_set(iid)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        if self.scrollbar is not None:
+            if n:
+                self.scrollbar.set(self.inicio / n, fim / n)
+            else:
+                self.scrollbar.set(0.0, 1.0)
+
+    def rolar_para(self, inicio):
+        inicio = max(0, min(int(inicio), len(self.servicos) - self.janela))
+        if inicio != self.inicio:
+            self.inicio = inicio
+            self._render()
+
+    # ---------------- eventos ----------------
+    def _on_configure(self, event=None):
+        try:
+            altura_linha = int(self.tree.tk.call(
+                'ttk::style', 'lookup', self.tree.cget('style') or 'Treeview', '-rowheight') or 0)
+        except (tk.TclError, ValueError):
+            altura_linha = 0
+        altura_linha = altura_linha or self.ROW_HEIGHT_PADRAO
+        # desconta a linha de cabeçalho
+        janela = max(1, self.tree.winfo_height() // altura_linha - 1)
+        if janela != self.janela:
+            self.janela = janela
+            self._render()
+
+    def _on_select(self, event=None):
+        sel = self.tree.selection()
+        if sel and sel[0].startswith('v'):
+            self._sel_idx = self.inicio + int(sel[0][1:])
+
+    def _on_scrollbar(self, *args):
+        n = len(self.servicos)
+        if not args or not n:
+            return
+        if args[0] == 'moveto':
+            self.rolar_para(round(float(args[1]) * n))
+        elif args[0] == 'scroll':
+            passo = int(args[1])
+            if args[2] == 'pages':
+                passo *= self.janela
+            self.rolar_para(self.inicio + passo)
+
+    def _on_wheel(self, event):
+        if event.num == 4:
+            passo = -3
+        elif event.num == 5:
+            passo = 3
+        else:
+            passo = -3 if event.delta > 0 else 3
+        self.rolar_para(self.inicio + passo)
+        return 'break'
+
+    def _on_key(self, event):
+        # setas nas bordas da janela rolam a lista em vez de parar
+        if self._sel_idx is None:
+            return None
+        if event.keysym == 'Down' and self._sel_idx + 1 < len(self.servicos):
+            novo = self._sel_idx + 1
+        elif event.keysym == 'Up' and self._sel_idx > 0:
+            novo = self._sel_idx - 1
+        else:
+            return 'break'
+        self._sel_idx = novo
+        if novo < self.inicio:
+            self.inicio = novo
+        elif novo >= self.inicio + self.janela:
+            self.inicio = novo - self.janela + 1
+        self._render()
+        return 'break'
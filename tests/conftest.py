@@ -0,0 +1,35 @@
+import sqlite3
+
+import pytest
+
+from features import migracoes
+from features.migracoes import MIGRACOES, configurar_conexao, migrar
+
+
+def banco_na_versao(alvo):
+    """Banco em memória migrado só até `alvo`, como um app antigo o deixaria."""
+    conn = sqlite3.connect(':memory:')
+    configurar_conexao(conn)
+    conn.execute("PRAGMA foreign_keys=OFF")
+    cursor = conn.cursor()
+    for v, passo in MIGRACOES:
+        if v > alvo:
+            break
+        passo(cursor)
+        if v == 5:
+            # bancos dessa época já tinham o índice do histórico
+            migracoes._indice_propostas(cursor)
+    cursor.execute(f"PRAGMA user_version = {int(alvo)}")
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+@pytest.fixture
+def banco():
+    """Banco em memória com o esquema atual."""
+    conn = sqlite3.connect(':memory:')
+    configurar_conexao(conn)
+    migrar(conn)
+    yield conn
+    conn.close()
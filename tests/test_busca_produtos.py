@@ -0,0 +1,61 @@
+from features.busca_produtos import IndiceBusca, normalizar
+
+NOMES = ['BANNER LONA', 'Banner Roll-Up', 'ADESIVO VINIL', 'Placa de Sinalização', 'PLACA ACM',
+         'WIND BANNER', 'Adesivo Perfurado', 'CARTÃO DE VISITA', 'LONA FRONTLIGHT']
+
+
+def test_normalizar():
+    assert normalizar('  Placa de Sinalização ') == 'placa de sinalizacao'
+    assert normalizar('CARTÃO') == 'cartao'
+
+
+def test_ordem_prefixo_do_nome_palavra_e_trecho():
+    indice = IndiceBusca(NOMES)
+    # nome começando com o texto, depois palavra começando com ele, depois trecho no meio
+    assert indice.buscar('banner') == ['BANNER LONA', 'Banner Roll-Up', 'WIND BANNER']
+    assert indice.buscar('lona') == ['LONA FRONTLIGHT', 'BANNER LONA']
+    assert indice.buscar('anne') == ['BANNER LONA', 'Banner Roll-Up', 'WIND BANNER']
+    assert indice.buscar('ona') == ['BANNER LONA', 'LONA FRONTLIGHT']
+
+
+def test_varias_palavras_e_acentos():
+    indice = IndiceBusca(NOMES)
+    assert indice.buscar('placa sina') == ['Placa de Sinalização']
+    assert indice.buscar('sinalização') == ['Placa de Sinalização']
+    assert indice.buscar('cartao vis') == ['CARTÃO DE VISITA']
+    assert indice.buscar('ades perf') == ['Adesivo Perfurado']
+    assert indice.buscar('xyz') == []
+
+
+def test_limite_e_texto_vazio():
+    indice = IndiceBusca(NOMES)
+    assert indice.buscar('', limite=3) == ['Adesivo Perfurado', 'ADESIVO VINIL', 'BANNER LONA']
+    assert indice.buscar('a', limite=2) == ['Adesivo Perfurado', 'ADESIVO VINIL']
+
+
+def test_remover_e_adicionar_incrementais_igual_a_recarregar():
+    indice = IndiceBusca(NOMES)
+    indice.remover('BANNER LONA')
+    indice.remover('inexistente')
+    indice.adicionar('BANNER MESH')
+    indice.adicionar('BANNER MESH')
+    restantes = [n for n in NOMES if n != 'BANNER LONA'] + ['BANNER MESH']
+    do_zero = IndiceBusca(restantes)
+
+    assert len(indice) == len(restantes)
+    assert 'BANNER LONA' not in indice and 'BANNER MESH' in indice
+    for consulta in ('banner', 'lona', 'anne', 'mesh', 'ona', ''):
+        assert indice.buscar(consulta) == do_zero.buscar(consulta)
+    assert indice.por_nome == do_zero.por_nome
+    assert indice.por_palavra == do_zero.por_palavra
+    assert indice.trigramas == do_zero.trigramas
+
+
+def test_remover_tudo_esvazia_o_indice():
+    indice = IndiceBusca(NOMES)
+    for nome in NOMES:
+        indice.remover(nome)
+    assert len(indice) == 0
+    assert indice.por_nome == indice.por_palavra == []
+    assert indice.trigramas == {}
+    assert indice.buscar('banner') == []
@@ -0,0 +1,134 @@
+import json
+import sqlite3
+
+import pytest
+
+from features.catalogo_io import (ErroImportacao, exportar_catalogo, importar_catalogo, ler_arquivo_catalogo,
+                                  validar_catalogo)
+from features.faixas_index import get_indice
+from features.migracoes import configurar_conexao, migrar
+from features.repositorio import get_repositorio
+
+CATALOGO = [
+    {'nome': 'LONA', 'tipo': 'm2', 'preco_m2': 45.9, 'faixas': []},
+    {'nome': 'FITA', 'tipo': 'm', 'preco_m': 3.75, 'faixas': []},
+    {'nome': 'PANFLETO', 'tipo': 'unit', 'preco_unit': 0.09, 'faixas': [
+        {'qtd_min': 100, 'qtd_max': 999, 'preco': 0.065},
+        {'qtd_min': 1, 'qtd_max': 99, 'preco': 0.12},
+    ]},
+    {'nome': 'BOTTON', 'tipo': 'unit', 'preco_unit': 2.2, 'faixas': []},
+]
+
+
+def _escrever(tmp_path, produtos, nome='catalogo.json'):
+    path = tmp_path / nome
+    path.write_text(json.dumps(produtos, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+def _problemas(produtos):
+    with pytest.raises(ErroImportacao) as erro:
+        validar_catalogo(produtos)
+    return erro.value.problemas
+
+
+@pytest.mark.parametrize('extensao', ['json', 'csv'])
+def test_exportar_e_importar_preserva_o_catalogo(banco, tmp_path, extensao):
+    importar_catalogo(banco, _escrever(tmp_path, CATALOGO))
+    arquivo = str(tmp_path / f'exportado.{extensao}')
+    assert exportar_catalogo(banco, arquivo) == (4, 2)
+
+    destino = sqlite3.connect(':memory:')
+    configurar_conexao(destino)
+    migrar(destino)
+    resumo = importar_catalogo(destino, arquivo)
+    assert resumo == {'inseridos': 4, 'atualizados': 0, 'faixas': 2}
+
+    consulta = "SELECT nome, tipo, preco_m2, preco_m, preco_unit FROM produtos ORDER BY nome"
+    assert destino.execute(consulta).fetchall() == banco.execute(consulta).fetchall()
+    faixas = get_repositorio(destino).get_faixas_por_produto('PANFLETO')
+    assert [(f['qtd_min'], f['qtd_max'], f['preco']) for f in faixas] == [(1, 99, 0.12), (100, 999, 0.065)]
+    assert get_indice(destino).preco('PANFLETO', 150) == 0.065
+    destino.close()
+
+
+def test_validacao_lista_todos_os_problemas():
+    problemas = _problemas([
+        {'nome': '', 'tipo': 'unit'},
+        {'nome': 'A', 'tipo': 'cm'},
+        {'nome': 'B', 'tipo': 'm2', 'preco_m2': 'caro'},
+        {'nome': 'C', 'tipo': 'unit', 'faixas': [{'qtd_min': 1, 'qtd_max': 10, 'preco': 1},
+                                                 {'qtd_min': 5, 'qtd_max': 20, 'preco': 1}]},
+        {'nome': 'D', 'tipo': 'unit', 'faixas': [{'qtd_min': 10, 'qtd_max': 5, 'preco': 1}]},
+        {'nome': 'E', 'tipo': 'unit', 'faixas': [{'qtd_min': 1, 'preco': 1}]},
+        {'nome': 'F', 'tipo': 'm', 'faixas': [{'qtd_min': 1, 'qtd_max': 5, 'preco': 1}]},
+        {'nome': 'A', 'tipo': 'unit'},
+    ])
+    assert problemas == [
+        "produto #1: nome vazio",
+        "produto #2: tipo inválido 'cm' em 'A'",
+        "produto #3: valor numérico inválido em 'B'",
+        "produto #4: faixas 1-10 e 5-20 se sobrepõem em 'C'",
+        "produto #5: faixa inválida 10-5 em 'D'",
+        "produto #6: faixa incompleta em 'E'",
+        "produto #7: faixas informadas para produto 'F' do tipo 'm'",
+        "produto #8: produto 'A' repetido",
+    ]
+
+
+@pytest.mark.parametrize('qtd_max', ['10.7', 10.7, '1e400', 'dez'])
+def test_quantidade_nao_inteira_e_rejeitada(qtd_max):
+    problemas = _problemas([{'nome': 'A', 'tipo': 'unit', 'faixas': [{'qtd_min': 1, 'qtd_max': qtd_max, 'preco': 1}]}])
+    assert problemas == ["produto #1: faixa com valor inválido em 'A'"]
+
+
+def test_quantidade_inteira_escrita_como_decimal_e_aceita():
+    produto, = validar_catalogo([{'nome': 'A', 'tipo': 'unit', 'faixas': [
+        {'qtd_min': '1', 'qtd_max': '10.0', 'preco': '1,5'}, {'qtd_min': 11.0, 'qtd_max': 20, 'preco': 1}]}])
+    assert produto['faixas'] == [(1, 10, 1.5), (11, 20, 1.0)]
+
+
+def test_csv_aponta_a_linha_do_problema(tmp_path):
+    path = tmp_path / 'catalogo.csv'
+    path.write_text(
+        "nome,tipo,largura,altura,preco_m2,preco_m,preco_unit,qtd_min,qtd_max,preco_faixa\n"
+        "A,unit,,,,,1,1,10,1\n"
+        "A,unit,,,,,1,11,20.5,1\n",
+        encoding='utf-8',
+    )
+    with pytest.raises(ErroImportacao) as erro:
+        validar_catalogo(ler_arquivo_catalogo(str(path)))
+    assert erro.value.problemas == ["linha 3: faixa com valor inválido em 'A'"]
+
+
+def test_importacao_invalida_nao_grava_nada(banco, tmp_path):
+    importar_catalogo(banco, _escrever(tmp_path, CATALOGO))
+    ruim = [{'nome': 'NOVO', 'tipo': 'm2', 'preco_m2': 1}, {'nome': 'LONA', 'tipo': 'xx'}]
+    with pytest.raises(ErroImportacao):
+        importar_catalogo(banco, _escrever(tmp_path, ruim, 'ruim.json'))
+    assert banco.execute("SELECT COUNT(*) FROM produtos").fetchone()[0] == 4
+
+
+def test_sem_upsert_conflito_nao_grava(banco, tmp_path):
+    importar_catalogo(banco, _escrever(tmp_path, CATALOGO))
+    with pytest.raises(ErroImportacao) as erro:
+        importar_catalogo(banco, _escrever(tmp_path, [{'nome': 'LONA', 'tipo': 'm2', 'preco_m2': 1}], 'b.json'),
+                          upsert=False)
+    assert erro.value.problemas == ["produto 'LONA' já cadastrado"]
+    assert banco.execute("SELECT preco_m2 FROM produtos WHERE nome = 'LONA'").fetchone() == (45.9,)
+
+
+def test_upsert_substitui_faixas_e_limpa_quem_deixa_de_ser_unitario(banco, tmp_path):
+    importar_catalogo(banco, _escrever(tmp_path, CATALOGO))
+    novo = [
+        {'nome': 'PANFLETO', 'tipo': 'm2', 'preco_m2': 30.0},
+        {'nome': 'BOTTON', 'tipo': 'unit', 'faixas': [{'qtd_min': 1, 'qtd_max': 50, 'preco': 2.0}]},
+    ]
+    assert importar_catalogo(banco, _escrever(tmp_path, novo, 'novo.json')) == {
+        'inseridos': 0, 'atualizados': 2, 'faixas': 1}
+
+    assert banco.execute("SELECT nome FROM produtos_unitarios ORDER BY nome").fetchall() == [('BOTTON',)]
+    assert banco.execute("SELECT COUNT(*) FROM faixas_unitarias").fetchone() == (1,)
+    indice = get_indice(banco)
+    assert indice.preco('PANFLETO', 150) is None
+    assert indice.preco('BOTTON', 10) == 2.0
@@ -0,0 +1,109 @@
+import sqlite3
+
+import pytest
+
+from features.diario_orcamento import DiarioOrcamento, carregar_orcamento, compactar
+from features.migracoes import configurar_conexao, migrar
+from features.orcamento import ItemOrcamento, Orcamento
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    path = str(tmp_path / 'produtos.db')
+    conn = sqlite3.connect(path)
+    configurar_conexao(conn)
+    migrar(conn)
+    conn.close()
+    return path
+
+
+def _item(desc, total, produto=None):
+    return ItemOrcamento(desc, '80', '120', 2, total // 2, total, produto, 1.5 if produto else 0.0)
+
+
+def _editar(diario, orc):
+    """Aplica as mesmas alterações ao diário e ao orçamento em memória."""
+    for pos, item in [(0, _item('A', 1000)), (1, _item('B', 2000, 'LONA')), (1, _item('C', 3000))]:
+        diario.inserir(pos, item)
+        orc.insert(pos, item)
+    diario.atualizar(0, _item('A2', 1500))
+    orc[0] = _item('A2', 1500)
+    diario.remover(2)
+    orc.pop(2)
+    diario.atualizar_varios([(0, _item('A3', 1700)), (1, _item('C2', 3100))])
+    orc[0], orc[1] = _item('A3', 1700), _item('C2', 3100)
+    diario.cabecalho('ACME', '7', '31/01/2025')
+
+
+def _estado(orc):
+    return list(orc.linhas_completas()), orc.total
+
+
+def test_reabrir_aplica_o_diario_sobre_o_snapshot(caminho):
+    diario, cabecalho, orc = DiarioOrcamento.recuperar_ou_criar(caminho)
+    assert len(orc) == 0
+    esperado = Orcamento()
+    _editar(diario, esperado)
+    diario.conn.close()
+
+    diario, cabecalho, orc = DiarioOrcamento.recuperar_ou_criar(caminho)
+    assert cabecalho == {'cliente': 'ACME', 'numero': '7', 'data': '31/01/2025'}
+    assert _estado(orc) == _estado(esperado)
+    assert orc[0].produto is None
+    assert diario.pendentes == 8
+    assert diario.descartadas == 0
+    diario.conn.close()
+
+
+def test_compactar_reescreve_o_snapshot_e_esvazia_o_diario(caminho):
+    diario, _, _ = DiarioOrcamento.recuperar_ou_criar(caminho)
+    esperado = Orcamento()
+    _editar(diario, esperado)
+    assert compactar(diario.conn, diario.orcamento_id) == 8
+    assert diario.conn.execute("SELECT COUNT(*) FROM orcamento_diario").fetchone() == (0,)
+    assert compactar(diario.conn, diario.orcamento_id) == 0
+
+    cabecalho, orc, ultimo, descartadas = carregar_orcamento(diario.conn, diario.orcamento_id)
+    assert (cabecalho['cliente'], ultimo, descartadas) == ('ACME', 0, 0)
+    assert _estado(orc) == _estado(esperado)
+
+    # depois da compactação o diário continua sobre o snapshot novo
+    diario.limpar()
+    diario.inserir(0, _item('Z', 10))
+    diario.fechar()
+    diario, _, orc = DiarioOrcamento.recuperar_ou_criar(caminho)
+    assert [i.descricao for i in orc] == ['Z']
+    assert diario.pendentes == 0
+    diario.conn.close()
+
+
+def test_entrada_que_nao_se_aplica_descarta_ela_e_as_seguintes(caminho):
+    diario, _, _ = DiarioOrcamento.recuperar_ou_criar(caminho)
+    diario.inserir(0, _item('A', 1000))
+    diario.inserir(1, _item('B', 2000))
+    diario.remover(5)  # fora de sincronia
+    diario.inserir(0, _item('C', 3000))
+    diario.conn.close()
+
+    diario, _, orc = DiarioOrcamento.recuperar_ou_criar(caminho)
+    assert [i.descricao for i in orc] == ['A', 'B']
+    assert orc.total == 3000
+    assert diario.descartadas == 2
+
+    # a compactação guarda o estado recuperado e apaga também as descartadas
+    assert compactar(diario.conn, diario.orcamento_id) == 4
+    _, orc, _, descartadas = carregar_orcamento(diario.conn, diario.orcamento_id)
+    assert ([i.descricao for i in orc], descartadas) == (['A', 'B'], 0)
+    diario.conn.close()
+
+
+def test_entradas_antigas_de_seis_campos(caminho):
+    diario, _, _ = DiarioOrcamento.recuperar_ou_criar(caminho)
+    diario.conn.execute(
+        "INSERT INTO orcamento_diario (orcamento_id, op, posicao, dados) VALUES (?, 'inserir', 0, ?)",
+        (diario.orcamento_id, '["BANNER", "X", "X", 1, 500, 500]'),
+    )
+    diario.conn.commit()
+    _, orc, _, _ = carregar_orcamento(diario.conn, diario.orcamento_id)
+    assert orc[0] == ItemOrcamento('BANNER', 'X', 'X', 1, 500, 500)
+    diario.conn.close()
@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+import pytest
+
+from features.dinheiro import centavos, formatar, reais
+from features.orcamento import ItemOrcamento, Orcamento
+from features.regras_preco import get_regras
+from features.reprecificacao import itens_reprecificados, reprecificar
+from features.repositorio import get_repositorio
+
+
+@pytest.mark.parametrize('valor, esperado', [
+    ('R$ 1.234,56', 123456),
+    ('1.234,5', 123450),
+    ('1,234.56', 123456),
+    ('12,30', 1230),
+    ('12.30', 1230),
+    ('  R$\xa012,30 ', 1230),
+    (12, 1200),
+    (12.3, 1230),
+    (None, 0),
+    ('', 0),
+])
+def test_centavos_formatos(valor, esperado):
+    assert centavos(valor) == esperado
+
+
+@pytest.mark.parametrize('valor, esperado', [
+    (0.005, 1),
+    (-0.005, -1),
+    (1.005, 101),
+    (2.675, 268),
+    (0.004999, 0),
+    (Decimal('0.005'), 1),
+    (Decimal('12.345'), 1235),
+    (Decimal('-12.345'), -1235),
+    (Decimal('1234.56'), 123456),
+])
+def test_centavos_meio_centavo_para_longe_do_zero(valor, esperado):
+    assert centavos(valor) == esperado
+
+
+def test_centavos_caminho_rapido_igual_ao_decimal():
+    # o caminho rápido do float não pode divergir do arredondamento por Decimal
+    for c in range(0, 200001, 7):
+        valor = c / 1000
+        assert centavos(valor) == centavos(Decimal(repr(valor)))
+
+
+@pytest.mark.parametrize('valor', ['abc', '1,2,3', '1.234,56,7', float('nan'), float('inf'), Decimal('NaN')])
+def test_centavos_invalido(valor):
+    with pytest.raises(ValueError):
+        centavos(valor)
+
+
+@pytest.mark.parametrize('valor, texto, milhar', [
+    (0, '0.00', '0.00'),
+    (5, '0.05', '0.05'),
+    (123456, '1234.56', '1,234.56'),
+    (-123456, '-1234.56', '-1,234.56'),
+    (-5, '-0.05', '-0.05'),
+    (100000000, '1000000.00', '1,000,000.00'),
+])
+def test_formatar(valor, texto, milhar):
+    assert formatar(valor) == texto
+    assert formatar(valor, milhar=True) == milhar
+    assert formatar(valor) == f'{reais(valor):.2f}'
+
+
+def test_arredonda_so_o_total_da_linha_nao_a_taxa(banco):
+    # taxa com fração de centavo: gravada como está (REAL), sem passar por centavos()
+    get_repositorio(banco).salvar_produto('PANFLETO', 'unit', preco_unit=0.045)
+    assert banco.execute("SELECT preco_unit FROM produtos").fetchone() == (0.045,)
+
+    total = get_regras(banco).regra('PANFLETO')(1000, 0, 0, None, 0)
+    assert centavos(total) == 4500
+    assert centavos(0.045) * 1000 == 5000  # o que daria arredondar a taxa primeiro
+
+    orc = Orcamento([ItemOrcamento('PANFLETO', quantidade=1000, preco=0, total=0, produto='PANFLETO')])
+    (indice, item), = itens_reprecificados(orc, reprecificar(banco, orc))
+    assert (indice, item.preco, item.total) == (0, 5, 4500)
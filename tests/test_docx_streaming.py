@@ -0,0 +1,68 @@
+import zipfile
+
+import pytest
+
+pytest.importorskip('docx')
+from docx import Document
+
+from features.docx_streaming import DocumentoStreaming
+from features.gerar_docx import LINHAS_STREAMING, docxGenerator
+from features.orcamento import ItemOrcamento, Orcamento
+
+
+@pytest.fixture
+def modelo(tmp_path):
+    doc = Document()
+    doc.add_paragraph('Cliente: {{NOME}} - Proposta {{PROPOSTA}}')
+    doc.add_paragraph('Data: {{DATA}}')
+    tabela = doc.add_table(rows=3, cols=7)
+    for cel, texto in zip(tabela.rows[0].cells, ['#', 'DESCRIÇÃO', 'LARG', 'ALT', 'QTD', 'PREÇO', 'TOTAL']):
+        cel.text = texto
+    path = tmp_path / 'modelo.docx'
+    doc.save(str(path))
+    return str(path)
+
+
+def _orcamento(n):
+    orc = Orcamento()
+    for i in range(n):
+        desc = f'BANNER {i} <lona> & "ilhós"\rfim' if i % 7 == 0 else f'ADESIVO {i}'
+        larg, alt = ('0', '') if i % 5 == 0 else ('1,20', '0,80')
+        orc.append(ItemOrcamento(desc, larg, alt, i % 9 + 1, 1234, 1234 * (i % 9 + 1)))
+    return orc
+
+
+def _document_xml(path):
+    with zipfile.ZipFile(path) as z:
+        return z.read('word/document.xml')
+
+
+def _gerador(modelo, servicos):
+    return docxGenerator(modelo, 'Acme Ltda', '42', '42/2025', '31/01/2025', servicos)
+
+
+@pytest.mark.parametrize('n', [LINHAS_STREAMING, LINHAS_STREAMING + 137])
+def test_streaming_gera_o_mesmo_document_xml(tmp_path, modelo, n):
+    servicos = _orcamento(n)
+    esperado = tmp_path / 'docx.docx'
+    _gerador(modelo, servicos).montar_documento().save(str(esperado))
+
+    gerador = _gerador(modelo, servicos)
+    doc = gerador.montar_streaming()
+    assert isinstance(doc, DocumentoStreaming)
+    obtido = tmp_path / 'streaming.docx'
+    gerador.renderizar(str(obtido))
+
+    assert _document_xml(obtido) == _document_xml(esperado)
+    xml = _document_xml(obtido).decode('utf-8')
+    assert xml.count('<w:tr>') + xml.count('<w:tr ') == n + 2
+    assert 'ACME LTDA' in xml and '&lt;lona&gt; &amp;' in xml
+
+
+def test_texto_que_o_lxml_recusa_falha_igual_nos_dois_caminhos(modelo):
+    servicos = _orcamento(LINHAS_STREAMING)
+    servicos[3] = ItemOrcamento('CONTROLE \x01', '1', '1', 1, 100, 100)
+    # sem streaming: o caminho python-docx recusa o texto do mesmo jeito
+    for montar in ('montar_documento', 'montar_streaming'):
+        with pytest.raises(ValueError, match='XML compatible'):
+            getattr(_gerador(modelo, servicos), montar)()
@@ -0,0 +1,83 @@
+import pytest
+
+from features.faixas_index import LIMITE_DENSO, FaixasIndex, get_indice
+from features.repositorio import get_repositorio
+
+QTDS = [0, 1, 9, 10, 11, 99, 100, 101, 500, LIMITE_DENSO - 1, LIMITE_DENSO, LIMITE_DENSO + 1, 5000, 10**6, 10**9]
+
+
+def _precos(indice, nome):
+    return [indice.preco(nome, q) for q in QTDS]
+
+
+def _confere_com_o_banco(conn, nome):
+    # o índice mantido por write-through tem de bater com um recarregado do zero
+    assert _precos(get_indice(conn), nome) == _precos(FaixasIndex().carregar(conn), nome)
+
+
+@pytest.fixture
+def repo(banco):
+    repo = get_repositorio(banco)
+    repo.salvar_produto('PANFLETO', 'unit', preco_unit=0.1)
+    get_indice(banco)  # carregado antes das alterações: daqui em diante só write-through
+    return repo
+
+
+def test_add_update_delete_refletem_no_preco(banco, repo):
+    indice = get_indice(banco)
+    assert indice.preco('PANFLETO', 10) is None
+
+    f1 = repo.add_faixa('PANFLETO', 1, 99, 0.12)
+    f2 = repo.add_faixa('PANFLETO', 100, 4999, 0.08)
+    f3 = repo.add_faixa('PANFLETO', 5000, 10**9, 0.05)
+    assert _precos(indice, 'PANFLETO') == [None, 0.12, 0.12, 0.12, 0.12, 0.12, 0.08, 0.08, 0.08,
+                                           0.08, 0.08, 0.08, 0.05, 0.05, 0.05]
+    _confere_com_o_banco(banco, 'PANFLETO')
+
+    repo.update_faixa(f2, 100, 2000, 0.07)
+    assert indice.preco('PANFLETO', 1500) == 0.07
+    assert indice.preco('PANFLETO', 2001) is None
+    _confere_com_o_banco(banco, 'PANFLETO')
+
+    repo.delete_faixa(f1)
+    assert indice.preco('PANFLETO', 50) is None
+    assert indice.preco('PANFLETO', 100) == 0.07
+    _confere_com_o_banco(banco, 'PANFLETO')
+
+    repo.delete_faixa(f3)
+    repo.delete_faixa(f2)
+    assert _precos(indice, 'PANFLETO') == [None] * len(QTDS)
+    assert indice.faixas('PANFLETO') == []
+
+
+def test_remover_produto_descarta_as_faixas(banco, repo):
+    repo.add_faixa('PANFLETO', 1, 99, 0.12)
+    repo.remover_produto('PANFLETO')
+    indice = get_indice(banco)
+    assert indice.preco('PANFLETO', 10) is None
+    assert indice.tipo('PANFLETO') is None
+
+
+def test_transacao_desfeita_nao_altera_o_indice(banco, repo):
+    repo.add_faixa('PANFLETO', 1, 99, 0.12)
+    with pytest.raises(RuntimeError):
+        with repo.transacao():
+            repo.add_faixa('PANFLETO', 100, 199, 0.08)
+            raise RuntimeError
+    assert get_indice(banco).preco('PANFLETO', 150) is None
+    _confere_com_o_banco(banco, 'PANFLETO')
+
+
+def test_preco_aceita_quantidade_em_texto():
+    indice = FaixasIndex()
+    indice.add_faixa('P', 1, 1, 10, 2.0)
+    assert indice.preco('P', '5') == 2.0
+    assert indice.preco('P', 'cinco') is None
+    assert indice.preco('OUTRO', 5) is None
+
+
+def test_sobreposicao_vale_a_ultima_faixa_na_ordem():
+    indice = FaixasIndex()
+    indice.add_faixa('P', 1, 1, 100, 2.0)
+    indice.add_faixa('P', 2, 50, 150, 1.0)
+    assert [indice.preco('P', q) for q in (49, 50, 100, 101, 150, 151)] == [2.0, 1.0, 1.0, 1.0, 1.0, None]
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from features.faixas_validacao import (INVERTIDA, LACUNA, ORFA, SOBREPOSICAO, TIPO_ERRADO, normalizar_faixas,
+                                       segmentos, validar_faixas, verificar_catalogo)
+from features.repositorio import get_repositorio
+
+
+def _preco_ingenuo(faixas, qtd):
+    """Regra de referência: a última faixa, na ordem (qtd_min, qtd_max, preço), que contém `qtd`."""
+    preco = None
+    for qmin, qmax, p in sorted(f[:3] for f in faixas):
+        if qmin <= qtd <= qmax:
+            preco = p
+    return preco
+
+
+def _preco_segmentos(segs, qtd):
+    for ini, fim, preco in segs:
+        if ini <= qtd <= fim:
+            return preco
+    return None
+
+
+def test_segmentos_disjuntos_e_unidos():
+    faixas = [(1, 10, 2.0), (11, 20, 2.0), (15, 30, 1.5), (40, 50, 1.0), (45, 42, 9.0)]
+    assert segmentos(faixas) == [(1, 14, 2.0), (15, 30, 1.5), (40, 50, 1.0)]
+    assert segmentos([]) == []
+
+
+@pytest.mark.parametrize('semente', range(20))
+def test_segmentos_igual_a_regra_ingenua(semente):
+    rnd = random.Random(semente)
+    faixas = []
+    for _ in range(rnd.randint(1, 12)):
+        qmin = rnd.randint(-2, 60)
+        faixas.append((qmin, qmin + rnd.randint(-3, 25), rnd.choice([1.0, 1.5, 2.0, 2.5])))
+    segs = segmentos(faixas)
+    assert all(a[1] < b[0] for a, b in zip(segs, segs[1:]))
+    for qtd in range(-3, 90):
+        assert _preco_segmentos(segs, qtd) == _preco_ingenuo(faixas, qtd)
+
+
+def test_validar_faixas():
+    faixas = [(5, 10, 1.0), (0, 3, 1.0), (8, 12, 1.0), (20, 30, 1.0), (40, 35, 1.0)]
+    problemas = validar_faixas(faixas, 'P', lacunas=True)
+    assert [(p.tipo, p.faixa, p.outra) for p in problemas] == [
+        (INVERTIDA, (0, 3, 1.0), None),
+        (INVERTIDA, (40, 35, 1.0), None),
+        (LACUNA, (1, 4), None),
+        (SOBREPOSICAO, (5, 10, 1.0), (8, 12, 1.0)),
+        (LACUNA, (13, 19), None),
+    ]
+    assert validar_faixas([(1, 10, 1.0), (11, 20, 0.5)], lacunas=True) == []
+
+
+def test_normalizar_faixas():
+    faixas = [(1, 10, 2.0), (11, 20, 2.0), (15, 30, 1.5), (40, 50, 1.0), (60, 55, 9.0), (-5, 0, 3.0)]
+    novas, rel = normalizar_faixas(faixas)
+    assert novas == [(1, 14, 2.0), (15, 30, 1.5), (40, 50, 1.0)]
+    assert rel == {'antes': 6, 'depois': 3, 'invalidas': 2, 'sobreposicoes': 1,
+                   'lacunas': [(31, 39)], 'lacunas_preenchidas': False}
+    for qtd in range(1, 60):
+        assert _preco_segmentos(novas, qtd) == _preco_ingenuo(faixas, qtd)
+
+    preenchidas, rel = normalizar_faixas([(5, 10, 2.0), (20, 30, 2.0), (40, 50, 1.0)], preencher_lacunas=True)
+    assert preenchidas == [(5, 39, 2.0), (40, 50, 1.0)]
+    assert rel['lacunas'] == [(1, 4), (11, 19), (31, 39)]
+
+
+def test_normalizar_e_idempotente():
+    novas, _ = normalizar_faixas([(1, 10, 2.0), (5, 30, 1.5), (31, 40, 1.5)])
+    assert normalizar_faixas(novas)[0] == novas == [(1, 4, 2.0), (5, 40, 1.5)]
+
+
+def test_verificar_catalogo(banco):
+    repo = get_repositorio(banco)
+    repo.salvar_produto('OK', 'unit', preco_unit=1.0)
+    repo.add_faixa('OK', 1, 10, 1.0)
+    repo.add_faixa('OK', 11, 20, 0.9)
+    repo.salvar_produto('RUIM', 'unit', preco_unit=1.0)
+    repo.add_faixa('RUIM', 1, 10, 1.0)
+    repo.add_faixa('RUIM', 5, 20, 0.9)
+    repo.salvar_produto('M2', 'm2', preco_m2=1.0)
+    repo.add_faixa('M2', 1, 10, 1.0)
+    banco.execute("PRAGMA foreign_keys=OFF")
+    banco.execute("INSERT INTO faixas_unitarias (produto_id, qtd_min, qtd_max, preco) VALUES (999, 1, 5, 1.0)")
+    banco.commit()
+
+    rel = verificar_catalogo(banco)
+    assert (rel.produtos, rel.faixas) == (4, 6)
+    assert not rel.ok
+    assert {(p.tipo, p.produto) for p in rel.problemas} == {
+        (SOBREPOSICAO, 'RUIM'), (TIPO_ERRADO, 'M2'), (ORFA, 'produto_id 999')}
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from features.historico_propostas import registro_proposta
+from gerar_propostas import ler_manifesto
+
+
+def _manifesto(tmp_path, orcamentos):
+    path = tmp_path / 'manifesto.json'
+    path.write_text(json.dumps(orcamentos), encoding='utf-8')
+    return str(path)
+
+
+def test_valores_em_formato_brasileiro(tmp_path):
+    path = _manifesto(tmp_path, [{
+        'cliente': 'ACME', 'numero_proposta': '7', 'data': '31/01/2025',
+        'servicos': [
+            {'Descrição': 'banner', 'Quantidade': 2, 'Preço': '1.234,50', 'Total (R$)': '2.469,00'},
+            {'Descrição': 'placa', 'Quantidade': '3', 'Preço': 'R$ 10,05'},
+            {'Descrição': 'adesivo', 'Preço': 0.005, 'Total (R$)': 19.99},
+        ],
+    }])
+    orc, = ler_manifesto(path)
+    assert 'erro' not in orc
+    assert list(orc['servicos'].precos) == [123450, 1005, 1]
+    assert list(orc['servicos'].totais) == [246900, 3015, 1999]
+    assert orc['servicos'].total == 251914
+    assert orc['proposta_completa'] == '07-2025'
+    assert registro_proposta('ACME', '07-2025', orc['data'], orc['servicos'])['total'] == 251914
+
+
+@pytest.mark.parametrize('campo, valor', [('Preço', 'abc'), ('Total (R$)', '1,2,3'), ('Quantidade', 'duas')])
+def test_valor_ilegivel_falha_so_o_orcamento(tmp_path, campo, valor):
+    ruim = {'Descrição': 'banner', 'Quantidade': 1, 'Preço': '10,00'}
+    ruim[campo] = valor
+    path = _manifesto(tmp_path, [
+        {'cliente': 'A', 'numero_proposta': '1', 'servicos': [{'Descrição': 'ok', 'Preço': 1}, ruim]},
+        {'cliente': 'B', 'numero_proposta': '2', 'servicos': [{'Descrição': 'ok', 'Preço': '2,50'}]},
+    ])
+    ruim_orc, bom_orc = ler_manifesto(path)
+    assert 'serviço 2 (BANNER)' in ruim_orc['erro']
+    assert valor in ruim_orc['erro']
+    assert len(ruim_orc['servicos']) == 0
+    assert 'erro' not in bom_orc
+    assert bom_orc['servicos'].total == 250
@@ -0,0 +1,52 @@
+import pytest
+
+from features.historico_propostas import buscar_propostas, fts_disponivel, indexar_proposta
+from features.orcamento import ItemOrcamento, Orcamento
+
+
+def _sem_fts5(conn):
+    conn.executescript(
+        "DROP TRIGGER propostas_ai; DROP TRIGGER propostas_ad; DROP TABLE propostas_fts;"
+    )
+    assert not fts_disponivel(conn)
+
+
+@pytest.fixture(params=['fts5', 'like'])
+def historico(request, banco):
+    if request.param == 'like':
+        _sem_fts5(banco)
+    ids = {}
+    for cliente, descricao, data in [
+        ('Padaria São João', 'Placa de Sinalização', '15/03/2025'),
+        ('Mercado Central', 'BANNER LONA', '02/01/2024'),
+        ('Farmácia Ávila', 'Adesivo perfurado', '20/03/2025'),
+    ]:
+        servicos = Orcamento([ItemOrcamento(descricao, quantidade=1, preco=12345, total=12345)])
+        ids[cliente] = indexar_proposta(banco, cliente, '01-2025', data, servicos)
+    return banco, ids
+
+
+@pytest.mark.parametrize('consulta, cliente', [
+    ('sinalização', 'Padaria São João'),
+    ('sinalizacao', 'Padaria São João'),
+    ('SÃO joão', 'Padaria São João'),
+    ('farmacia avila', 'Farmácia Ávila'),
+    ('banner', 'Mercado Central'),
+    ('março 2025 adesivo', 'Farmácia Ávila'),
+])
+def test_busca_ignora_acentos_e_caixa(historico, consulta, cliente):
+    conn, ids = historico
+    assert [p['id'] for p in buscar_propostas(conn, consulta)] == [ids[cliente]]
+
+
+def test_busca_por_prefixo_exige_todos_os_termos(historico):
+    conn, ids = historico
+    assert [p['id'] for p in buscar_propostas(conn, 'sinal pada')] == [ids['Padaria São João']]
+    assert buscar_propostas(conn, 'sinalização mercado') == []
+
+
+def test_busca_vazia_traz_as_mais_recentes(historico):
+    conn, ids = historico
+    resultado = buscar_propostas(conn, '', limite=2)
+    assert [p['id'] for p in resultado] == [ids['Farmácia Ávila'], ids['Mercado Central']]
+    assert resultado[0]['total'] == 12345
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from features.catalogo_io import importar_catalogo
+from features.migracao_tiers import FAIXAS_AJUSTADAS, faixas_do_tiers, migrar_tiers
+from features.migracoes import migrar
+from tests.conftest import banco_na_versao
+
+LIMPOS = {
+    'PANFLETO': [{'min': 100, 'max': 499, 'price': 0.09}, {'min': 1, 'max': 99, 'price': 0.12},
+                 {'min': 500, 'price': 0.065}],
+    'BOTTON': [{'min': 0, 'max': 10, 'price': '2.5'}, {'min': 11, 'max': 50, 'price': 2}],
+    'VAZIO': [],
+}
+AJUSTADOS = {
+    'SOBREPOSTO': [{'min': 1, 'max': 100, 'price': 1.0}, {'min': 50, 'max': 200, 'price': 0.8}],
+    'INVERTIDO': [{'min': 1, 'max': 10, 'price': 1.0}, {'min': 30, 'max': 20, 'price': 0.5}],
+    'ILEGIVEL': [{'min': 1, 'max': 10, 'price': 1.0}, {'min': 'muitos', 'price': 0.5}, {'min': 11, 'price': 0.7}],
+}
+
+
+def _banco_legado(tiers):
+    conn = banco_na_versao(6)
+    conn.executemany(
+        "INSERT INTO produtos (nome, tipo, preco_unit, tiers) VALUES (?, 'unit', 3.0, ?)",
+        ((nome, json.dumps(t)) for nome, t in tiers.items()),
+    )
+    conn.commit()
+    return conn
+
+
+def _faixas(conn):
+    faixas = {}
+    for nome, qmin, qmax, preco in conn.execute(
+        "SELECT pu.nome, f.qtd_min, f.qtd_max, f.preco FROM faixas_unitarias f "
+        "JOIN produtos_unitarios pu ON pu.id = f.produto_id ORDER BY pu.nome, f.qtd_min"
+    ):
+        faixas.setdefault(nome, []).append((qmin, qmax, preco))
+    return faixas
+
+
+def _importadas(banco, tmp_path, tiers):
+    path = tmp_path / 'catalogo.json'
+    path.write_text(json.dumps([{'nome': n, 'tipo': 'unit', 'preco_unit': 3.0, 'tiers': t}
+                                for n, t in tiers.items()]), encoding='utf-8')
+    importar_catalogo(banco, str(path))
+    return _faixas(banco)
+
+
+def _tiers_restantes(conn):
+    return {r[0] for r in conn.execute("SELECT nome FROM produtos WHERE tiers IS NOT NULL")}
+
+
+def test_json_limpo_vira_as_mesmas_faixas_nos_tres_caminhos(banco, tmp_path):
+    esperado = {nome: faixas_do_tiers(t)[0] for nome, t in LIMPOS.items() if t}
+
+    conn = _banco_legado(LIMPOS)
+    migrar(conn)  # v7
+    assert _faixas(conn) == esperado
+    assert _tiers_restantes(conn) == set()
+
+    conn = _banco_legado(LIMPOS)
+    conn.execute("PRAGMA user_version = 7")  # pula a conversão da v7
+    migrar(conn)
+    rel = migrar_tiers(conn)
+    assert rel.conflitos == []
+    assert _faixas(conn) == esperado
+
+    assert _importadas(banco, tmp_path, LIMPOS) == esperado
+
+
+def test_json_com_ajustes_converte_igual_fora_da_migracao(banco, tmp_path):
+    conn = _banco_legado(AJUSTADOS)
+    migrar(conn)
+    # a v7 não ajusta nada: fica para o relatório de Migrar faixas legadas
+    assert _faixas(conn) == {}
+    assert _tiers_restantes(conn) == set(AJUSTADOS)
+
+    rel = migrar_tiers(conn)
+    assert {c.produto for c in rel.conflitos if c.tipo == FAIXAS_AJUSTADAS} == set(AJUSTADOS)
+    assert _faixas(conn) == {}
+
+    migrar_tiers(conn, ajustar=True)
+    ajustadas = _faixas(conn)
+    assert ajustadas == {
+        'SOBREPOSTO': [(1, 100, 1.0), (101, 200, 0.8)],
+        'INVERTIDO': [(1, 10, 1.0)],
+        'ILEGIVEL': [(1, 10, 1.0)],
+    }
+    assert _importadas(banco, tmp_path, AJUSTADOS) == ajustadas
+
+
+@pytest.mark.parametrize('tiers', ['{"min": 1}', 'não é json', '42'])
+def test_json_invalido(tiers):
+    with pytest.raises(ValueError):
+        faixas_do_tiers(tiers)
@@ -0,0 +1,107 @@
+import json
+import sqlite3
+
+import pytest
+
+from features import migracoes
+from features.historico_propostas import buscar_propostas, indexar_proposta
+from features.migracoes import MIGRACOES, VERSAO_ATUAL, configurar_conexao, migrar, versao
+from features.orcamento import ItemOrcamento, Orcamento
+from tests.conftest import banco_na_versao
+
+
+@pytest.fixture
+def banco_v7():
+    conn = banco_na_versao(7)
+    conn.execute("INSERT INTO orcamentos (id, cliente, numero) VALUES (1, 'ACME', '7')")
+    conn.executemany(
+        "INSERT INTO orcamento_itens (orcamento_id, posicao, descricao, largura, altura, quantidade, "
+        "preco, total, produto, adicional) VALUES (1, ?, ?, 'X', 'X', ?, ?, ?, NULL, 0)",
+        [(0, 'BANNER', 3, 10.005, 30.015), (1, 'PLACA', 1, 1234.56, 1234.56), (2, 'BRINDE', 1, 0.0, 0.0)],
+    )
+    conn.executemany(
+        "INSERT INTO orcamento_diario (orcamento_id, op, posicao, dados) VALUES (1, ?, ?, ?)",
+        [('inserir', 0, json.dumps(['BANNER', 'X', 'X', 3, 10.005, 30.015, None, 0.0])),
+         ('atualizar', 1, json.dumps(['PLACA', 'X', 'X', 1, 1234.56, 1234.56, None, 0.0])),
+         ('remover', 2, None)],
+    )
+    conn.execute(
+        "INSERT INTO propostas (id, cliente, proposta, data, descricoes, valores, total) "
+        "VALUES (1, 'ACME', '07-2025', '01/02/2025', 'BANNER\nPLACA', '1264.58', 1264.575)"
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_v8_converte_reais_em_centavos(banco_v7):
+    assert migrar(banco_v7) == [8]
+    assert versao(banco_v7) == VERSAO_ATUAL
+
+    itens = banco_v7.execute(
+        "SELECT preco, total, typeof(preco), typeof(total) FROM orcamento_itens ORDER BY posicao"
+    ).fetchall()
+    assert itens == [(1001, 3002, 'integer', 'integer'),
+                     (123456, 123456, 'integer', 'integer'),
+                     (0, 0, 'integer', 'integer')]
+
+    diario = banco_v7.execute("SELECT op, dados FROM orcamento_diario ORDER BY seq").fetchall()
+    assert json.loads(diario[0][1])[4:6] == [1001, 3002]
+    assert json.loads(diario[1][1])[4:6] == [123456, 123456]
+    assert diario[2] == ('remover', None)
+
+    assert banco_v7.execute("SELECT total, typeof(total) FROM propostas").fetchone() == (126458, 'integer')
+
+
+def test_v8_mantem_o_indice_do_historico(banco_v7):
+    migrar(banco_v7)
+    assert [p['id'] for p in buscar_propostas(banco_v7, 'banner')] == [1]
+
+    # os triggers recriados indexam as propostas novas
+    servicos = Orcamento([ItemOrcamento('FACHADA', quantidade=1, preco=50000, total=50000)])
+    novo = indexar_proposta(banco_v7, 'OUTRO', '08-2025', '02/02/2025', servicos)
+    achadas = buscar_propostas(banco_v7, 'fachada')
+    assert [p['id'] for p in achadas] == [novo]
+    assert achadas[0]['total'] == 50000
+
+
+def test_v8_preserva_chaves_estrangeiras(banco_v7):
+    migrar(banco_v7)
+    banco_v7.execute("DELETE FROM orcamentos WHERE id = 1")
+    assert banco_v7.execute("SELECT COUNT(*) FROM orcamento_itens").fetchone()[0] == 0
+    assert banco_v7.execute("PRAGMA foreign_key_check").fetchall() == []
+
+
+def test_migrar_em_dia_nao_faz_nada():
+    conn = banco_na_versao(0)
+    assert migrar(conn) == [v for v, _ in MIGRACOES]
+    assert migrar(conn) == []
+
+
+def test_indice_do_historico_criado_quando_o_fts5_aparece(monkeypatch, caplog):
+    indice = migracoes._indice_propostas
+
+    def sem_fts5(cursor):
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE propostas_fts USING fts_inexistente(cliente)")
+        except sqlite3.OperationalError as e:
+            migracoes.log.warning("índice do histórico de propostas indisponível (%s); busca por LIKE", e)
+            return False
+
+    monkeypatch.setattr(migracoes, '_indice_propostas', sem_fts5)
+    conn = sqlite3.connect(':memory:')
+    configurar_conexao(conn)
+    migrar(conn)
+    assert versao(conn) == VERSAO_ATUAL
+    assert not migracoes.garantir_indice_propostas(conn)
+    assert 'busca por LIKE' in caplog.text
+    servicos = Orcamento([ItemOrcamento('BANNER', total=1000)])
+    antiga = indexar_proposta(conn, 'ACME', '01-2025', '01/01/2025', servicos)
+    assert [p['id'] for p in buscar_propostas(conn, 'banner')] == [antiga]
+
+    # SQLite com FTS5: a próxima abertura cria o índice com as propostas já gravadas
+    monkeypatch.setattr(migracoes, '_indice_propostas', indice)
+    assert migrar(conn) == []
+    assert conn.execute("SELECT rowid FROM propostas_fts WHERE propostas_fts MATCH 'banner'").fetchall() == [(antiga,)]
+    nova = indexar_proposta(conn, 'OUTRO', '02-2025', '01/01/2025', servicos)
+    assert [p['id'] for p in buscar_propostas(conn, 'banner')] == [nova, antiga]
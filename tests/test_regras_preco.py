@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+
+from features.migracoes import configurar_conexao, migrar
+from features.precificacao import LinhaPreco, calcular_linha, price_many
+from features.regras_preco import compilar_regra, get_regras, regra_manual
+from features.repositorio import get_repositorio
+
+# (qtd, largura, altura, adicional por m²)
+ENTRADAS = [
+    (1, 0.8, 1.2, 0.0),
+    (3, 1.5, 0.0, 0.0),
+    (7, 0.0, 0.0, 0.0),
+    (10, 2.35, 0.9, 12.5),
+    (250, 0.1, 0.15, 0.0),
+    (1, 1.0, 1.0, 3.3),
+    (5000, 0.0, 0.0, 0.0),
+]
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    configurar_conexao(conn)
+    migrar(conn)
+    repo = get_repositorio(conn)
+    repo.salvar_produto('LONA', 'm2', preco_m2=45.9)
+    repo.salvar_produto('FITA', 'm', preco_m=3.75)
+    repo.salvar_produto('BOTTON', 'unit', preco_unit=2.2)
+    repo.salvar_produto('PANFLETO', 'unit', preco_unit=0.09)
+    repo.add_faixa('PANFLETO', 1, 99, 0.12)
+    repo.add_faixa('PANFLETO', 100, 999, 0.065)
+    yield conn
+    conn.close()
+
+
+def _linha(tipo, preco, qtd, larg, alt, adicional):
+    return LinhaPreco(tipo=tipo, largura=larg, altura=alt, qtd=qtd, preco=preco,
+                      instalacao=adicional, adicional_por_area=True)
+
+
+@pytest.mark.parametrize('produto, tipo, preco', [('LONA', 'm2', 45.9), ('FITA', 'm', 3.75), ('BOTTON', 'unit', 2.2)])
+def test_regra_cadastrada_igual_ao_nucleo(conn, produto, tipo, preco):
+    regra = get_regras(conn).regra(produto)
+    linhas = [_linha(tipo, preco, *e) for e in ENTRADAS]
+    esperado = [calcular_linha(ln) for ln in linhas]
+    assert [regra(qtd, larg, alt, 999.0, ad) for qtd, larg, alt, ad in ENTRADAS] == esperado
+    assert list(price_many(linhas)) == esperado
+
+
+def test_regra_de_faixas_igual_ao_nucleo(conn):
+    regra = get_regras(conn).regra('PANFLETO')
+
+    def preco_da_faixa(qtd):
+        return 0.12 if qtd <= 99 else 0.065 if qtd <= 999 else 0.09  # acima das faixas: preço unitário
+
+    linhas = [_linha('unit', preco_da_faixa(e[0]), *e) for e in ENTRADAS]
+    esperado = [calcular_linha(ln) for ln in linhas]
+    assert [regra(qtd, larg, alt, 999.0, ad) for qtd, larg, alt, ad in ENTRADAS] == esperado
+    assert list(price_many(linhas)) == esperado
+
+
+@pytest.mark.parametrize('tipo', ['m2', 'm', 'unit'])
+def test_regra_manual_igual_ao_nucleo(tipo):
+    regra = regra_manual(tipo)
+    for qtd, larg, alt, ad in ENTRADAS:
+        assert regra(qtd, larg, alt, '12.5', ad) == calcular_linha(_linha(tipo, '12.5', qtd, larg, alt, ad))
+
+
+def test_compilar_regra_sem_preco_cai_para_o_manual():
+    assert compilar_regra('m2', None, None, None) is None
+    assert compilar_regra('unit', None, None, None) is None
+    assert compilar_regra('unit', None, None, 2.0)(3, 0, 0, None, 0) == 6.0
+
+
+def test_primeira_faixa_troca_a_regra_fixa(conn):
+    regras = get_regras(conn)
+    assert regras.regra('BOTTON')(10, 0, 0, None, 0) == pytest.approx(22.0)
+    get_repositorio(conn).add_faixa('BOTTON', 1, 50, 1.5)
+    assert regras.regra('BOTTON')(10, 0, 0, None, 0) == 15.0
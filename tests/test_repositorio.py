@@ -0,0 +1,85 @@
+import pytest
+
+from features.repositorio import get_repositorio
+
+
+def _nomes(conn):
+    return [r[0] for r in conn.execute("SELECT nome FROM produtos ORDER BY nome")]
+
+
+@pytest.fixture
+def repo(banco):
+    return get_repositorio(banco)
+
+
+def test_operacao_solta_grava_na_hora(banco, repo):
+    repo.salvar_produto('A', 'm2', preco_m2=1.0)
+    assert not banco.in_transaction
+    assert _nomes(banco) == ['A']
+
+
+def test_transacao_grava_tudo_num_commit_e_roda_apos_commit_no_fim(banco, repo):
+    eventos = []
+    with repo.transacao():
+        repo.salvar_produto('A', 'm2', preco_m2=1.0)
+        repo.apos_commit(lambda: eventos.append('depois'))
+        repo.salvar_produto('B', 'unit', preco_unit=2.0)
+        assert repo.em_transacao and banco.in_transaction
+        assert eventos == []
+    assert eventos == ['depois']
+    assert not repo.em_transacao and not banco.in_transaction
+    assert _nomes(banco) == ['A', 'B']
+
+
+def test_erro_desfaz_a_transacao_inteira_sem_rodar_apos_commit(banco, repo):
+    eventos = []
+    with pytest.raises(RuntimeError):
+        with repo.transacao():
+            repo.salvar_produto('A', 'm2', preco_m2=1.0)
+            repo.apos_commit(lambda: eventos.append('externo'))
+            raise RuntimeError
+    assert eventos == []
+    assert _nomes(banco) == []
+    assert not repo.em_transacao
+
+
+def test_savepoint_desfaz_so_a_parte_interna(banco, repo):
+    eventos = []
+    with repo.transacao():
+        repo.salvar_produto('A', 'm2', preco_m2=1.0)
+        repo.apos_commit(lambda: eventos.append('externo'))
+        with pytest.raises(ValueError):
+            with repo.transacao():
+                repo.salvar_produto('B', 'm2', preco_m2=2.0)
+                repo.add_faixa('C', 1, 10, 1.0)
+                repo.apos_commit(lambda: eventos.append('interno'))
+                raise ValueError
+        with repo.transacao():
+            repo.salvar_produto('D', 'm', preco_m=3.0)
+            repo.apos_commit(lambda: eventos.append('interno ok'))
+        assert eventos == []
+    assert eventos == ['externo', 'interno ok']
+    assert _nomes(banco) == ['A', 'D']
+    assert banco.execute("SELECT COUNT(*) FROM produtos_unitarios").fetchone() == (0,)
+    assert banco.execute("SELECT COUNT(*) FROM faixas_unitarias").fetchone() == (0,)
+
+
+def test_erro_externo_depois_de_savepoint_confirmado_desfaz_tudo(banco, repo):
+    eventos = []
+    with pytest.raises(RuntimeError):
+        with repo.transacao():
+            with repo.transacao():
+                repo.salvar_produto('A', 'm2', preco_m2=1.0)
+                repo.apos_commit(lambda: eventos.append('interno'))
+            raise RuntimeError
+    assert eventos == []
+    assert _nomes(banco) == []
+
+
+def test_remover_produto_leva_as_faixas(banco, repo):
+    repo.salvar_produto('P', 'unit', preco_unit=1.0)
+    repo.add_faixa('P', 1, 10, 0.5)
+    repo.remover_produto('P')
+    assert _nomes(banco) == []
+    assert banco.execute("SELECT COUNT(*) FROM faixas_unitarias").fetchone() == (0,)
+    assert repo.get_faixas_por_produto('P') == []
@@ -0,0 +1,76 @@
+import pytest
+
+from features.dinheiro import centavos
+from features.orcamento import ItemOrcamento, Orcamento
+from features.precificacao import TIPO_M2, LinhaPreco, calcular_linha, medidas_em_metros
+from features.reprecificacao import itens_reprecificados, reprecificar
+from features.repositorio import get_repositorio
+
+
+@pytest.fixture
+def repo(banco):
+    repo = get_repositorio(banco)
+    repo.salvar_produto('LONA', 'm2', preco_m2=50.0)
+    repo.salvar_produto('PANFLETO', 'unit', preco_unit=0.5)
+    repo.add_faixa('PANFLETO', 1, 99, 0.4)
+    repo.add_faixa('PANFLETO', 100, 10**9, 0.25)
+    repo.salvar_produto('CANETA', 'unit', preco_unit=2.0)
+    repo.salvar_produto('SEM PRECO', 'unit')
+    return repo
+
+
+def _orcamento():
+    return Orcamento([
+        ItemOrcamento('LONA 1x2', '100', '200', 1, 4000, 8000, 'LONA', 0.0),
+        ItemOrcamento('PANFLETOS', 'X', 'X', 200, 40, 8000, 'PANFLETO', 0.0),
+        ItemOrcamento('CANETAS', 'X', 'X', 10, 200, 2000, 'CANETA', 0.0),
+        ItemOrcamento('ARTE', 'X', 'X', 1, 15000, 15000),
+        ItemOrcamento('VELHO', 'X', 'X', 1, 100, 100, 'DESCONTINUADO', 0.0),
+        ItemOrcamento('BRINDE', 'X', 'X', 1, 100, 100, 'SEM PRECO', 0.0),
+    ])
+
+
+def _total_m2(preco, larg, alt, qtd):
+    largura, altura = medidas_em_metros(larg, alt)
+    return centavos(calcular_linha(LinhaPreco(tipo=TIPO_M2, largura=largura, altura=altura, qtd=qtd, preco=preco)))
+
+
+def test_reprecificar_lista_so_o_que_muda(banco, repo):
+    orc = _orcamento()
+    antes = list(orc.linhas_completas())
+    resultado = reprecificar(banco, orc)
+
+    assert list(orc.linhas_completas()) == antes
+    assert [(a.indice, a.preco_antigo, a.preco_novo, a.total_antigo, a.total_novo) for a in resultado.alteracoes] == [
+        (0, 4000, 5000, 8000, _total_m2(50.0, '100', '200', 1)),
+        (1, 40, 25, 8000, 5000),
+    ]
+    assert resultado.sem_origem == 1
+    assert resultado.ausentes == {'DESCONTINUADO'}
+    assert resultado.sem_preco == {'SEM PRECO'}
+    assert resultado.total_novo == orc.total + sum(a.total_novo - a.total_antigo for a in resultado.alteracoes)
+    assert '2 de 6 linha(s) mudam de preço.' in resultado.resumo()
+
+
+def test_itens_reprecificados_ignora_linhas_editadas_depois(banco, repo):
+    orc = _orcamento()
+    orc.append(ItemOrcamento('MAIS PANFLETOS', 'X', 'X', 50, 50, 2500, 'PANFLETO', 0.0))
+    resultado = reprecificar(banco, orc)
+    assert [a.indice for a in resultado.alteracoes] == [0, 1, 6]
+
+    orc[0] = ItemOrcamento('LONA 1x2', '100', '200', 1, 4000, 9000, 'LONA', 0.0)   # outro total
+    orc[1] = ItemOrcamento('PANFLETOS', 'X', 'X', 200, 40, 8000, 'CANETA', 0.0)    # outro produto
+    itens = itens_reprecificados(orc, resultado)
+    assert [(i, it.preco, it.total) for i, it in itens] == [(6, 40, 2000)]
+    assert orc[6].total == 2500  # só calcula; quem aplica é a tela
+
+    orc.pop()
+    assert itens_reprecificados(orc, resultado) == []
+
+
+def test_catalogo_igual_nada_muda(banco, repo):
+    orc = Orcamento([ItemOrcamento('CANETAS', 'X', 'X', 10, 200, 2000, 'CANETA', 0.0)])
+    resultado = reprecificar(banco, orc)
+    assert resultado.alteracoes == []
+    assert resultado.total_novo == resultado.total_antigo == 2000
+    assert itens_reprecificados(orc, resultado) == []
@@ -1,10 +1,14 @@
 """Módulo que contém a classe TotalCalculator extraída de `budget_system.py`.
 
-Fornece a mesma lógica de cálculo de total usada pela UI.
+Adaptador Tk sobre `features.precificacao`: lê os widgets, delega o cálculo
+ao núcleo sem widgets e escreve o total em `ent_total`.
 """
 import tkinter as tk
 from ttkbootstrap import ttk
 
+from features.dinheiro import centavos, formatar
+from features.precificacao import LinhaPreco, calcular_linha, medidas_em_metros
+
 
 class TotalCalculator:
 	"""Calculadora simples que lê widgets/valores e calcula o total.
@@ -25,6 +29,24 @@ class TotalCalculator:
 		self.ent_struct = ent_struct
 
 	def calcular_total(self):
+		# o valor cobrado na linha é arredondado ao centavo uma única vez, aqui
+		total = formatar(centavos(calcular_linha(self.linha_preco())))
+
+		# formata e coloca no campo
+		try:
+			self.ent_total.config(state='normal')
+			self.ent_total.delete(0, tk.END)
+			self.ent_total.insert(0, total)
+			self.ent_total.config(state='readonly')
+		except Exception:
+			# se for apenas um widget sem .config
+			try:
+				self.ent_total.set(total)
+			except Exception:
+				pass
+
+	def linha_preco(self):
+		"""Lê os widgets e monta a `LinhaPreco` que `calcular_total` precifica."""
 		# pega valores
 		tipo = self.tipo_calculo.get() if isinstance(self.tipo_calculo, ttk.Combobox) else self.tipo_calculo
 		preco_raw = self.ent_preco.get().strip().replace(',', '.') if hasattr(self.ent_preco, 'get') else str(self.ent_preco)
@@ -32,43 +54,8 @@ class TotalCalculator:
 		larg_raw = self.ent_larg.get().strip() if hasattr(self.ent_larg, 'get') else str(self.ent_larg)
 		alt_raw = self.ent_alt.get().strip() if hasattr(self.ent_alt, 'get') else str(self.ent_alt)
 
-		def _parse_number_to_meters(s):
-			"""Converte uma string numérica para metros.
-			Aceita decimais com '.' ou ','; se o número for maior que 10 assume-se centímetros e divide por 100.
-			Retorna None se inválido ou vazio.
-			"""
-			if not s:
-				return None
-			s = str(s).strip().replace(',', '.')
-			if s.upper() == 'X':
-				return None
-			try:
-				v = float(s)
-			except Exception:
-				return None
-			# se valor aparentemente em centímetros (ex: 80, 120) converte para metros
-			if v > 10:
-				return v / 100.0
-			# senão trata como metros (ex: 1.2, 0.8)
-			return v
-
-		def _maybe_split_pair(field):
-			"""Se o campo contém 'x' como '80x120', retorna tuple (a, b) como strings (sem espaços).
-			Caso contrário retorna None.
-			"""
-			if not field:
-				return None
-			if 'x' in field.lower():
-				parts = [p.strip() for p in field.lower().split('x') if p.strip()]
-				if len(parts) >= 2:
-					return parts[0], parts[1]
-			return None
-
-		# tenta capturar entradas do tipo '80x120' colocadas em apenas um campo
-		pair = _maybe_split_pair(larg_raw) or _maybe_split_pair(alt_raw)
-		if pair and (not larg_raw or not alt_raw or 'x' in larg_raw.lower() or 'x' in alt_raw.lower()):
-			# se encontramos um par em algum campo, atualizamos largura/altura bruta
-			larg_raw, alt_raw = pair[0], pair[1]
+		# aceita entradas do tipo '80x120' colocadas em apenas um campo
+		largura, altura = medidas_em_metros(larg_raw, alt_raw)
 
 		try:
 			preco = float(preco_raw) if preco_raw else 0.0
@@ -79,47 +66,24 @@ class TotalCalculator:
 		except Exception:
 			qtd = 1
 
-		total = 0.0
-		if tipo == 'Por m²':
-			largura_m = _parse_number_to_meters(larg_raw)
-			altura_m = _parse_number_to_meters(alt_raw)
-			if largura_m and altura_m:
-				area = largura_m * altura_m
-				total = area * preco * qtd
-			else:
-				# se não foi possível calcular área, cai para preço * qtd
-				total = preco * qtd
-		elif tipo == 'Por m':
-			# comprimento pode ser em cm (ex: 80) ou m (ex: 1.2)
-			comprimento_m = _parse_number_to_meters(larg_raw)
-			if comprimento_m:
-				total = comprimento_m * preco * qtd
-			else:
-				total = preco * qtd
-		else:  # Por unidade
-			total = preco * qtd
-
 		# incluir instalação/estrutura se houver (assume valor por item)
+		inst_val = struct_val = 0.0
 		try:
 			if self.install_var and self.install_var.get():
 				inst_val = float(self.ent_install.get().strip().replace(',', '.')) if self.ent_install.get().strip() else 0.0
-				total += inst_val
 			if self.struct_var and self.struct_var.get():
 				struct_val = float(self.ent_struct.get().strip().replace(',', '.')) if self.ent_struct.get().strip() else 0.0
-				total += struct_val
 		except Exception:
 			pass
 
-		# formata e coloca no campo
-		try:
-			self.ent_total.config(state='normal')
-			self.ent_total.delete(0, tk.END)
-			self.ent_total.insert(0, f"{total:.2f}")
-			self.ent_total.config(state='readonly')
-		except Exception:
-			# se for apenas um widget sem .config
-			try:
-				self.ent_total.set(f"{total:.2f}")
-			except Exception:
-				pass
+		return LinhaPreco(
+			produto=self.produto_sel.get() if hasattr(self.produto_sel, 'get') else self.produto_sel,
+			tipo=tipo,
+			largura=largura,
+			altura=altura,
+			qtd=qtd,
+			preco=preco,
+			instalacao=inst_val,
+			estrutura=struct_val,
+		)
 